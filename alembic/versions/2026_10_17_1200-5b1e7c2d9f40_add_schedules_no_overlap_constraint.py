@@ -0,0 +1,36 @@
+"""add schedules_no_overlap exclusion constraint
+
+Revision ID: 5b1e7c2d9f40
+Revises: aa836b83b09c
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9f40'
+down_revision: str | None = 'aa836b83b09c'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Записи считаются интервалами [начало, начало + длительность),
+    # пересекающиеся занятые интервалы запрещены. GiST-индекс ограничения
+    # используется и в запросах на пересечение.
+    # Если в базе уже есть пересекающиеся записи, миграция упадёт:
+    # их нужно разнести вручную.
+    op.execute(
+        "ALTER TABLE schedules ADD CONSTRAINT schedules_no_overlap "
+        "EXCLUDE USING gist ("
+        "tsrange(visit_datetime, visit_datetime + visit_duration * interval '1 minute')"
+        " WITH &&) WHERE (is_booked)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('schedules_no_overlap', 'schedules')
@@ -0,0 +1,44 @@
+"""add max_user_bookings setting and partial index of user bookings
+
+Revision ID: 8d3f6a1c0e27
+Revises: 5b1e7c2d9f40
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a1c0e27'
+down_revision: str | None = '5b1e7c2d9f40'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'schedule_settings',
+        sa.Column(
+            'max_user_bookings',
+            sa.Integer(),
+            server_default=sa.text('3'),
+            nullable=True,
+        ),
+    )
+    # Лимит записей и «Мои записи» читают только будущие занятые строки
+    # пользователя, поэтому стоимость не растёт вместе с историей визитов
+    op.create_index(
+        'ix_schedules_user_active',
+        'schedules',
+        ['user_telegram_id', 'visit_datetime'],
+        postgresql_where=sa.text('is_booked'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_schedules_user_active', table_name='schedules')
+    op.drop_column('schedule_settings', 'max_user_bookings')
@@ -0,0 +1,42 @@
+"""add indexes for admin bookings lists
+
+Revision ID: c41a9e07b2d5
+Revises: 8d3f6a1c0e27
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a9e07b2d5'
+down_revision: str | None = '8d3f6a1c0e27'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Пагинация по (visit_datetime, id) и фильтр по диапазону дат
+    op.create_index(
+        'ix_schedules_booked_visit',
+        'schedules',
+        ['visit_datetime', 'id'],
+        postgresql_where=sa.text('is_booked'),
+    )
+    # Фильтр по статусу подтверждения: равенство по is_approved,
+    # дальше тот же порядок (visit_datetime, id)
+    op.create_index(
+        'ix_schedules_approval_visit',
+        'schedules',
+        ['is_approved', 'visit_datetime', 'id'],
+        postgresql_where=sa.text('is_booked'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_schedules_approval_visit', table_name='schedules')
+    op.drop_index('ix_schedules_booked_visit', table_name='schedules')
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,10 +21,59 @@ class Settings(BaseSettings):
     REDIS_PORT: int
     REDIS_PASSWORD: str
 
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    MAX_CONCURRENT_UPDATES: int = 100
+    MAX_PENDING_UPDATES: int = 1000
+
+    RESUMABLE_UPDATES: bool = False
+    REPLAY_RATE_PER_SECOND: float = 20.0
+    SHUTDOWN_DRAIN_TIMEOUT: float = 25.0
+
+    SCHEDULE_SETTINGS_REVALIDATE_SECONDS: float = 5.0
+    ADMIN_IDS_CACHE_TTL: float = 60.0
+    OCCUPANCY_REBUILD_SECONDS: float = 60.0
+
+    METRICS_ENABLED: bool = False
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9100
+
+    SQL_BUDGET_MODE: Literal["off", "log", "raise"] = "off"
+    SQL_BUDGET_SAMPLE_RATE: float = 1.0
+
+    THROTTLING_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: float = 30.0
+    SLOT_HOLD_TTL_SECONDS: float = 120.0
+
+    WEBHOOK_BASE_URL: str = ""
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_SECRET: str = ""
+    WEBHOOK_HOST: str = "0.0.0.0"  # noqa: S104
+    WEBHOOK_PORT: int = 8080
+
+    UPDATE_QUEUE_ROLE: Literal["off", "receiver", "worker"] = "off"
+    UPDATE_QUEUE_SHARDS: int = 16
+    UPDATE_QUEUE_MAXLEN: int = 100_000
+    WORKER_INDEX: int = 0
+    WORKER_COUNT: int = 1
+
     @property
     def db_url(self) -> str:
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def metrics_port(self) -> int:
+        """
+        Воркеры очереди на одном хосте получают свои порты подряд
+        после METRICS_PORT, который остаётся приёмнику или одиночному боту
+        """
+        if self.UPDATE_QUEUE_ROLE == "worker":
+            return self.METRICS_PORT + 1 + self.WORKER_INDEX
+        return self.METRICS_PORT
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.WEBHOOK_BASE_URL.rstrip('/')}{self.WEBHOOK_PATH}"
+
     model_config = SettingsConfigDict(
         env_file=BASE_DIR / ".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,9 @@
+class SqlBudgetExceededError(Exception):
+    """Хендлер выполнил больше SQL-запросов, чем заявлено, или повторял запросы."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"Превышен бюджет SQL: {self.message}"
@@ -0,0 +1,9 @@
+class WebhookConfigError(Exception):
+    """Ошибка конфигурации вебхука."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"Ошибка вебхука: {self.message}"
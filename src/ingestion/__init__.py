@@ -0,0 +1,20 @@
+from src.ingestion.lanes import LanesDispatcher, LanesStats, UpdateLanes
+from src.ingestion.polling import run_polling
+from src.ingestion.stream import (
+    UpdateStreamProducer,
+    create_receiver_dispatcher,
+    run_stream_worker,
+)
+from src.ingestion.webhook import create_webhook_app, run_webhook
+
+__all__ = (
+    "LanesDispatcher",
+    "LanesStats",
+    "UpdateLanes",
+    "UpdateStreamProducer",
+    "create_receiver_dispatcher",
+    "create_webhook_app",
+    "run_polling",
+    "run_stream_worker",
+    "run_webhook",
+)
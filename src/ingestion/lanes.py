@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class LanesStats:
+    limit: int
+    queue_depth: int
+    running: int
+    active_lanes: int
+
+
+@dataclass(slots=True)
+class _Job:
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+
+
+class UpdateLanes:
+    """
+    Исполнитель апдейтов с упорядоченными «полосами» по пользователям.
+
+    Задачи с одним ключом (telegram id пользователя) выполняются строго
+    по одной и в порядке поступления, задачи с разными ключами — параллельно,
+    но не более limit одновременно. Задачи без ключа выполняются независимо.
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError("limit должен быть положительным")
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._lanes: dict[Hashable, deque[_Job]] = {}
+        self._drainers: set[asyncio.Task[None]] = set()
+        self._pending = 0
+        self._running = 0
+
+    @property
+    def stats(self) -> LanesStats:
+        return LanesStats(
+            limit=self.limit,
+            queue_depth=self._pending - self._running,
+            running=self._running,
+            active_lanes=len(self._lanes),
+        )
+
+    async def run(self, key: Hashable | None, job: Callable[[], Awaitable[Any]]) -> Any:
+        """Ставит задачу в полосу key и ждёт её результата"""
+        future = asyncio.get_running_loop().create_future()
+        lane_key = key if key is not None else object()
+        self._pending += 1
+
+        lane = self._lanes.get(lane_key)
+        if lane is None:
+            self._lanes[lane_key] = deque([_Job(run=job, future=future)])
+            drainer = asyncio.create_task(self._drain(lane_key))
+            self._drainers.add(drainer)
+            drainer.add_done_callback(self._drainers.discard)
+        else:
+            lane.append(_Job(run=job, future=future))
+
+        return await future
+
+    async def join(self) -> None:
+        """Ждёт завершения всех поставленных задач"""
+        while self._drainers:
+            await asyncio.wait(set(self._drainers))
+
+    async def _drain(self, key: Hashable) -> None:
+        lane = self._lanes[key]
+        try:
+            while lane:
+                job = lane[0]
+                if not job.future.cancelled():
+                    async with self._semaphore:
+                        await self._execute(job)
+                lane.popleft()
+                self._pending -= 1
+        finally:
+            del self._lanes[key]
+
+    async def _execute(self, job: _Job) -> None:
+        self._running += 1
+        try:
+            result = await job.run()
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._running -= 1
+
+
+class LanesDispatcher(Dispatcher):
+    """
+    Диспетчер, пропускающий каждый апдейт через UpdateLanes.
+
+    Очередь выстраивается до FSM и остальных middleware, поэтому следующий
+    апдейт пользователя видит состояние, уже изменённое предыдущим.
+    При остановке сначала дожидается принятых апдейтов (не дольше
+    drain_timeout), и только потом закрывает хранилище FSM.
+    """
+
+    def __init__(
+        self, *, lanes: UpdateLanes, drain_timeout: float | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self.lanes = lanes
+        self.drain_timeout = drain_timeout
+
+    async def feed_update(self, bot: Bot, update: Update, **kwargs: Any) -> Any:
+        user = UserContextMiddleware.resolve_event_context(update).user
+        return await self.lanes.run(
+            user.id if user else None,
+            partial(super().feed_update, bot, update, **kwargs),
+        )
+
+    async def emit_shutdown(self, *args: Any, **kwargs: Any) -> None:
+        """Перед закрытием хранилища FSM дожидается обработки принятых апдейтов"""
+        stats = self.lanes.stats
+        if stats.running or stats.queue_depth:
+            logger.info(
+                "Ожидание обработки %d апдейтов перед остановкой",
+                stats.running + stats.queue_depth,
+            )
+        try:
+            async with asyncio.timeout(self.drain_timeout):
+                await self.lanes.join()
+        except TimeoutError:
+            logger.warning(
+                "Не дождались обработки %d апдейтов за %s с",
+                self.lanes.stats.running + self.lanes.stats.queue_depth,
+                self.drain_timeout,
+            )
+        await super().emit_shutdown(*args, **kwargs)
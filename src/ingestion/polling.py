@@ -0,0 +1,52 @@
+import logging
+
+from aiogram import Bot, Dispatcher
+from redis.asyncio.client import Redis
+
+from src.config import settings
+from src.ingestion.resumable import ResumablePoller
+
+logger = logging.getLogger(__name__)
+
+
+async def run_polling(
+    bot: Bot,
+    dp: Dispatcher,
+    redis: Redis,
+    allowed_updates: list[str] | None = None,
+    handle_as_tasks: bool = True,
+) -> None:
+    """
+    Получение апдейтов через long polling (getUpdates)
+
+    :param redis: хранилище offset и журнала апдейтов для RESUMABLE_UPDATES
+    :param allowed_updates: типы апдейтов, по умолчанию — используемые в dp
+    :param handle_as_tasks: обрабатывать апдейты конкурентно,
+        False — строго по одному в порядке получения
+    """
+    if settings.RESUMABLE_UPDATES:
+        poller = ResumablePoller(
+            bot=bot,
+            dp=dp,
+            redis=redis,
+            replay_rate=settings.REPLAY_RATE_PER_SECOND,
+            max_pending_updates=settings.MAX_PENDING_UPDATES,
+            drain_timeout=settings.SHUTDOWN_DRAIN_TIMEOUT,
+            allowed_updates=allowed_updates,
+            handle_as_tasks=handle_as_tasks,
+        )
+        await poller.run()
+        return
+
+    await bot.delete_webhook(drop_pending_updates=True)
+
+    logger.info(
+        "Запуск polling, в обработке может находиться до %d апдейтов",
+        settings.MAX_PENDING_UPDATES if handle_as_tasks else 1,
+    )
+    await dp.start_polling(
+        bot,
+        allowed_updates=allowed_updates or dp.resolve_used_update_types(),
+        handle_as_tasks=handle_as_tasks,
+        tasks_concurrency_limit=settings.MAX_PENDING_UPDATES,
+    )
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import signal
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiogram.utils.backoff import Backoff, BackoffConfig
+from redis.asyncio.client import Redis
+
+logger = logging.getLogger(__name__)
+
+OFFSET_KEY = "bot:updates:offset"
+JOURNAL_KEY = "bot:updates:journal"
+POLLING_TIMEOUT = 10
+BATCH_LIMIT = 100
+BACKOFF_CONFIG = BackoffConfig(min_delay=1.0, max_delay=5.0, factor=1.3, jitter=0.1)
+
+
+class UpdateJournal:
+    """
+    Журнал полученных, но ещё не обработанных апдейтов.
+
+    Апдейты записываются в журнал вместе с новым offset одной транзакцией,
+    поэтому Telegram подтверждает (offset) только уже сохранённые апдейты,
+    а после рестарта необработанные апдейты берутся из журнала.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def get_offset(self) -> int | None:
+        offset = await self.redis.get(OFFSET_KEY)
+        return int(offset) if offset is not None else None
+
+    async def record(self, updates: list[Update]) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                JOURNAL_KEY,
+                mapping={
+                    str(update.update_id): update.model_dump_json(
+                        by_alias=True, exclude_none=True
+                    )
+                    for update in updates
+                },
+            )
+            pipe.set(OFFSET_KEY, updates[-1].update_id + 1)
+            await pipe.execute()
+
+    async def complete(self, update_id: int) -> None:
+        await self.redis.hdel(JOURNAL_KEY, str(update_id))  # type: ignore[misc]
+
+    async def pending(self) -> list[dict[str, Any]]:
+        journal = await self.redis.hgetall(JOURNAL_KEY)  # type: ignore[misc]
+        return [json.loads(journal[key]) for key in sorted(journal, key=int)]
+
+
+class ResumablePoller:
+    """
+    Long polling без потери апдейтов между рестартами.
+
+    При старте повторно обрабатывает апдейты из журнала и накопившуюся
+    в Telegram очередь не быстрее replay_rate апдейтов в секунду.
+    По SIGINT/SIGTERM перестаёт получать апдейты и ждёт обработки
+    уже полученных (не дольше drain_timeout), после чего вызывает shutdown.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        redis: Redis,
+        replay_rate: float,
+        max_pending_updates: int,
+        drain_timeout: float,
+        allowed_updates: list[str] | None = None,
+        handle_as_tasks: bool = True,
+    ) -> None:
+        self.bot = bot
+        self.dp = dp
+        self.journal = UpdateJournal(redis)
+        self.replay_interval = 1 / replay_rate
+        self.drain_timeout = drain_timeout
+        self.allowed_updates = allowed_updates or dp.resolve_used_update_types()
+        self.handle_as_tasks = handle_as_tasks
+
+        self._semaphore = asyncio.Semaphore(max_pending_updates)
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._stop = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def _process(self, update: Update) -> None:
+        try:
+            await self.dp.feed_update(self.bot, update, dispatcher=self.dp)
+        except Exception:
+            logger.exception("Ошибка обработки апдейта id=%d", update.update_id)
+        finally:
+            await self.journal.complete(update.update_id)
+
+    async def _process_with_semaphore(self, update: Update) -> None:
+        try:
+            await self._process(update)
+        finally:
+            self._semaphore.release()
+
+    async def _dispatch(self, update: Update) -> None:
+        if not self.handle_as_tasks:
+            await self._process(update)
+            return
+
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._process_with_semaphore(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _replay_journal(self) -> None:
+        pending = await self.journal.pending()
+        if not pending:
+            return
+
+        logger.info("Повторная обработка %d апдейтов из журнала", len(pending))
+        for raw_update in pending:
+            if self._stop.is_set():
+                return
+            await self._dispatch(
+                Update.model_validate(raw_update, context={"bot": self.bot})
+            )
+            await asyncio.sleep(self.replay_interval)
+
+    async def _fetch(self, offset: int | None) -> list[Update] | None:
+        """Ждёт апдейты от Telegram, None — если пришёл сигнал остановки"""
+        fetching = asyncio.ensure_future(
+            self.bot.get_updates(
+                offset=offset,
+                limit=BATCH_LIMIT,
+                timeout=POLLING_TIMEOUT,
+                allowed_updates=self.allowed_updates,
+                request_timeout=int(self.bot.session.timeout + POLLING_TIMEOUT),
+            )
+        )
+        stopping = asyncio.ensure_future(self._stop.wait())
+        await asyncio.wait({fetching, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+
+        if not fetching.done():
+            fetching.cancel()
+            return None
+        return fetching.result()
+
+    async def _poll(self) -> None:
+        backoff = Backoff(config=BACKOFF_CONFIG)
+        offset = await self.journal.get_offset()
+        # Пока Telegram отдаёт полные пачки, разбираем накопленную очередь
+        catching_up = True
+
+        while not self._stop.is_set():
+            try:
+                updates = await self._fetch(offset)
+            except Exception:
+                logger.exception("Не удалось получить апдейты")
+                await backoff.asleep()
+                continue
+            backoff.reset()
+
+            if updates is None:
+                return
+            if not updates:
+                catching_up = False
+                continue
+
+            await self.journal.record(updates)
+            offset = updates[-1].update_id + 1
+
+            for update in updates:
+                await self._dispatch(update)
+                if catching_up:
+                    await asyncio.sleep(self.replay_interval)
+            catching_up = len(updates) == BATCH_LIMIT
+
+    async def _drain(self) -> None:
+        if not self._tasks:
+            return
+        logger.info("Ожидание обработки %d апдейтов", len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+        if pending:
+            logger.warning(
+                "%d апдейтов не обработаны и останутся в журнале", len(pending)
+            )
+
+    async def run(self) -> None:
+        await self.bot.delete_webhook(drop_pending_updates=False)
+        await self.dp.emit_startup(
+            bot=self.bot, dispatcher=self.dp, **self.dp.workflow_data
+        )
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        logger.info("Запуск polling с сохранением offset в Redis")
+        try:
+            await self._replay_journal()
+            await self._poll()
+        finally:
+            await self._drain()
+            await self.dp.emit_shutdown(
+                bot=self.bot, dispatcher=self.dp, **self.dp.workflow_data
+            )
+            logger.info("Polling остановлен")
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import signal
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.types import TelegramObject, Update
+from redis.asyncio.client import Redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = "bot:updates"
+CONSUMER_GROUP = "bot-workers"
+READ_BATCH_SIZE = 100
+READ_BLOCK_MS = 5000
+
+
+def stream_name(shard: int) -> str:
+    return f"{STREAM_PREFIX}:{shard}"
+
+
+def extract_user_id(raw_update: dict[str, Any]) -> int | None:
+    """Telegram id отправителя апдейта (поле from любого вложенного объекта)"""
+    for value in raw_update.values():
+        if isinstance(value, dict) and isinstance(value.get("from"), dict):
+            return value["from"].get("id")
+    return None
+
+
+def shard_for_update(raw_update: dict[str, Any], shards: int) -> int:
+    """Апдейты одного пользователя всегда попадают в один и тот же шард"""
+    user_id = extract_user_id(raw_update)
+    if user_id is None:
+        return 0
+    return user_id % shards
+
+
+def shards_for_worker(worker_index: int, worker_count: int, shards: int) -> list[int]:
+    return [shard for shard in range(shards) if shard % worker_count == worker_index]
+
+
+class UpdateStreamProducer:
+    """Складывает сырые апдейты в Redis Stream, шардированный по id пользователя"""
+
+    def __init__(self, redis: Redis, shards: int, maxlen: int) -> None:
+        self.redis = redis
+        self.shards = shards
+        self.maxlen = maxlen
+
+    async def publish(self, raw_update: dict[str, Any]) -> None:
+        shard = shard_for_update(raw_update, self.shards)
+        await self.redis.xadd(
+            stream_name(shard),
+            {"update": json.dumps(raw_update)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+
+
+class ForwardUpdateMiddleware(BaseMiddleware):
+    """
+    Вместо обработки апдейта публикует его в очередь.
+    Используется диспетчером-приёмником, хендлеры которого никогда не вызываются.
+    """
+
+    def __init__(self, producer: UpdateStreamProducer) -> None:
+        self.producer = producer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+
+        await self.producer.publish(
+            event.model_dump(mode="json", by_alias=True, exclude_none=True)
+        )
+        return None
+
+
+def create_receiver_dispatcher(producer: UpdateStreamProducer) -> Dispatcher:
+    dp = Dispatcher()
+    dp.update.outer_middleware(ForwardUpdateMiddleware(producer))
+    return dp
+
+
+class UpdateStreamWorker:
+    """
+    Читает апдейты из своих шардов через consumer group и передаёт их в диспетчер.
+
+    Каждый шард читается только одним воркером пачка за пачкой, а внутри пачки
+    порядок апдейтов одного пользователя сохраняет LanesDispatcher.
+    Апдейт подтверждается (XACK) только после обработки, необработанные
+    апдейты будут перечитаны при перезапуске воркера с тем же индексом.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        dp: Dispatcher,
+        bot: Bot,
+        shards: list[int],
+        consumer_name: str,
+    ) -> None:
+        self.redis = redis
+        self.dp = dp
+        self.bot = bot
+        self.shards = shards
+        self.consumer_name = consumer_name
+        self._stop = asyncio.Event()
+
+    def stop(self) -> None:
+        """Дочитать текущие пачки и остановиться"""
+        self._stop.set()
+
+    async def _ensure_group(self, stream: str) -> None:
+        try:
+            await self.redis.xgroup_create(
+                stream, CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _process_entry(self, stream: str, entry_id: str, fields: dict) -> None:
+        try:
+            await self.dp.feed_raw_update(
+                bot=self.bot, update=json.loads(fields["update"])
+            )
+        except Exception:
+            logger.exception("Ошибка обработки апдейта %s из %s", entry_id, stream)
+        await self.redis.xack(stream, CONSUMER_GROUP, entry_id)
+
+    async def consume_shard(self, shard: int) -> None:
+        stream = stream_name(shard)
+        await self._ensure_group(stream)
+
+        # Сначала дочитываем апдейты, полученные, но не подтверждённые до рестарта
+        last_id = "0"
+        while not self._stop.is_set():
+            response = await self.redis.xreadgroup(
+                CONSUMER_GROUP,
+                self.consumer_name,
+                {stream: last_id},
+                count=READ_BATCH_SIZE,
+                block=READ_BLOCK_MS,
+            )
+            entries = response[0][1] if response else []
+
+            if last_id == "0" and not entries:
+                last_id = ">"
+                continue
+
+            # Порядок апдейтов одного пользователя внутри пачки сохраняет
+            # LanesDispatcher, апдейты разных пользователей идут параллельно
+            await asyncio.gather(
+                *(
+                    self._process_entry(stream, entry_id, fields)
+                    for entry_id, fields in entries
+                )
+            )
+
+    async def run(self) -> None:
+        logger.info("Воркер %s читает шарды %s", self.consumer_name, self.shards)
+        await asyncio.gather(*(self.consume_shard(shard) for shard in self.shards))
+
+
+async def run_stream_worker(
+    bot: Bot,
+    dp: Dispatcher,
+    redis: Redis,
+    worker_index: int,
+    worker_count: int,
+    shards: int,
+) -> None:
+    """Запускает воркер очереди апдейтов до получения SIGINT/SIGTERM"""
+    worker_shards = shards_for_worker(worker_index, worker_count, shards)
+    if not worker_shards:
+        raise ValueError(
+            f"Воркеру {worker_index} из {worker_count} не достался ни один шард"
+        )
+
+    worker = UpdateStreamWorker(
+        redis=redis,
+        dp=dp,
+        bot=bot,
+        shards=worker_shards,
+        consumer_name=f"worker-{worker_index}",
+    )
+
+    await dp.emit_startup(bot=bot, dispatcher=dp, **dp.workflow_data)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        logger.info("Воркер %s остановлен", worker.consumer_name)
+        await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+        await bot.session.close()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import signal
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from src.config import settings
+from src.exceptions.webhook import WebhookConfigError
+
+logger = logging.getLogger(__name__)
+
+
+class LimitedRequestHandler(SimpleRequestHandler):
+    """
+    Обработчик вебхука с ограничением числа апдейтов, находящихся в обработке.
+
+    При handle_in_background Telegram сразу получает ответ 200, а сам апдейт
+    обрабатывается в фоне, но не более чем max_pending_updates одновременно.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        secret_token: str,
+        max_pending_updates: int,
+        handle_in_background: bool = True,
+        **data: Any,
+    ) -> None:
+        super().__init__(
+            dispatcher=dispatcher,
+            bot=bot,
+            handle_in_background=handle_in_background,
+            secret_token=secret_token,
+            **data,
+        )
+        self._semaphore = asyncio.Semaphore(max_pending_updates)
+
+    async def _background_feed_update(self, bot: Bot, update: dict[str, Any]) -> None:
+        async with self._semaphore:
+            await super()._background_feed_update(bot=bot, update=update)
+
+
+def create_webhook_app(
+    bot: Bot,
+    dp: Dispatcher,
+    secret_token: str,
+    max_pending_updates: int,
+    path: str,
+    handle_in_background: bool = True,
+) -> web.Application:
+    """Создаёт aiohttp-приложение, принимающее апдейты от Telegram"""
+    if not secret_token:
+        raise WebhookConfigError("Не задан секретный токен вебхука")
+
+    app = web.Application()
+    # Shutdown диспетчера (ожидание апдейтов в обработке) должен выполниться
+    # раньше, чем обработчик закроет сессию бота
+    setup_application(app, dp, bot=bot)
+    LimitedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret_token,
+        max_pending_updates=max_pending_updates,
+        handle_in_background=handle_in_background,
+    ).register(app, path=path)
+    return app
+
+
+async def run_webhook(
+    bot: Bot,
+    dp: Dispatcher,
+    allowed_updates: list[str] | None = None,
+    handle_in_background: bool = True,
+) -> None:
+    """
+    Получение апдейтов через вебхук до получения SIGINT/SIGTERM
+
+    :param allowed_updates: типы апдейтов, по умолчанию — используемые в dp
+    :param handle_in_background: отвечать Telegram до окончания обработки апдейта
+    """
+    if not settings.WEBHOOK_BASE_URL:
+        raise WebhookConfigError("Не задан WEBHOOK_BASE_URL")
+
+    app = create_webhook_app(
+        bot=bot,
+        dp=dp,
+        secret_token=settings.WEBHOOK_SECRET,
+        max_pending_updates=settings.MAX_PENDING_UPDATES,
+        path=settings.WEBHOOK_PATH,
+        handle_in_background=handle_in_background,
+    )
+
+    await bot.set_webhook(
+        url=settings.webhook_url,
+        secret_token=settings.WEBHOOK_SECRET,
+        allowed_updates=allowed_updates or dp.resolve_used_update_types(),
+        drop_pending_updates=not settings.RESUMABLE_UPDATES,
+    )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=settings.WEBHOOK_HOST, port=settings.WEBHOOK_PORT)
+    await site.start()
+    logger.info(
+        "Вебхук слушает %s:%d%s, в обработке может находиться до %d апдейтов",
+        settings.WEBHOOK_HOST,
+        settings.WEBHOOK_PORT,
+        settings.WEBHOOK_PATH,
+        settings.MAX_PENDING_UPDATES,
+    )
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("Остановка вебхука")
+        await runner.cleanup()
@@ -1,10 +1,51 @@
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from src.models.schedule import Schedule
+from src.keyboards.cache import freeze, static_keyboard
+from src.services.admin import (
+    BookingCursor,
+    BookingPage,
+    BookingsFilter,
+    DayBookingRow,
+)
 from src.texts.status_appointments import APPOINTMENT_TYPE_STATUS
 
+BOOKINGS_CURSOR_FORMAT = "%Y%m%d%H%M%S"
+BOOKINGS_DAY_FORMAT = "%Y%m%d"
+
+
+def bookings_page_callback(
+    direction: str, bookings_filter: BookingsFilter, cursor: BookingCursor
+) -> str:
+    visit_datetime, schedule_id = cursor
+    visit_datetime_str = visit_datetime.strftime(BOOKINGS_CURSOR_FORMAT)
+    return (
+        f"bookings_{direction}_{bookings_filter.period}_{bookings_filter.status}_"
+        f"{visit_datetime_str}_{schedule_id}"
+    )
+
+
+def parse_bookings_page_callback(
+    data: str,
+) -> tuple[str, BookingsFilter, BookingCursor]:
+    _, direction, period, status, visit_datetime_str, schedule_id_str = data.split("_")
+    visit_datetime = datetime.strptime(visit_datetime_str, BOOKINGS_CURSOR_FORMAT)
+    return (
+        direction,
+        BookingsFilter(period=period, status=status),
+        (visit_datetime, int(schedule_id_str)),
+    )
+
+
+def bookings_day_callback(day: date) -> str:
+    return f"bookings_day_{day.strftime(BOOKINGS_DAY_FORMAT)}"
 
+
+@static_keyboard
 def create_admin_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
@@ -40,6 +81,7 @@ def create_admin_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@static_keyboard
 def create_workday_selection_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
@@ -52,26 +94,103 @@ def create_workday_selection_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def create_all_bookings_keyboard(schedules: list[Schedule]) -> InlineKeyboardMarkup:
+def create_bookings_page_keyboard(
+    page: BookingPage, bookings_filter: BookingsFilter | None = None
+) -> InlineKeyboardMarkup:
+    bookings_filter = bookings_filter or BookingsFilter()
     builder = InlineKeyboardBuilder()
 
-    for schedule in schedules:
-        visit_datetime_str = schedule.visit_datetime.strftime("%d.%m.%y %H:%M")
+    for row in page.rows:
+        visit_datetime_str = row.visit_datetime.strftime("%d.%m.%y %H:%M")
 
-        status = APPOINTMENT_TYPE_STATUS.get(schedule.is_approved)
+        status = APPOINTMENT_TYPE_STATUS.get(row.is_approved)
 
         builder.button(
             text=f"{status} {visit_datetime_str}",
-            callback_data=f"schedule_{schedule.id}",
+            callback_data=f"schedule_{row.id}",
         )
 
+    navigation = 0
+    if page.rows and page.has_prev:
+        builder.button(
+            text="⬅️ Назад",
+            callback_data=bookings_page_callback(
+                "prev", bookings_filter, page.first_cursor
+            ),
+        )
+        navigation += 1
+    if page.rows and page.has_next:
+        builder.button(
+            text="Вперёд ➡️",
+            callback_data=bookings_page_callback(
+                "next", bookings_filter, page.last_cursor
+            ),
+        )
+        navigation += 1
+
+    builder.button(text="🔎 Фильтры", callback_data="bookings_filters")
     builder.button(text="ВЫХОД", callback_data="cancel")
 
+    # Записи по одной в ряд, кнопки навигации рядом, фильтры и выход отдельно
+    builder.adjust(*[1] * len(page.rows), navigation or 1, 1, 1)
+
+    return builder.as_markup()
+
+
+@static_keyboard
+def create_bookings_filters_keyboard() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+
+    builder.button(text="📅 Записи на сегодня", callback_data="bookings_day_today")
+    builder.button(
+        text="⏳ Ожидают подтверждения сегодня",
+        callback_data="bookings_f_today_pending",
+    )
+    builder.button(
+        text="✅ Подтверждённые на неделю",
+        callback_data="bookings_f_week_approved",
+    )
+    builder.button(
+        text="⏳ Все ожидающие подтверждения",
+        callback_data="bookings_f_all_pending",
+    )
+    builder.button(text="📋 Все будущие записи", callback_data="bookings_f_all_any")
+    builder.button(text="❌ ВЫХОД", callback_data="cancel")
+
     builder.adjust(1)
+    return builder.as_markup()
+
+
+def create_day_bookings_keyboard(
+    rows: Sequence[DayBookingRow], day: date
+) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+
+    for row in rows:
+        status = APPOINTMENT_TYPE_STATUS.get(row.is_approved)
+        builder.button(
+            text=f"{status} {row.visit_datetime:%H:%M} {row.first_name or '-'}",
+            callback_data=f"schedule_{row.id}",
+        )
 
+    builder.button(
+        text="⬅️ Предыдущий день",
+        callback_data=bookings_day_callback(day - timedelta(days=1)),
+    )
+    builder.button(
+        text="Следующий день ➡️",
+        callback_data=bookings_day_callback(day + timedelta(days=1)),
+    )
+    builder.button(text="🔎 Фильтры", callback_data="bookings_filters")
+    builder.button(text="ВЫХОД", callback_data="cancel")
+
+    builder.adjust(*[1] * len(rows), 2, 1, 1)
     return builder.as_markup()
 
 
+# Клавиатура приходит каждому администратору на каждую запись и повторно
+# при смене статуса, поэтому недавние хранятся готовыми
+@lru_cache(maxsize=128)
 def create_status_update_keyboard(
     schedule_id: int, telegram_id: int | None
 ) -> InlineKeyboardMarkup:
@@ -89,9 +208,10 @@ def create_status_update_keyboard(
     builder.button(text="🚪 ВЫХОД", callback_data="cancel")
 
     builder.adjust(3, 1, 1)
-    return builder.as_markup()
+    return freeze(builder.as_markup())
 
 
+@static_keyboard
 def confirm_change_info_text_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
@@ -103,6 +223,7 @@ def confirm_change_info_text_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@static_keyboard
 def create_duration_time_variants() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
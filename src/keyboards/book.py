@@ -3,7 +3,10 @@ from datetime import datetime
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from src.keyboards.cache import static_keyboard
 
+
+@static_keyboard
 def create_book_main_menu_kb() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="Записаться", callback_data="book")
@@ -27,6 +30,18 @@ def create_booking_list_kb(schedules: list[datetime]) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+def create_confirm_booking_kb(visit_date_str: str) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="✅ Подтвердить", callback_data="confirm_booking")
+    builder.button(
+        text="🔙 Другое время", callback_data=f"choose_date_{visit_date_str}"
+    )
+    builder.button(text="ВЫХОД", callback_data="cancel")
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+@static_keyboard
 def create_confirm_cancel_booking_kb() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="Да", callback_data="confirm_yes")
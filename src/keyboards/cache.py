@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import wraps
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from pydantic import ConfigDict, field_serializer
+
+
+class FrozenInlineKeyboardButton(InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    """
+    Клавиатура, общая для всех апдейтов: ряды хранятся кортежами,
+    а кнопки и поля запрещено менять
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    inline_keyboard: tuple[  # type: ignore[assignment]
+        tuple[FrozenInlineKeyboardButton, ...], ...
+    ]
+
+    @field_serializer("inline_keyboard")
+    def _serialize_rows(
+        self, rows: tuple[tuple[FrozenInlineKeyboardButton, ...], ...]
+    ) -> list[list[FrozenInlineKeyboardButton]]:
+        # aiogram готовит к отправке вложенные списки, кортежи он не разбирает
+        return [list(row) for row in rows]
+
+
+def freeze(markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+    return FrozenInlineKeyboardMarkup(
+        inline_keyboard=tuple(
+            tuple(
+                FrozenInlineKeyboardButton.model_validate(button.model_dump())
+                for button in row
+            )
+            for row in markup.inline_keyboard
+        )
+    )
+
+
+STATIC_KEYBOARDS: dict[str, InlineKeyboardMarkup] = {}
+
+
+def static_keyboard(
+    build: Callable[[], InlineKeyboardMarkup],
+) -> Callable[[], InlineKeyboardMarkup]:
+    """Собирает клавиатуру без параметров один раз при импорте модуля"""
+    markup = freeze(build())
+    STATIC_KEYBOARDS[build.__name__] = markup
+
+    @wraps(build)
+    def get() -> InlineKeyboardMarkup:
+        return markup
+
+    return get
+
+
+class KeyboardCache:
+    """
+    LRU готовых клавиатур. Ключ включает версию занятости, поэтому после
+    записи, отмены или смены выходных старая клавиатура просто перестаёт
+    находиться и вытесняется новыми.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._markups: OrderedDict[Hashable, InlineKeyboardMarkup] = OrderedDict()
+
+    def get(self, key: Hashable) -> InlineKeyboardMarkup | None:
+        markup = self._markups.get(key)
+        if markup is not None:
+            self._markups.move_to_end(key)
+        return markup
+
+    def put(self, key: Hashable, markup: InlineKeyboardMarkup) -> None:
+        self._markups[key] = markup
+        self._markups.move_to_end(key)
+        if len(self._markups) > self.maxsize:
+            self._markups.popitem(last=False)
+
+    def clear(self) -> None:
+        self._markups.clear()
+
+    def __len__(self) -> int:
+        return len(self._markups)
+
+
+keyboard_cache = KeyboardCache(maxsize=256)
@@ -1,10 +1,13 @@
 import calendar
 from collections import defaultdict
+from collections.abc import Sequence
 from datetime import date, time
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.keyboards.cache import keyboard_cache
+from src.schemas.schedule_settings import ScheduleSettingsSchema
 from src.services.schedule import ScheduleService
 
 RU_MONTHS = {
@@ -26,7 +29,10 @@ WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
 
 
 def build_calendar_section(
-    year: int, month: int, available_days: set[int]
+    year: int,
+    month: int,
+    available_days: set[int],
+    free_slots: dict[int, int] | None = None,
 ) -> list[list[InlineKeyboardButton]]:
     cal = calendar.Calendar(firstweekday=0)
     month_days = cal.monthdayscalendar(year, month)
@@ -50,10 +56,15 @@ def build_calendar_section(
         for day in week:
             if day == 0:
                 row.append(InlineKeyboardButton(text=" ", callback_data="ignore"))
+            elif free_slots is not None and free_slots.get(day) == 0:
+                row.append(InlineKeyboardButton(text="🔴", callback_data="ignore"))
             elif day in available_days:
+                text = str(day)
+                if free_slots is not None and day in free_slots:
+                    text = f"{day}·{free_slots[day]}"
                 row.append(
                     InlineKeyboardButton(
-                        text=str(day), callback_data=f"choose_date_{year}_{month}_{day}"
+                        text=text, callback_data=f"choose_date_{year}_{month}_{day}"
                     )
                 )
             else:
@@ -63,15 +74,30 @@ def build_calendar_section(
     return kb
 
 
-def create_calendar_for_available_dates(dates: set[date]) -> InlineKeyboardMarkup:
+def create_calendar_for_available_dates(
+    dates: set[date], capacity: dict[date, int] | None = None
+) -> InlineKeyboardMarkup:
+    """
+    capacity — число свободных слотов по датам: полностью занятые дни
+    показываются недоступными, у остальных рядом с числом виден остаток
+    """
     grouped: dict[tuple[int, int], set[int]] = defaultdict(set)
     for d in dates:
         grouped[(d.year, d.month)].add(d.day)
 
+    free_slots: dict[tuple[int, int], dict[int, int]] = defaultdict(dict)
+    for d, free in (capacity or {}).items():
+        free_slots[(d.year, d.month)][d.day] = free
+
     full_kb: list[list[InlineKeyboardButton]] = []
 
     for year, month in sorted(grouped):
-        kb_section = build_calendar_section(year, month, grouped[(year, month)])
+        kb_section = build_calendar_section(
+            year,
+            month,
+            grouped[(year, month)],
+            free_slots[(year, month)] if capacity is not None else None,
+        )
         full_kb.extend(kb_section)
 
     full_kb.append([InlineKeyboardButton(text="ВЫХОД", callback_data="cancel")])
@@ -79,21 +105,56 @@ def create_calendar_for_available_dates(dates: set[date]) -> InlineKeyboardMarku
     return InlineKeyboardMarkup(inline_keyboard=full_kb)
 
 
+async def create_booking_calendar(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    schedule_settings: ScheduleSettingsSchema,
+) -> InlineKeyboardMarkup:
+    """Календарь записи с остатком слотов, пересобирается после смены занятости"""
+    version = await schedule_service.get_availability_version(
+        session=session, schedule_settings=schedule_settings
+    )
+    key = ("calendar", version, schedule_settings)
+    keyboard = keyboard_cache.get(key)
+    if keyboard is None:
+        capacity = await schedule_service.get_day_capacity(
+            session=session, schedule_settings=schedule_settings
+        )
+        keyboard = create_calendar_for_available_dates(set(capacity), capacity)
+        keyboard_cache.put(key, keyboard)
+    return keyboard
+
+
 async def create_choose_time_keyboard(
-    time_slots: list[time],
+    time_slots: Sequence[time],
     session: AsyncSession,
     schedule_service: ScheduleService,
     visit_date: date,
+    schedule_settings: ScheduleSettingsSchema,
+    held_times: set[time] | None = None,
 ) -> InlineKeyboardMarkup:
-    busy_datetimes = await schedule_service.get_booking_slots_for_date(
-        session=session, visit_date=visit_date
+    """
+    held_times — слоты, которые сейчас подтверждают другие клиенты.
+    Готовая клавиатура берётся из кэша, пока не изменилась занятость дня
+    """
+    version = await schedule_service.get_availability_version(
+        session=session, schedule_settings=schedule_settings, visit_date=visit_date
+    )
+    key = ("time", visit_date, version, tuple(time_slots), frozenset(held_times or ()))
+    keyboard = keyboard_cache.get(key)
+    if keyboard is not None:
+        return keyboard
+
+    free_times = await schedule_service.get_free_times(
+        session=session, visit_date=visit_date, schedule_settings=schedule_settings
     )
-    busy_times = {value.time() for value in busy_datetimes}
+    if held_times:
+        free_times -= held_times
 
     kb = []
     for time_slot in time_slots:
         time_to_text = time_slot.strftime("%H:%M")
-        is_available = time_slot not in busy_times
+        is_available = time_slot in free_times
         kb.append(
             [
                 InlineKeyboardButton(
@@ -109,4 +170,5 @@ async def create_choose_time_keyboard(
 
     kb.append([InlineKeyboardButton(text="ВЫХОД", callback_data="cancel")])
     keyboard = InlineKeyboardMarkup(inline_keyboard=kb)
+    keyboard_cache.put(key, keyboard)
     return keyboard
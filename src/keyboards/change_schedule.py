@@ -1,10 +1,12 @@
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from src.keyboards.cache import static_keyboard
 from src.keyboards.calendar import WEEKDAYS
-from src.models import ScheduleSettings
+from src.schemas.schedule_settings import ScheduleSettingsSchema
 
 
+@static_keyboard
 def create_change_schedule_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(
@@ -19,7 +21,9 @@ def create_change_schedule_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def create_weekday_kb(schedule_settings: ScheduleSettings) -> InlineKeyboardMarkup:
+def create_weekday_kb(
+    schedule_settings: ScheduleSettingsSchema,
+) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for index, weekday in enumerate(WEEKDAYS):
         builder.button(
@@ -1,6 +1,9 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.keyboards.cache import static_keyboard
 
+
+@static_keyboard
 def ask_about_name_kb() -> InlineKeyboardMarkup:
     inline_kb = [
         [
@@ -14,6 +17,7 @@ def ask_about_name_kb() -> InlineKeyboardMarkup:
     return keyboard
 
 
+@static_keyboard
 def ask_about_phone_kb() -> InlineKeyboardMarkup:
     inline_kb = [
         [
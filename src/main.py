@@ -2,14 +2,83 @@ import asyncio
 import logging
 
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.redis import RedisStorage
+from aiohttp import web
 from redis.asyncio.client import Redis
 
+from database.database import engine, session_factory
 from src.config import settings
 from src.exceptions.token import TokenNotFoundError
+from src.ingestion import (
+    LanesDispatcher,
+    UpdateLanes,
+    UpdateStreamProducer,
+    create_receiver_dispatcher,
+    run_polling,
+    run_stream_worker,
+    run_webhook,
+)
+from src.metrics import (
+    InstrumentedRedis,
+    TelegramCallsMiddleware,
+    install_sql_tracer,
+    instrument_engine,
+    instrument_lanes,
+    metrics_registry,
+    start_metrics_server,
+)
 from src.routers import router
-from src.static_commands import commands
 from src.utils.register_middlewares import register_middlewares
+from src.utils.slot_holds import SlotHoldStore
+from src.utils.warmup import build_warmup_steps, run_warmup
+
+
+def create_dispatcher(storage: BaseStorage, redis: Redis | None = None) -> Dispatcher:
+    """Один и тот же диспетчер используется и в polling, и в webhook режиме"""
+    lanes = UpdateLanes(limit=settings.MAX_CONCURRENT_UPDATES)
+    dp = LanesDispatcher(
+        storage=storage,
+        lanes=lanes,
+        drain_timeout=settings.SHUTDOWN_DRAIN_TIMEOUT,
+    )
+    if settings.METRICS_ENABLED:
+        instrument_lanes(metrics_registry, lanes)
+
+    dp.include_routers(router)
+    register_middlewares(dp, redis=redis)
+    if redis is not None:
+        dp["slot_holds"] = SlotHoldStore(redis, ttl=settings.SLOT_HOLD_TTL_SECONDS)
+
+    return dp
+
+
+async def run_receiver(bot: Bot, dp: Dispatcher, redis: Redis) -> None:
+    """Принимает апдейты и складывает их в очередь для воркеров, не обрабатывая"""
+    producer = UpdateStreamProducer(
+        redis=redis,
+        shards=settings.UPDATE_QUEUE_SHARDS,
+        maxlen=settings.UPDATE_QUEUE_MAXLEN,
+    )
+    receiver_dp = create_receiver_dispatcher(producer)
+    allowed_updates = dp.resolve_used_update_types()
+
+    # Апдейты публикуются строго по одному, чтобы не нарушить их порядок
+    if settings.BOT_MODE == "webhook":
+        await run_webhook(
+            bot=bot,
+            dp=receiver_dp,
+            allowed_updates=allowed_updates,
+            handle_in_background=False,
+        )
+    else:
+        await run_polling(
+            bot=bot,
+            dp=receiver_dp,
+            redis=redis,
+            allowed_updates=allowed_updates,
+            handle_as_tasks=False,
+        )
 
 
 async def main() -> None:
@@ -17,7 +86,8 @@ async def main() -> None:
     if not token:
         raise TokenNotFoundError("Не найден токен telegram")
 
-    redis = Redis(
+    redis_class = InstrumentedRedis if settings.METRICS_ENABLED else Redis
+    redis = redis_class(
         host=settings.REDIS_HOST,
         password=settings.REDIS_PASSWORD,
         port=settings.REDIS_PORT,
@@ -27,10 +97,12 @@ async def main() -> None:
     storage = RedisStorage(redis=redis)
 
     bot = Bot(token=token)
-    dp = Dispatcher(storage=storage)
-
-    dp.include_routers(router)
-    register_middlewares(dp)
+    if settings.METRICS_ENABLED:
+        bot.session.middleware(TelegramCallsMiddleware())
+        instrument_engine(engine)
+    if settings.SQL_BUDGET_MODE != "off":
+        install_sql_tracer(engine)
+    dp = create_dispatcher(storage=storage, redis=redis)
 
     logging.basicConfig(
         level=logging.DEBUG,
@@ -40,9 +112,48 @@ async def main() -> None:
         handlers=[logging.StreamHandler()],
     )
 
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
-    await bot.set_my_commands(commands=commands)
+    metrics_runner: web.AppRunner | None = None
+    try:
+        if settings.METRICS_ENABLED:
+            metrics_runner = await start_metrics_server(
+                registry=metrics_registry,
+                host=settings.METRICS_HOST,
+                port=settings.metrics_port,
+            )
+
+        # Апдейты начинают приниматься только после прогрева
+        await run_warmup(
+            build_warmup_steps(
+                bot=bot,
+                redis=redis,
+                engine=engine,
+                session_factory=session_factory,
+                with_database=settings.UPDATE_QUEUE_ROLE != "receiver",
+            )
+        )
+
+        if settings.UPDATE_QUEUE_ROLE == "worker":
+            await run_stream_worker(
+                bot=bot,
+                dp=dp,
+                redis=redis,
+                worker_index=settings.WORKER_INDEX,
+                worker_count=settings.WORKER_COUNT,
+                shards=settings.UPDATE_QUEUE_SHARDS,
+            )
+        elif settings.UPDATE_QUEUE_ROLE == "receiver":
+            await run_receiver(bot=bot, dp=dp, redis=redis)
+        elif settings.BOT_MODE == "webhook":
+            await run_webhook(bot=bot, dp=dp)
+        else:
+            await run_polling(bot=bot, dp=dp, redis=redis)
+    finally:
+        # Апдейты в обработке уже дождались в shutdown диспетчера
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        await bot.session.close()
+        await engine.dispose()
+        await redis.aclose()
 
 
 if __name__ == "__main__":
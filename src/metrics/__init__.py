@@ -0,0 +1,36 @@
+from src.metrics.instrumentation import (
+    InstrumentedRedis,
+    TelegramCallsMiddleware,
+    instrument_engine,
+    instrument_lanes,
+)
+from src.metrics.registry import (
+    MetricsRegistry,
+    UpdateStats,
+    current_update_stats,
+    metrics_registry,
+)
+from src.metrics.server import create_metrics_app, start_metrics_server
+from src.metrics.sql_budget import (
+    SqlTrace,
+    handler_budgets,
+    install_sql_tracer,
+    track_sql,
+)
+
+__all__ = (
+    "InstrumentedRedis",
+    "MetricsRegistry",
+    "SqlTrace",
+    "TelegramCallsMiddleware",
+    "UpdateStats",
+    "create_metrics_app",
+    "current_update_stats",
+    "handler_budgets",
+    "install_sql_tracer",
+    "instrument_engine",
+    "instrument_lanes",
+    "metrics_registry",
+    "start_metrics_server",
+    "track_sql",
+)
@@ -0,0 +1,74 @@
+from functools import partial
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from redis.asyncio.client import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.ingestion.lanes import UpdateLanes
+from src.metrics.registry import MetricsRegistry, current_update_stats
+
+LANES_GAUGES = (
+    ("limit", "Max updates processed concurrently"),
+    ("queue_depth", "Updates waiting in user lanes"),
+    ("running", "Updates being processed"),
+    ("active_lanes", "Users with queued or running updates"),
+)
+
+
+def _count_statement(*_: Any) -> None:
+    stats = current_update_stats.get()
+    if stats is not None:
+        stats.sql_statements += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Считает SQL-запросы апдейта. Контекст доходит до событий через greenlet"""
+    if not event.contains(
+        engine.sync_engine, "before_cursor_execute", _count_statement
+    ):
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+
+
+def _lanes_stat(lanes: UpdateLanes, field: str) -> int:
+    return int(getattr(lanes.stats, field))
+
+
+def instrument_lanes(registry: MetricsRegistry, lanes: UpdateLanes) -> None:
+    """Отдаёт состояние полос апдейтов как gauge-метрики bot_lanes_*"""
+    for field, description in LANES_GAUGES:
+        registry.register_gauge(
+            f"bot_lanes_{field}", description, partial(_lanes_stat, lanes, field)
+        )
+
+
+class InstrumentedRedis(Redis):
+    """Redis-клиент, который учитывает команды в статистике текущего апдейта"""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        stats = current_update_stats.get()
+        if stats is not None:
+            stats.redis_calls += 1
+        return await super().execute_command(*args, **options)
+
+
+class TelegramCallsMiddleware(BaseRequestMiddleware):
+    """Учитывает запросы к Bot API в статистике текущего апдейта"""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        stats = current_update_stats.get()
+        if stats is not None:
+            stats.telegram_calls += 1
+        return await make_request(bot, method)
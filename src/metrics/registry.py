@@ -0,0 +1,124 @@
+import math
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# Границы корзин гистограммы задержки хендлеров, в секундах
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    math.inf,
+)
+
+
+@dataclass(slots=True)
+class UpdateStats:
+    """Счётчики ресурсов, потраченных на обработку одного апдейта"""
+
+    sql_statements: int = 0
+    redis_calls: int = 0
+    telegram_calls: int = 0
+
+
+current_update_stats: ContextVar[UpdateStats | None] = ContextVar(
+    "current_update_stats", default=None
+)
+
+
+@dataclass(slots=True)
+class HandlerMetrics:
+    buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    duration_sum: float = 0.0
+    count: int = 0
+    errors: int = 0
+    sql_statements: int = 0
+    redis_calls: int = 0
+    telegram_calls: int = 0
+
+    def observe(self, duration: float, stats: UpdateStats, failed: bool) -> None:
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+                break
+        self.duration_sum += duration
+        self.count += 1
+        self.errors += failed
+        self.sql_statements += stats.sql_statements
+        self.redis_calls += stats.redis_calls
+        self.telegram_calls += stats.telegram_calls
+
+
+class MetricsRegistry:
+    """Метрики хендлеров в памяти процесса с выводом в текстовом формате Prometheus"""
+
+    def __init__(self) -> None:
+        self.handlers: dict[str, HandlerMetrics] = {}
+        self.gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+
+    def register_gauge(
+        self, name: str, description: str, read: Callable[[], float]
+    ) -> None:
+        """Значение gauge читается в момент запроса /metrics"""
+        self.gauges[name] = (description, read)
+
+    def observe(
+        self, handler: str, duration: float, stats: UpdateStats, failed: bool = False
+    ) -> None:
+        metrics = self.handlers.get(handler)
+        if metrics is None:
+            metrics = self.handlers[handler] = HandlerMetrics()
+        metrics.observe(duration, stats, failed)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP bot_handler_duration_seconds Handler latency in seconds",
+            "# TYPE bot_handler_duration_seconds histogram",
+        ]
+        for handler, metrics in sorted(self.handlers.items()):
+            label = f'handler="{handler}"'
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS, metrics.buckets, strict=True):
+                cumulative += bucket
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(
+                    f'bot_handler_duration_seconds_bucket{{{label},le="{le}"}}'
+                    f" {cumulative}"
+                )
+            lines.append(
+                f"bot_handler_duration_seconds_sum{{{label}}} {metrics.duration_sum}"
+            )
+            lines.append(
+                f"bot_handler_duration_seconds_count{{{label}}} {metrics.count}"
+            )
+
+        counters = (
+            ("errors", "Handler calls finished with an exception"),
+            ("sql_statements", "SQL statements executed by handler"),
+            ("redis_calls", "Redis commands sent by handler"),
+            ("telegram_calls", "Telegram Bot API requests made by handler"),
+        )
+        for name, description in counters:
+            metric = f"bot_handler_{name}_total"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for handler, metrics in sorted(self.handlers.items()):
+                value = getattr(metrics, name)
+                lines.append(f'{metric}{{handler="{handler}"}} {value}')
+
+        for name, (description, read) in sorted(self.gauges.items()):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {read()}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,32 @@
+import logging
+
+from aiohttp import web
+
+from src.metrics.registry import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def create_metrics_app(registry: MetricsRegistry) -> web.Application:
+    async def handle_metrics(_: web.Request) -> web.Response:
+        return web.Response(
+            body=registry.render().encode(), headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    return app
+
+
+async def start_metrics_server(
+    registry: MetricsRegistry, host: str, port: int
+) -> web.AppRunner:
+    """Поднимает HTTP эндпоинт /metrics, остановка через runner.cleanup()"""
+    runner = web.AppRunner(create_metrics_app(registry), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+
+    logger.info("Метрики доступны на http://%s:%d/metrics", host, port)
+    return runner
@@ -0,0 +1,91 @@
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallbackType
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SQL_BUDGET_FLAG = "sql_budget"
+_STARTED_AT = "sql_trace_started_at"
+
+
+@dataclass(slots=True)
+class SqlTrace:
+    """Все SQL-запросы, выполненные за время обработки одного апдейта"""
+
+    statements: list[tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+    def repeated(self) -> dict[str, int]:
+        """Запросы одной формы, выполненные больше одного раза (признак N+1)"""
+        shapes = Counter(statement for statement, _ in self.statements)
+        return {statement: count for statement, count in shapes.items() if count > 1}
+
+    def violations(self, budget: int) -> list[str]:
+        problems = []
+        if self.count > budget:
+            problems.append(f"{self.count} запросов при бюджете {budget}")
+        for statement, count in self.repeated().items():
+            shape = " ".join(statement.split())[:120]
+            problems.append(f"запрос повторён {count} раз: {shape}")
+        return problems
+
+
+current_sql_trace: ContextVar[SqlTrace | None] = ContextVar(
+    "current_sql_trace", default=None
+)
+
+
+def _before_execute(conn: Any, *_: Any) -> None:
+    if current_sql_trace.get() is not None:
+        conn.info.setdefault(_STARTED_AT, []).append(time.perf_counter())
+
+
+def _after_execute(conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+    trace = current_sql_trace.get()
+    started = conn.info.get(_STARTED_AT)
+    if trace is not None and started:
+        trace.statements.append((statement, time.perf_counter() - started.pop()))
+
+
+def install_sql_tracer(engine: AsyncEngine) -> None:
+    """Подключает запись запросов к движку, контекст доходит через greenlet"""
+    for name, listener in (
+        ("before_cursor_execute", _before_execute),
+        ("after_cursor_execute", _after_execute),
+    ):
+        if not event.contains(engine.sync_engine, name, listener):
+            event.listen(engine.sync_engine, name, listener)
+
+
+@contextmanager
+def track_sql() -> Iterator[SqlTrace]:
+    trace = SqlTrace()
+    token = current_sql_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_sql_trace.reset(token)
+
+
+def handler_budgets(router: Router) -> dict[CallbackType, int | None]:
+    """Заявленные бюджеты хендлеров роутера и его дочерних роутеров"""
+    return {
+        handler.callback: handler.flags.get(SQL_BUDGET_FLAG)
+        for child in router.chain_tail
+        for observer in child.observers.values()
+        for handler in observer.handlers
+    }
@@ -1,27 +1,38 @@
-from collections.abc import Awaitable, Callable
 from typing import Any
 
-from aiogram import BaseMiddleware
-from aiogram.types.base import TelegramObject
-from sqlalchemy.exc import SQLAlchemyError
-
-from database.database import session_factory
-
-
-class DatabaseMiddleware(BaseMiddleware):
-    async def __call__(
-        self,
-        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-        event: TelegramObject,
-        data: dict[str, Any],
-    ) -> Awaitable[Any]:
-        async with session_factory() as session:
-            try:
-                data["session"] = session
-                result = await handler(event, data)
-                await session.commit()
-            except SQLAlchemyError:
-                await session.rollback()
-                raise
-            else:
-                return result
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class LazySession:
+    """
+    Прокси над AsyncSession: сессия создаётся при первом обращении,
+    а соединение из пула берётся только при первом запросе к базе.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession]) -> None:
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def is_used(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def commit_if_used(self) -> None:
+        """Коммит пропускается, если ни одного запроса не было"""
+        if self._session is not None and self._session.in_transaction():
+            await self._session.commit()
+
+    async def rollback_if_used(self) -> None:
+        if self._session is not None and self._session.in_transaction():
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
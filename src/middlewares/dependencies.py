@@ -0,0 +1,116 @@
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, cast
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.handler import CallbackType, HandlerObject
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.database import session_factory
+from src.middlewares.db import LazySession
+from src.services.admin import AdminService
+from src.services.schedule import ScheduleService
+from src.services.schedule_settings import (
+    ScheduleSettingsStore,
+    schedule_settings_store,
+)
+from src.services.user import UserService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerPlan:
+    """Какие зависимости нужны конкретному хендлеру"""
+
+    services: tuple[tuple[str, object], ...]
+    needs_session: bool
+    needs_settings: bool
+
+
+class DependencyMiddleware(BaseMiddleware):
+    """
+    Единый внутренний middleware вместо цепочки из middleware на каждую зависимость.
+
+    Сигнатуры хендлеров разбираются один раз при старте, а на каждый апдейт
+    в data кладётся только то, что хендлер действительно принимает.
+    """
+
+    def __init__(
+        self,
+        factory: async_sessionmaker[AsyncSession] = session_factory,
+        store: ScheduleSettingsStore = schedule_settings_store,
+    ) -> None:
+        self.session_factory = factory
+        self.store = store
+        self.services: dict[str, object] = {
+            "user_service": UserService(),
+            "schedule_service": ScheduleService(),
+            "admin_service": AdminService(),
+        }
+        self._plans: dict[CallbackType, HandlerPlan] = {}
+
+    def compile(self, router: Router) -> int:
+        """Заранее строит планы для всех хендлеров роутера и его дочерних роутеров"""
+        for child in router.chain_tail:
+            for observer in child.observers.values():
+                for handler in observer.handlers:
+                    self.plan_for(handler)
+
+        logger.info("Собраны зависимости для %d хендлеров", len(self._plans))
+        return len(self._plans)
+
+    def plan_for(self, handler: HandlerObject) -> HandlerPlan:
+        plan = self._plans.get(handler.callback)
+        if plan is not None:
+            return plan
+
+        def wants(name: str) -> bool:
+            # Хендлеру, принимающему **kwargs, aiogram передаёт всю data
+            return handler.varkw or name in handler.params
+
+        needs_settings = wants("schedule_settings")
+        plan = HandlerPlan(
+            services=tuple(
+                (name, service)
+                for name, service in self.services.items()
+                if wants(name)
+            ),
+            needs_session=needs_settings or wants("session"),
+            needs_settings=needs_settings,
+        )
+        self._plans[handler.callback] = plan
+        return plan
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        plan = self.plan_for(data["handler"])
+
+        for name, service in plan.services:
+            data[name] = service
+
+        if not plan.needs_session:
+            return await handler(event, data)
+
+        session = LazySession(self.session_factory)
+        try:
+            data["session"] = session
+            if plan.needs_settings:
+                data["schedule_settings"] = await self.store.get(
+                    cast(AsyncSession, session)
+                )
+            result = await handler(event, data)
+            await session.commit_if_used()
+        except Exception:
+            await session.rollback_if_used()
+            raise
+        else:
+            return result
+        finally:
+            await session.close()
@@ -8,6 +8,7 @@ from aiogram.types import CallbackQuery, Message, TelegramObject, Update
 
 from src.exceptions import RegistrationError
 from src.exceptions.booking import BookingError
+from src.exceptions.sql_budget import SqlBudgetExceededError
 from src.exceptions.telegram_object import (
     InvalidBotError,
     InvalidCallbackError,
@@ -29,6 +30,10 @@ class ErrorHandlerMiddleware(BaseMiddleware):
         try:
             return await handler(event, data)
 
+        except SqlBudgetExceededError:
+            # Нарушение бюджета в режиме raise должно ронять тесты, поэтому не глушится
+            raise
+
         except RegistrationError as e:
             logger.warning("Registration error: %s", str(e))
             await self._respond_and_cleanup(
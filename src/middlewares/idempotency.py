@@ -0,0 +1,75 @@
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, TelegramObject
+from redis.exceptions import RedisError
+
+from src.utils.idempotency import PENDING, IdempotencyStore
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_FLAG = "idempotent"
+
+
+class IdempotencyMiddleware(BaseMiddleware):
+    """
+    Защищает хендлеры с флагом idempotent от повторных нажатий.
+    Ключ строится по id callback и по (пользователь, callback.data, значения
+    из FSM, перечисленные в флаге). Среди значений FSM должен быть
+    идентификатор попытки, иначе повтор того же действия позже примет
+    за дубль. Повтор не доходит до хендлера и получает результат первого
+    выполнения. Сохраняется только успешный итог: если хендлер вернул
+    не строку, ключи освобождаются и действие можно повторить.
+    Регистрируется до DependencyMiddleware, чтобы повтор не открывал сессию БД.
+    """
+
+    def __init__(self, store: IdempotencyStore) -> None:
+        self.store = store
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        state_keys = get_flag(data, IDEMPOTENT_FLAG)
+        if state_keys is None or not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        action = event.data or ""
+        state: FSMContext | None = data.get("state")
+        if state_keys and state is not None:
+            state_data = await state.get_data()
+            action = ":".join([action, *(str(state_data.get(k)) for k in state_keys)])
+        keys = self.store.keys(event.id, event.from_user.id, action)
+
+        try:
+            previous = await self.store.claim(keys)
+        except RedisError:
+            logger.warning("Идемпотентность недоступна, callback обработан без защиты")
+            return await handler(event, data)
+
+        if previous is not None:
+            logger.info("Повторный callback %s от %d", action, event.from_user.id)
+            if previous == PENDING:
+                await event.answer("⏳ Запрос уже обрабатывается")
+            else:
+                await event.answer(previous or "Запрос уже обработан")
+            return None
+
+        try:
+            result = await handler(event, data)
+        except Exception:
+            # Упавший запрос можно повторить, поэтому ключи освобождаются
+            await self.store.release(keys)
+            raise
+
+        if isinstance(result, str):
+            await self.store.finish(keys, result)
+        else:
+            await self.store.release(keys)
+        return result
@@ -0,0 +1,48 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+
+from src.metrics.registry import (
+    MetricsRegistry,
+    UpdateStats,
+    current_update_stats,
+    metrics_registry,
+)
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Внутренний middleware: замеряет время хендлера и считает его
+    SQL-запросы, команды Redis и запросы к Telegram
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry) -> None:
+        self.registry = registry
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject = data["handler"]
+        stats = UpdateStats()
+        token = current_update_stats.set(stats)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await handler(event, data)
+            failed = False
+            return result
+        finally:
+            current_update_stats.reset(token)
+            self.registry.observe(
+                handler=handler_object.callback.__name__,
+                duration=time.perf_counter() - started,
+                stats=stats,
+                failed=failed,
+            )
@@ -0,0 +1,52 @@
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import TelegramObject
+
+from src.exceptions.sql_budget import SqlBudgetExceededError
+from src.metrics.sql_budget import SQL_BUDGET_FLAG, track_sql
+
+logger = logging.getLogger(__name__)
+
+
+class SqlBudgetMiddleware(BaseMiddleware):
+    """
+    Внутренний middleware: сверяет SQL-запросы хендлера с его бюджетом.
+
+    Бюджет задаётся флагом sql_budget при регистрации хендлера,
+    без флага хендлер не должен обращаться к базе.
+    В режиме log нарушения пишутся в лог, в режиме raise апдейт падает.
+    """
+
+    def __init__(self, mode: Literal["log", "raise"], sample_rate: float = 1.0) -> None:
+        self.mode = mode
+        self.sample_rate = sample_rate
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if random.random() >= self.sample_rate:  # noqa: S311
+            return await handler(event, data)
+
+        handler_object: HandlerObject = data["handler"]
+        with track_sql() as trace:
+            result = await handler(event, data)
+
+        budget = handler_object.flags.get(SQL_BUDGET_FLAG, 0)
+        problems = trace.violations(budget)
+        if problems:
+            name = handler_object.callback.__name__
+            message = f"{name}: {'; '.join(problems)}"
+            if self.mode == "raise":
+                raise SqlBudgetExceededError(message)
+            logger.warning(
+                "Бюджет SQL нарушен (%.1f мс) %s", trace.duration * 1000, message
+            )
+        return result
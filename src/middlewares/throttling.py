@@ -0,0 +1,112 @@
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+from redis.exceptions import RedisError
+
+from src.utils.token_bucket import BucketLimit, TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CALLBACK_PREFIXES = (
+    "show_all_bookings",
+    "bookings_",
+    "schedule_",
+    "accept_",
+    "reject_",
+    "pending_",
+    "set_",
+    "save_weekdays",
+    "duration_session_",
+    "send_message_to_all_client",
+    "change_info_text",
+    "confirm_change_info_text",
+)
+
+# (лимит пользователя, общий лимит) для каждой категории callback-кнопок
+THROTTLE_LIMITS: dict[str, tuple[BucketLimit, BucketLimit]] = {
+    "book": (BucketLimit(capacity=3, rate=0.5), BucketLimit(capacity=50, rate=20)),
+    "choose_date": (
+        BucketLimit(capacity=5, rate=1),
+        BucketLimit(capacity=100, rate=50),
+    ),
+    "timeline": (
+        BucketLimit(capacity=3, rate=0.5),
+        BucketLimit(capacity=50, rate=20),
+    ),
+    "admin": (BucketLimit(capacity=10, rate=3), BucketLimit(capacity=100, rate=50)),
+    "default": (
+        BucketLimit(capacity=10, rate=2),
+        BucketLimit(capacity=200, rate=100),
+    ),
+}
+
+
+def callback_category(data: str | None) -> str:
+    if not data:
+        return "default"
+    if data == "book":
+        return "book"
+    if data.startswith("choose_date_"):
+        return "choose_date"
+    if data.startswith("timeline_") or data == "confirm_booking":
+        return "timeline"
+    if data.startswith(ADMIN_CALLBACK_PREFIXES):
+        return "admin"
+    return "default"
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Внешний middleware для callback-кнопок: ограничивает частоту нажатий
+    ведрами токенов в Redis. Отклонённый callback получает ответ сразу,
+    до фильтров и хендлера, поэтому сессия БД не открывается.
+    """
+
+    def __init__(
+        self,
+        limiter: TokenBucketLimiter,
+        limits: dict[str, tuple[BucketLimit, BucketLimit]] = THROTTLE_LIMITS,
+    ) -> None:
+        self.limiter = limiter
+        self.limits = limits
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        category = callback_category(event.data)
+        user_limit, global_limit = self.limits[category]
+        try:
+            retry_after = await self.limiter.acquire(
+                category=category,
+                user_id=event.from_user.id,
+                user_limit=user_limit,
+                global_limit=global_limit,
+            )
+        except RedisError:
+            # Без Redis лучше пропустить нажатие, чем сломать бота
+            logger.warning("Троттлинг недоступен, callback пропущен без проверки")
+            return await handler(event, data)
+
+        if retry_after:
+            logger.info(
+                "Callback %s от %d отклонён троттлингом на %.1f с",
+                category,
+                event.from_user.id,
+                retry_after,
+            )
+            await event.answer(
+                f"⏳ Слишком часто, попробуйте через {math.ceil(retry_after)} с"
+            )
+            return None
+
+        return await handler(event, data)
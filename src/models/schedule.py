@@ -1,8 +1,19 @@
 from datetime import datetime
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, text
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    func,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base import Base
@@ -20,8 +31,47 @@ class VisitDurationTimeEnum(Enum):
     FOUR_HOURS = 240
 
 
+# Интервал визита [начало, конец). Запросы на пересечение должны строить
+# то же выражение, чтобы Postgres использовал индекс ограничения
+VISIT_PERIOD_SQL = (
+    "tsrange(visit_datetime, visit_datetime + visit_duration * interval '1 minute')"
+)
+
+
 class Schedule(Base):
     __tablename__ = "schedules"
+    __table_args__ = (
+        ExcludeConstraint(
+            (text(VISIT_PERIOD_SQL), "&&"),
+            name="schedules_no_overlap",
+            using="gist",
+            where=text("is_booked"),
+        ),
+        # Будущие записи пользователя: лимит записей и список «Мои записи»
+        # читают только занятые строки, прошлые визиты остаются в индексе
+        # за пределами диапазона и не сканируются
+        Index(
+            "ix_schedules_user_active",
+            "user_telegram_id",
+            "visit_datetime",
+            postgresql_where=text("is_booked"),
+        ),
+        # Списки записей для администратора: ключ пагинации (visit_datetime, id)
+        # и диапазон дат, для фильтра по статусу is_approved стоит первым
+        Index(
+            "ix_schedules_booked_visit",
+            "visit_datetime",
+            "id",
+            postgresql_where=text("is_booked"),
+        ),
+        Index(
+            "ix_schedules_approval_visit",
+            "is_approved",
+            "visit_datetime",
+            "id",
+            postgresql_where=text("is_booked"),
+        ),
+    )
 
     visit_datetime: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, unique=True
@@ -50,3 +100,11 @@ class Schedule(Base):
     )
 
     user: Mapped["User"] = relationship("User", back_populates="schedules")
+
+    @classmethod
+    def visit_period(cls) -> ColumnElement[Any]:
+        return func.tsrange(
+            cls.visit_datetime,
+            cls.visit_datetime
+            + cls.visit_duration * literal_column("interval '1 minute'"),
+        )
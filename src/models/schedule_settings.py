@@ -27,3 +27,7 @@ class ScheduleSettings(Base):
     slot_duration_minutes: Mapped[int] = mapped_column(
         Integer, nullable=False, default=30, server_default=text("30")
     )
+    # NULL — без ограничения числа будущих записей пользователя
+    max_user_bookings: Mapped[int | None] = mapped_column(
+        Integer, nullable=True, default=3, server_default=text("3")
+    )
@@ -10,7 +10,7 @@ from src.utils.get_admins_ids import get_admin_ids
 router = Router(name=__name__)
 
 
-@router.message(Command("admin", prefix="!/"))
+@router.message(Command("admin", prefix="!/"), flags={"sql_budget": 1})
 async def admin_panel(
     message: Message,
     session: AsyncSession,
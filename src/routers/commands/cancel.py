@@ -11,6 +11,8 @@ from aiogram.types import (
     ReplyKeyboardRemove,
 )
 
+from src.utils.slot_holds import SlotHoldStore
+
 router = Router(name=__name__)
 
 logger = logging.getLogger(__name__)
@@ -18,10 +20,16 @@ logger = logging.getLogger(__name__)
 
 @router.message(Command("cancel"))
 @router.callback_query(F.data == "cancel")
-async def cancel_handler(event: Message | CallbackQuery, state: FSMContext) -> None:
+async def cancel_handler(
+    event: Message | CallbackQuery,
+    state: FSMContext,
+    slot_holds: SlotHoldStore | None = None,
+) -> None:
     logger.info("Cancel handler triggered by event: %s", type(event).__name__)
     response = "✅ Все действия отменены. Вы в главном меню"
     await state.clear()
+    if slot_holds is not None and event.from_user is not None:
+        await slot_holds.release(event.from_user.id)
     if isinstance(event, CallbackQuery):
         if event.message is None:
             logger.warning("CallbackQuery has no message attached.")
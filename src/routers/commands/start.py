@@ -13,7 +13,7 @@ from src.services.user import UserService
 router = Router(name=__name__)
 
 
-@router.message(CommandStart())
+@router.message(CommandStart(), flags={"sql_budget": 3})
 async def handle_start(
     message: Message,
     session: AsyncSession,
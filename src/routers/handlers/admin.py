@@ -9,28 +9,40 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.exceptions.telegram_object import InvalidCallbackError, InvalidMessageError
 from src.keyboards.admin import (
+    BOOKINGS_DAY_FORMAT,
     confirm_change_info_text_keyboard,
-    create_all_bookings_keyboard,
+    create_bookings_filters_keyboard,
+    create_bookings_page_keyboard,
+    create_day_bookings_keyboard,
     create_duration_time_variants,
     create_status_update_keyboard,
     create_workday_selection_keyboard,
+    parse_bookings_page_callback,
 )
 from src.keyboards.calendar import create_calendar_for_available_dates
 from src.keyboards.change_schedule import create_weekday_kb
-from src.models import ScheduleSettings
-from src.services.admin import AdminService
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+from src.services.admin import AdminService, BookingsFilter
 from src.services.schedule import ScheduleService
 from src.states.broadcast_message import BroadcastMessage
 from src.states.change_info import ChangeInfo
 from src.states.days import Days
 from src.states.working_time import WorkingTimeStates
+from src.texts.bookings_filters import PERIOD_TITLES, STATUS_TITLES
 from src.texts.status_appointments import APPOINTMENT_TYPE_STATUS
 
 router = Router(name=__name__)
 logger = logging.getLogger(__name__)
 
 
-@router.callback_query(F.data == "show_all_bookings")
+def bookings_page_title(bookings_filter: BookingsFilter) -> str:
+    return (
+        f"Записи: {PERIOD_TITLES[bookings_filter.period]}, "
+        f"{STATUS_TITLES[bookings_filter.status]}"
+    )
+
+
+@router.callback_query(F.data == "show_all_bookings", flags={"sql_budget": 1})
 async def show_all_bookings(
     callback: CallbackQuery, session: AsyncSession, admin_service: AdminService
 ) -> None:
@@ -40,16 +52,148 @@ async def show_all_bookings(
         logger.error("Неверный тип callback.message в show_all_bookings")
         raise InvalidCallbackError()
 
-    bookings = await admin_service.get_all_bookings(session=session)
-    logger.debug("Найдено записей: %d", len(bookings))
+    page = await admin_service.get_bookings_page(session=session)
 
     await callback.message.edit_text(
         text="Записи и информация о клиентах",
-        reply_markup=create_all_bookings_keyboard(schedules=bookings),
+        reply_markup=create_bookings_page_keyboard(page),
+    )
+
+
+@router.callback_query(F.data == "bookings_filters")
+async def show_bookings_filters(callback: CallbackQuery) -> None:
+    if not isinstance(callback.message, Message):
+        logger.error("Неверный тип callback.message в show_bookings_filters")
+        raise InvalidMessageError()
+
+    await callback.answer()
+    await callback.message.edit_text(
+        text="Какие записи показать?",
+        reply_markup=create_bookings_filters_keyboard(),
+    )
+
+
+@router.callback_query(
+    F.data.regexp(r"^bookings_f_(all|today|week)_(any|pending|approved|rejected)$"),
+    flags={"sql_budget": 1},
+)
+async def show_filtered_bookings(
+    callback: CallbackQuery, session: AsyncSession, admin_service: AdminService
+) -> None:
+    if not isinstance(callback.data, str):
+        logger.error("callback.data не является строкой в show_filtered_bookings")
+        raise InvalidCallbackError("callback.data должен быть строкой")
+
+    if not isinstance(callback.message, Message):
+        logger.error("Неверный тип callback.message в show_filtered_bookings")
+        raise InvalidMessageError()
+
+    _, _, period, status = callback.data.split("_")
+    bookings_filter = BookingsFilter(period=period, status=status)
+    logger.info(
+        "Пользователь %s выбрал фильтр записей %s",
+        callback.from_user.id,
+        bookings_filter,
+    )
+    page = await admin_service.get_bookings_page(
+        session=session, bookings_filter=bookings_filter
+    )
+
+    await callback.answer()
+    await callback.message.edit_text(
+        text=bookings_page_title(bookings_filter),
+        reply_markup=create_bookings_page_keyboard(page, bookings_filter),
+    )
+
+
+@router.callback_query(
+    F.data.regexp(
+        r"^bookings_(prev|next)_(all|today|week)_(any|pending|approved|rejected)"
+        r"_\d{14}_\d+$"
+    ),
+    flags={"sql_budget": 2},
+)
+async def show_bookings_page(
+    callback: CallbackQuery, session: AsyncSession, admin_service: AdminService
+) -> None:
+    if not isinstance(callback.data, str):
+        logger.error("callback.data не является строкой в show_bookings_page")
+        raise InvalidCallbackError("callback.data должен быть строкой")
+
+    if not isinstance(callback.message, Message):
+        logger.error("Неверный тип callback.message в show_bookings_page")
+        raise InvalidMessageError()
+
+    direction, bookings_filter, cursor = parse_bookings_page_callback(callback.data)
+    logger.info(
+        "Пользователь %s листает записи %s: %s от %s",
+        callback.from_user.id,
+        bookings_filter,
+        direction,
+        cursor,
+    )
+    if direction == "next":
+        page = await admin_service.get_bookings_page(
+            session=session, bookings_filter=bookings_filter, after=cursor
+        )
+    else:
+        page = await admin_service.get_bookings_page(
+            session=session, bookings_filter=bookings_filter, before=cursor
+        )
+    if not page.rows:
+        # Записи соседней страницы успели пройти или отмениться
+        page = await admin_service.get_bookings_page(
+            session=session, bookings_filter=bookings_filter
+        )
+
+    await callback.answer()
+    await callback.message.edit_text(
+        text=bookings_page_title(bookings_filter),
+        reply_markup=create_bookings_page_keyboard(page, bookings_filter),
+    )
+
+
+@router.callback_query(
+    F.data.regexp(r"^bookings_day_(today|\d{8})$"), flags={"sql_budget": 1}
+)
+async def show_day_bookings(
+    callback: CallbackQuery, session: AsyncSession, admin_service: AdminService
+) -> None:
+    if not isinstance(callback.data, str):
+        logger.error("callback.data не является строкой в show_day_bookings")
+        raise InvalidCallbackError("callback.data должен быть строкой")
+
+    if not isinstance(callback.message, Message):
+        logger.error("Неверный тип callback.message в show_day_bookings")
+        raise InvalidMessageError()
+
+    day_str = callback.data.removeprefix("bookings_day_")
+    day = (
+        datetime.now().date()
+        if day_str == "today"
+        else datetime.strptime(day_str, BOOKINGS_DAY_FORMAT).date()
+    )
+    logger.info("Пользователь %s открыл записи на %s", callback.from_user.id, day)
+
+    rows = await admin_service.get_day_bookings(session=session, day=day)
+    lines = [f"📅 Записи на {day:%d.%m.%Y}"]
+    lines += [
+        f"{APPOINTMENT_TYPE_STATUS.get(row.is_approved)} {row.visit_datetime:%H:%M} "
+        f"{row.first_name or '-'}, 📞 {row.phone or '-'}, "
+        f"☺ {'@' + row.username if row.username else '-'}"
+        for row in rows
+    ]
+    if not rows:
+        lines.append("Записей нет")
+
+    await callback.answer()
+    await callback.message.edit_text(
+        text="\n".join(lines),
+        reply_markup=create_day_bookings_keyboard(rows, day),
     )
 
 
-@router.callback_query(F.data.startswith("schedule_"))
+@router.callback_query(F.data.startswith("schedule_"), flags={"sql_budget": 1})
 async def on_schedule_click(
     callback: CallbackQuery, session: AsyncSession, admin_service: AdminService
 ) -> None:
@@ -88,7 +232,9 @@ async def on_schedule_click(
     )
 
 
-@router.callback_query(F.data.regexp(r"^(accept|reject|pending)_(\d+)$"))
+@router.callback_query(
+    F.data.regexp(r"^(accept|reject|pending)_(\d+)$"), flags={"sql_budget": 3}
+)
 async def on_status_change(
     callback: CallbackQuery,
     session: AsyncSession,
@@ -130,13 +276,13 @@ async def on_status_change(
     )
 
 
-@router.callback_query(F.data == "set_first_day")
+@router.callback_query(F.data == "set_first_day", flags={"sql_budget": 0})
 async def set_first_day(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
     schedule_service: ScheduleService,
-    schedule_settings: ScheduleSettings,
+    schedule_settings: ScheduleSettingsSchema,
 ) -> None:
     if not isinstance(callback.message, Message):
         raise InvalidMessageError()
@@ -154,13 +300,15 @@ async def set_first_day(
     await state.set_state(Days.first_day)
 
 
-@router.callback_query(Days.first_day, F.data.startswith("choose_date_"))
+@router.callback_query(
+    Days.first_day, F.data.startswith("choose_date_"), flags={"sql_budget": 0}
+)
 async def set_last_day(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
     schedule_service: ScheduleService,
-    schedule_settings: ScheduleSettings,
+    schedule_settings: ScheduleSettingsSchema,
 ) -> None:
     if not isinstance(callback.message, Message):
         raise InvalidMessageError()
@@ -224,7 +372,9 @@ async def choose_dates_to_change_handler(
     )
 
 
-@router.callback_query(Days.apply_changes, F.data.startswith("set_days_"))
+@router.callback_query(
+    Days.apply_changes, F.data.startswith("set_days_"), flags={"sql_budget": 1}
+)
 async def set_days(
     callback: CallbackQuery,
     state: FSMContext,
@@ -274,7 +424,7 @@ async def set_days(
 @router.callback_query(F.data == "set_working_days_per_week")
 async def set_working_days_per_week_handler(
     callback: CallbackQuery,
-    schedule_settings: ScheduleSettings,
+    schedule_settings: ScheduleSettingsSchema,
 ) -> None:
     if not isinstance(callback.message, Message):
         raise InvalidMessageError()
@@ -286,12 +436,12 @@ async def set_working_days_per_week_handler(
     )
 
 
-@router.callback_query(F.data.startswith("set_weekday_"))
+@router.callback_query(F.data.startswith("set_weekday_"), flags={"sql_budget": 1})
 async def change_weekday_status(
     callback: CallbackQuery,
     session: AsyncSession,
     admin_service: AdminService,
-    schedule_settings: ScheduleSettings,
+    schedule_settings: ScheduleSettingsSchema,
 ) -> None:
     if not isinstance(callback.message, Message):
         raise InvalidMessageError()
@@ -301,7 +451,7 @@ async def change_weekday_status(
 
     day_index = int(callback.data.replace("set_weekday_", ""))
 
-    await admin_service.toggle_working_day(
+    schedule_settings = await admin_service.toggle_working_day(
         session=session, day_index=day_index, schedule_settings=schedule_settings
     )
 
@@ -333,7 +483,10 @@ async def get_message_from_admin(callback: CallbackQuery, state: FSMContext) ->
     await state.set_state(BroadcastMessage.waiting_for_text)
 
 
-@router.message(BroadcastMessage.waiting_for_text, flags={"type_operation": "typing"})
+@router.message(
+    BroadcastMessage.waiting_for_text,
+    flags={"sql_budget": 1, "type_operation": "typing"},
+)
 async def send_message_from_admin(
     message: Message,
     state: FSMContext,
@@ -409,7 +562,7 @@ async def choose_session_duration(
     )
 
 
-@router.callback_query(F.data.startswith("duration_session_"))
+@router.callback_query(F.data.startswith("duration_session_"), flags={"sql_budget": 1})
 async def set_session_duration(
     callback: CallbackQuery, session: AsyncSession, admin_service: AdminService
 ) -> None:
@@ -447,7 +600,7 @@ async def get_working_time(
     await state.set_state(WorkingTimeStates.waiting_for_time_range)
 
 
-@router.message(WorkingTimeStates.waiting_for_time_range)
+@router.message(WorkingTimeStates.waiting_for_time_range, flags={"sql_budget": 1})
 async def set_working_time_handler(
     message: Message,
     state: FSMContext,
@@ -1,8 +1,10 @@
 import logging
-from datetime import datetime
+from datetime import datetime, time
+from uuid import uuid4
 
 from aiogram import Bot, F, Router
 from aiogram.enums.parse_mode import ParseMode
+from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,28 +12,33 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.exceptions.booking import BookingError
 from src.exceptions.telegram_object import InvalidBotError, InvalidCallbackError
 from src.keyboards.admin import create_status_update_keyboard
-from src.keyboards.book import create_booking_list_kb, create_confirm_cancel_booking_kb
+from src.keyboards.book import (
+    create_booking_list_kb,
+    create_confirm_booking_kb,
+    create_confirm_cancel_booking_kb,
+)
 from src.keyboards.calendar import (
-    create_calendar_for_available_dates,
+    create_booking_calendar,
     create_choose_time_keyboard,
 )
-from src.models.schedule_settings import ScheduleSettings
+from src.schemas.schedule_settings import ScheduleSettingsSchema
 from src.services.schedule import ScheduleService
 from src.states.cancel_booking import CancelBooking
 from src.states.choose_visit_datetime import ChooseVisitDatetime
 from src.texts.status_appointments import APPOINTMENT_TYPE_STATUS
+from src.utils.slot_holds import SlotHoldStore
 
 router = Router(name=__name__)
 logger = logging.getLogger(__name__)
 
 
-@router.callback_query(F.data == "book")
+@router.callback_query(F.data == "book", flags={"sql_budget": 1})
 async def show_days(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
     schedule_service: ScheduleService,
-    schedule_settings: ScheduleSettings,
+    schedule_settings: ScheduleSettingsSchema,
 ) -> None:
     logger.info("Пользователь %s начал бронирование.", callback.from_user.id)
     if not isinstance(callback.message, Message):
@@ -39,28 +46,34 @@ async def show_days(
         raise InvalidCallbackError("callback.message должен быть объектом Message")
     await callback.answer()
 
-    available_dates = await schedule_service.get_available_dates(
-        session=session, schedule_settings=schedule_settings
+    keyboard = await create_booking_calendar(
+        session=session,
+        schedule_service=schedule_service,
+        schedule_settings=schedule_settings,
     )
 
     await state.set_state(ChooseVisitDatetime.waiting_for_date)
     await state.update_data(telegram_id=callback.from_user.id)
 
     await callback.message.edit_text(
-        text="Выберите дату для записи",
-        reply_markup=create_calendar_for_available_dates(available_dates),
+        text="Выберите дату для записи", reply_markup=keyboard
     )
 
 
 @router.callback_query(
-    ChooseVisitDatetime.waiting_for_date, F.data.startswith("choose_date_")
+    StateFilter(
+        ChooseVisitDatetime.waiting_for_date, ChooseVisitDatetime.waiting_for_confirm
+    ),
+    F.data.startswith("choose_date_"),
+    flags={"sql_budget": 1},
 )
 async def show_time(
     callback: CallbackQuery,
     state: FSMContext,
     session: AsyncSession,
     schedule_service: ScheduleService,
-    schedule_settings: ScheduleSettings,
+    schedule_settings: ScheduleSettingsSchema,
+    slot_holds: SlotHoldStore | None = None,
 ) -> None:
     logger.info("Пользователь %s выбрал дату для записи.", callback.from_user.id)
     if not isinstance(callback.message, Message) or not isinstance(callback.data, str):
@@ -78,6 +91,14 @@ async def show_time(
         visit_date=visit_date, schedule_settings=schedule_settings
     )
 
+    held_times: set[time] = set()
+    if slot_holds is not None:
+        # Возврат к выбору времени снимает удержание прежнего слота
+        await slot_holds.release(callback.from_user.id)
+        held_times = await slot_holds.held_by_others(
+            callback.from_user.id, visit_date, time_slots
+        )
+
     await callback.message.edit_text(
         text="Выберете удобное время",
         reply_markup=await create_choose_time_keyboard(
@@ -85,6 +106,8 @@ async def show_time(
             session=session,
             schedule_service=schedule_service,
             visit_date=visit_date,
+            schedule_settings=schedule_settings,
+            held_times=held_times,
         ),
     )
 
@@ -95,33 +118,98 @@ async def send_message_to_choose_new_time(callback: CallbackQuery) -> None:
 
 
 @router.callback_query(
-    ChooseVisitDatetime.waiting_for_time, F.data.startswith("timeline_")
+    ChooseVisitDatetime.waiting_for_time,
+    F.data.startswith("timeline_"),
+    flags={"sql_budget": 0},
+)
+async def choose_time(
+    callback: CallbackQuery,
+    state: FSMContext,
+    slot_holds: SlotHoldStore | None = None,
+) -> None:
+    """Удерживает слот за пользователем, пока он подтверждает запись"""
+    logger.info("Пользователь %s выбирает время для записи.", callback.from_user.id)
+    if not isinstance(callback.message, Message) or not isinstance(callback.data, str):
+        logger.warning("Ошибка в данных Callback при выборе времени")
+        raise InvalidCallbackError("ошибка в данных Callback")
+
+    visit_time_str = callback.data.replace("timeline_", "")
+    visit_time = datetime.strptime(visit_time_str, "%H:%M").time()
+
+    data = await state.get_data()
+    visit_date_str = data.get("visit_date_str")
+    if not visit_date_str:
+        logger.warning("Дата %s не найдена", visit_date_str)
+        raise BookingError(f"Дата {visit_date_str} не найдена")
+
+    visit_date = datetime.strptime(visit_date_str, "%Y_%m_%d").date()
+
+    if slot_holds is not None and not await slot_holds.hold(
+        callback.from_user.id, datetime.combine(visit_date, visit_time)
+    ):
+        logger.info("Слот %s %s удерживает другой пользователь", visit_date, visit_time)
+        await callback.answer(
+            "Это время сейчас подтверждает другой клиент, выберите другое",
+            show_alert=True,
+        )
+        return
+
+    await callback.answer()
+    # Новая попытка записи: повторная запись на тот же слот после отмены
+    # не должна получить сохранённый результат прошлой попытки
+    await state.update_data(visit_time_str=visit_time_str, booking_attempt=uuid4().hex)
+    await state.set_state(ChooseVisitDatetime.waiting_for_confirm)
+
+    await callback.message.edit_text(
+        text=f"Подтвердите запись на"
+        f" <b>{visit_date.strftime('%d.%m.%Y')}</b>,"
+        f" время <b>{visit_time.strftime('%H:%M')}</b>",
+        parse_mode=ParseMode.HTML,
+        reply_markup=create_confirm_booking_kb(visit_date_str),
+    )
+
+
+@router.callback_query(
+    ChooseVisitDatetime.waiting_for_confirm,
+    F.data == "confirm_booking",
+    flags={
+        "sql_budget": 5,
+        "idempotent": ("visit_date_str", "visit_time_str", "booking_attempt"),
+    },
 )
 async def finish_booking(
     callback: CallbackQuery,
     state: FSMContext,
     schedule_service: ScheduleService,
     session: AsyncSession,
-    schedule_settings: ScheduleSettings,
-) -> None:
-    logger.info("Пользователь %s выбирает время для записи.", callback.from_user.id)
+    schedule_settings: ScheduleSettingsSchema,
+    slot_holds: SlotHoldStore | None = None,
+) -> str | None:
+    """
+    Возвращает итог записи, его получит повторное нажатие кнопки.
+    Если записаться не удалось, возвращает None: повтор после
+    освобождения слота снова дойдёт до хендлера
+    """
+    logger.info("Пользователь %s подтверждает запись.", callback.from_user.id)
     if not isinstance(callback.message, Message) or not isinstance(callback.data, str):
         logger.warning("Ошибка в данных Callback при подтверждении записи")
         raise InvalidCallbackError("ошибка в данных Callback")
 
     await callback.answer()
 
-    visit_time_str = callback.data.replace("timeline_", "")
-    visit_time = datetime.strptime(visit_time_str, "%H:%M").time()
-
     data = await state.get_data()
     visit_date_str = data.get("visit_date_str")
+    visit_time_str = data.get("visit_time_str")
     user_telegram_id = data.get("telegram_id")
 
     if not visit_date_str:
         logger.warning("Дата %s не найдена", visit_date_str)
         raise BookingError(f"Дата {visit_date_str} не найдена")
 
+    if not visit_time_str:
+        logger.warning("Время %s не найдено", visit_time_str)
+        raise BookingError(f"Время {visit_time_str} не найдено")
+
     if not user_telegram_id:
         logger.warning("Телеграм id пользователя не найден.")
         raise BookingError("Телеграм id пользователя не найден.")
@@ -130,15 +218,21 @@ async def finish_booking(
         raise InvalidBotError("Не удалось получить экземпляр Bot")
 
     visit_date = datetime.strptime(visit_date_str, "%Y_%m_%d").date()
+    visit_time = datetime.strptime(visit_time_str, "%H:%M").time()
 
-    new_slot = await schedule_service.create_busy_slot(
-        bot=callback.bot,
-        session=session,
-        visit_date=visit_date,
-        visit_time=visit_time,
-        user_telegram_id=user_telegram_id,
-        schedule_settings=schedule_settings,
-    )
+    try:
+        new_slot = await schedule_service.create_busy_slot(
+            bot=callback.bot,
+            session=session,
+            visit_date=visit_date,
+            visit_time=visit_time,
+            user_telegram_id=user_telegram_id,
+            schedule_settings=schedule_settings,
+        )
+    finally:
+        # Дальше слот защищает запись в БД, удержание больше не нужно
+        if slot_holds is not None:
+            await slot_holds.release(callback.from_user.id)
 
     if new_slot is None:
         await callback.message.edit_text(
@@ -147,7 +241,7 @@ async def finish_booking(
             parse_mode=ParseMode.HTML,
         )
         await state.clear()
-        return
+        return None
 
     await schedule_service.notify_admins(
         session=session,
@@ -180,9 +274,13 @@ async def finish_booking(
     )
 
     await state.clear()
+    return (
+        f"✅ Вы записаны на {visit_date.strftime('%d.%m.%Y')} "
+        f"{visit_time.strftime('%H:%M')}"
+    )
 
 
-@router.callback_query(F.data == "user_bookings")
+@router.callback_query(F.data == "user_bookings", flags={"sql_budget": 1})
 async def my_bookings(
     callback: CallbackQuery, schedule_service: ScheduleService, session: AsyncSession
 ) -> None:
@@ -226,7 +324,7 @@ async def my_bookings(
     )
 
 
-@router.callback_query(F.data == "cancel_booking")
+@router.callback_query(F.data == "cancel_booking", flags={"sql_budget": 1})
 async def choose_date_for_cancel_booking(
     callback: CallbackQuery,
     session: AsyncSession,
@@ -276,7 +374,9 @@ async def confirm_cancel_booking(
     datetime_to_cancel = datetime.strptime(datetime_str_to_cancel, "%Y-%m-%d %H:%M:%S")
 
     await state.set_state(CancelBooking.waiting_for_cancel_datetime)
-    await state.update_data(datetime_str_to_cancel=datetime_str_to_cancel)
+    await state.update_data(
+        datetime_str_to_cancel=datetime_str_to_cancel, cancel_attempt=uuid4().hex
+    )
 
     await callback.message.edit_text(
         text=f"Точно отменить запись на 🗓"
@@ -288,14 +388,20 @@ async def confirm_cancel_booking(
 
 
 @router.callback_query(
-    CancelBooking.waiting_for_cancel_datetime, F.data.in_(["confirm_yes", "confirm_no"])
+    CancelBooking.waiting_for_cancel_datetime,
+    F.data.in_(["confirm_yes", "confirm_no"]),
+    flags={
+        "sql_budget": 2,
+        "idempotent": ("datetime_str_to_cancel", "cancel_attempt"),
+    },
 )
 async def cancel_booking(
     callback: CallbackQuery,
     state: FSMContext,
     schedule_service: ScheduleService,
     session: AsyncSession,
-) -> None:
+) -> str:
+    """Возвращает итог отмены, его получит повторное нажатие кнопки"""
     logger.info("Пользователь %s завершает отмену записи.", callback.from_user.id)
     if not isinstance(callback.message, Message) or not isinstance(callback.data, str):
         logger.warning("Ошибка в данных Callback при завершении отмены")
@@ -347,6 +453,7 @@ async def cancel_booking(
             user_telegram_id,
             datetime_to_cancel,
         )
+        result = "✖️ Запись отменена"
     else:
         await callback.message.edit_text(
             text=f"Ваша запись 🗓"
@@ -360,5 +467,7 @@ async def cancel_booking(
             user_telegram_id,
             datetime_to_cancel,
         )
+        result = "Запись остаётся без изменений"
 
     await state.clear()
+    return result
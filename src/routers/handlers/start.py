@@ -62,7 +62,7 @@ async def add_phone(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.message.edit_text(text="Введите номер в формате +7XXXXXXXXXX:")
 
 
-@router.callback_query(F.data == "profile_skip_phone")
+@router.callback_query(F.data == "profile_skip_phone", flags={"sql_budget": 3})
 async def skip_phone(
     callback: CallbackQuery,
     state: FSMContext,
@@ -80,7 +80,7 @@ async def skip_phone(
     await finish_registration(callback, data, state, session, user_service)
 
 
-@router.message(RegistrationState.waiting_for_phone)
+@router.message(RegistrationState.waiting_for_phone, flags={"sql_budget": 3})
 async def save_phone(
     message: Message,
     state: FSMContext,
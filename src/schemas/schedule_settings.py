@@ -0,0 +1,30 @@
+from datetime import datetime, time
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ScheduleSettingsSchema(BaseModel):
+    """Неизменяемый снимок настроек расписания, общий для всех апдейтов"""
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: Annotated[int, Field(gt=0, description="Settings ID")]
+    working_days: Annotated[
+        tuple[int, ...], Field(description="Working weekdays, 0 - monday")
+    ]
+    start_working_time: Annotated[time, Field(description="Start of working day")]
+    end_working_time: Annotated[time, Field(description="End of working day")]
+    booking_days_ahead: Annotated[
+        int, Field(gt=0, description="How many days ahead booking is open")
+    ]
+    slot_duration_minutes: Annotated[
+        int, Field(gt=0, description="Duration of one session in minutes")
+    ]
+    max_user_bookings: Annotated[
+        int | None,
+        Field(default=3, gt=0, description="Future bookings per user, None - no limit"),
+    ]
+    updated_at: Annotated[
+        datetime | None, Field(default=None, title="date of updating")
+    ]
@@ -1,16 +1,29 @@
 import asyncio
 import logging
 import re
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 
 from aiogram import Bot
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramAPIError
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    delete,
+    false,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
-from sqlalchemy.orm.attributes import flag_modified
 
 from src.exceptions.booking import BookingError
 from src.keyboards.calendar import WEEKDAYS
@@ -18,11 +31,84 @@ from src.models import User
 from src.models.day_off import DaysOff
 from src.models.schedule import Schedule
 from src.models.schedule_settings import ScheduleSettings
+from src.schemas.schedule_settings import ScheduleSettingsSchema
 from src.services.base import BaseService
+from src.services.occupancy import track_occupancy_change
+from src.services.schedule import slot_template
+from src.services.schedule_settings import schedule_settings_store
 from src.texts.status_appointments import APPOINTMENT_TYPE_STATUS
 
 logger = logging.getLogger(__name__)
 
+BOOKINGS_PAGE_SIZE = 10
+
+# Ключ пагинации: (visit_datetime, id) последней или первой записи страницы
+BookingCursor = tuple[datetime, int]
+BookingRow = Row[tuple[int, datetime, bool]]
+DayBookingRow = Row[tuple[int, datetime, bool, str, str | None, str | None]]
+
+# Условия на is_approved записаны через сравнение, не через IS TRUE/IS FALSE:
+# только такие условия Postgres ищет по индексу ix_schedules_approval_visit
+APPROVAL_CONDITIONS: dict[str, ColumnElement[bool] | None] = {
+    "any": None,
+    "pending": Schedule.is_approved.is_(None),
+    "approved": Schedule.is_approved == true(),
+    "rejected": Schedule.is_approved == false(),
+}
+BOOKING_PERIODS = ("all", "today", "week")
+
+
+@dataclass(frozen=True, slots=True)
+class BookingsFilter:
+    """
+    Фильтр списка записей. period: all — все будущие, today — сегодня,
+    week — 7 дней начиная с сегодня. status — ключ APPROVAL_CONDITIONS
+    """
+
+    period: str = "all"
+    status: str = "any"
+
+    def __post_init__(self) -> None:
+        if self.period not in BOOKING_PERIODS or self.status not in (
+            APPROVAL_CONDITIONS
+        ):
+            raise ValueError(
+                f"Неизвестный фильтр записей: {self.period}, {self.status}"
+            )
+
+    def conditions(self, now: datetime) -> list[ColumnElement[bool]]:
+        conditions: list[ColumnElement[bool]] = [Schedule.is_booked.expression]
+        if self.period == "all":
+            conditions.append(Schedule.visit_datetime >= now)
+        else:
+            today_start = datetime.combine(now.date(), time.min)
+            days = 1 if self.period == "today" else 7
+            conditions += [
+                Schedule.visit_datetime >= today_start,
+                Schedule.visit_datetime < today_start + timedelta(days=days),
+            ]
+        approval = APPROVAL_CONDITIONS[self.status]
+        if approval is not None:
+            conditions.append(approval)
+        return conditions
+
+
+@dataclass(frozen=True, slots=True)
+class BookingPage:
+    """Страница списка записей для администратора, только показываемые поля"""
+
+    rows: Sequence[BookingRow]
+    has_prev: bool
+    has_next: bool
+
+    @property
+    def first_cursor(self) -> BookingCursor:
+        return self.rows[0].visit_datetime, self.rows[0].id
+
+    @property
+    def last_cursor(self) -> BookingCursor:
+        return self.rows[-1].visit_datetime, self.rows[-1].id
+
 
 class AdminService(BaseService[Schedule]):
     """
@@ -58,23 +144,94 @@ class AdminService(BaseService[Schedule]):
         return booking
 
     @staticmethod
-    async def get_all_bookings(
+    def bookings_page_stmt(
+        bookings_filter: BookingsFilter,
+        after: BookingCursor | None = None,
+        before: BookingCursor | None = None,
+        page_size: int = BOOKINGS_PAGE_SIZE,
+    ) -> Select[tuple[int, datetime, bool]]:
+        key = tuple_(Schedule.visit_datetime, Schedule.id)
+        stmt = select(Schedule.id, Schedule.visit_datetime, Schedule.is_approved).where(
+            *bookings_filter.conditions(datetime.now())
+        )
+        if before is not None:
+            stmt = stmt.where(key < tuple_(*map(literal, before))).order_by(
+                Schedule.visit_datetime.desc(), Schedule.id.desc()
+            )
+        else:
+            if after is not None:
+                stmt = stmt.where(key > tuple_(*map(literal, after)))
+            stmt = stmt.order_by(Schedule.visit_datetime, Schedule.id)
+        return stmt.limit(page_size + 1)
+
+    @staticmethod
+    async def get_bookings_page(
         session: AsyncSession,
-    ) -> list[Schedule]:
+        bookings_filter: BookingsFilter | None = None,
+        after: BookingCursor | None = None,
+        before: BookingCursor | None = None,
+        page_size: int = BOOKINGS_PAGE_SIZE,
+    ) -> BookingPage:
         """
-        Получение всех бронирований (не указаны прошлые бронирования)
+        Страница бронирований с пагинацией по ключу (visit_datetime, id):
+        after — следующая страница, before — предыдущая, без курсора — первая.
+        Запрос читает page_size + 1 строк, сколько бы записей ни было всего
         """
-        stmt = (
-            select(Schedule)
-            .options(joinedload(Schedule.user))
-            .where(and_(Schedule.is_booked, Schedule.visit_datetime >= datetime.now()))
-            .order_by(Schedule.visit_datetime)
+        stmt = AdminService.bookings_page_stmt(
+            bookings_filter or BookingsFilter(), after, before, page_size
         )
         result = await session.execute(stmt)
-        bookings = list(result.scalars().all())
+        rows = list(result.all())
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if before is not None:
+            rows.reverse()
+            page = BookingPage(rows=rows, has_prev=has_more, has_next=True)
+        else:
+            page = BookingPage(rows=rows, has_prev=after is not None, has_next=has_more)
+
+        logger.info(
+            "Страница бронирований %s: %d записей, назад=%s, вперёд=%s",
+            bookings_filter,
+            len(page.rows),
+            page.has_prev,
+            page.has_next,
+        )
+        return page
+
+    @staticmethod
+    def day_bookings_stmt(
+        day: date,
+    ) -> Select[tuple[int, datetime, bool, str, str | None, str | None]]:
+        day_start = datetime.combine(day, time.min)
+        return (
+            select(
+                Schedule.id,
+                Schedule.visit_datetime,
+                Schedule.is_approved,
+                User.first_name,
+                User.username,
+                User.phone,
+            )
+            .outerjoin(User, User.telegram_id == Schedule.user_telegram_id)
+            .where(
+                Schedule.is_booked,
+                Schedule.visit_datetime >= day_start,
+                Schedule.visit_datetime < day_start + timedelta(days=1),
+            )
+            .order_by(Schedule.visit_datetime, Schedule.id)
+        )
 
-        logger.info("Получены все бронирования: %d", len(bookings))
-        return bookings
+    @staticmethod
+    async def get_day_bookings(
+        session: AsyncSession, day: date
+    ) -> Sequence[DayBookingRow]:
+        """Записи одного дня с именами и телефонами клиентов"""
+        result = await session.execute(AdminService.day_bookings_stmt(day))
+        rows = result.all()
+        logger.info("Записи на %s: %d", day, len(rows))
+        return rows
 
     async def set_booking_approval(
         self,
@@ -139,17 +296,24 @@ class AdminService(BaseService[Schedule]):
             await session.execute(
                 delete(DaysOff).where(DaysOff.day_off.between(first_day, last_day))
             )
+            track_occupancy_change(
+                session, ("set_days_off", first_day, last_day, False)
+            )
             await session.commit()
 
         else:
-            current_date = first_day
-            while current_date <= last_day:
-                await session.execute(
-                    insert(DaysOff)
-                    .values(day_off=current_date)
-                    .on_conflict_do_nothing(index_elements=["day_off"])
-                )
-                current_date += timedelta(days=1)
+            days_count = (last_day - first_day).days + 1
+            days_off = [
+                {"day_off": first_day + timedelta(days=offset)}
+                for offset in range(days_count)
+            ]
+            # Один многострочный INSERT вместо запроса на каждый день
+            await session.execute(
+                insert(DaysOff)
+                .values(days_off)
+                .on_conflict_do_nothing(index_elements=["day_off"])
+            )
+            track_occupancy_change(session, ("set_days_off", first_day, last_day, True))
             await session.commit()
 
         logger.info(
@@ -161,22 +325,24 @@ class AdminService(BaseService[Schedule]):
 
     @staticmethod
     async def toggle_working_day(
-        session: AsyncSession, day_index: int, schedule_settings: ScheduleSettings
-    ) -> None:
-        """Переключает день между рабочим и нерабочим, обновляет запись в БД."""
+        session: AsyncSession,
+        day_index: int,
+        schedule_settings: ScheduleSettingsSchema | ScheduleSettings,
+    ) -> ScheduleSettingsSchema:
+        """
+        Переключает день между рабочим и нерабочим, обновляет запись в БД.
+        Возвращает новый снимок настроек.
+        """
 
         if not 0 <= day_index <= len(WEEKDAYS):
             raise ValueError("day_index должен быть в диапазоне 0-6")
 
-        if day_index in schedule_settings.working_days:
-            schedule_settings.working_days.remove(day_index)
-        else:
-            schedule_settings.working_days.append(day_index)
-
-        schedule_settings.working_days.sort()
-        flag_modified(schedule_settings, "working_days")
+        working_days = set(schedule_settings.working_days)
+        working_days ^= {day_index}
 
-        await session.commit()
+        return await AdminService._update_schedule_settings(
+            session, working_days=sorted(working_days)
+        )
 
     @staticmethod
     async def send_message_from_admin_to_all_users(
@@ -262,27 +428,42 @@ class AdminService(BaseService[Schedule]):
             "Попытка изменения времени сеанса администратором на %s минут",
             duration_minutes,
         )
-        stmt = (
-            update(ScheduleSettings)
-            .values(slot_duration_minutes=duration_minutes)
-            .returning(ScheduleSettings.slot_duration_minutes)
+        schedule_settings = await AdminService._update_schedule_settings(
+            session, slot_duration_minutes=duration_minutes
         )
-        result = await session.execute(stmt)
-        await session.commit()
+        slot_template.cache_clear()
 
         logger.info(" Временя сеанса изменено на %s минут", duration_minutes)
-        return result.scalar_one()
+        return schedule_settings.slot_duration_minutes
 
     @staticmethod
     async def set_working_time(
         session: AsyncSession, start_working_time: time, end_working_time: time
     ) -> None:
-        stmt = update(ScheduleSettings).values(
-            start_working_time=start_working_time, end_working_time=end_working_time
+        await AdminService._update_schedule_settings(
+            session,
+            start_working_time=start_working_time,
+            end_working_time=end_working_time,
         )
-        await session.execute(stmt)
+        slot_template.cache_clear()
+
+    @staticmethod
+    async def _update_schedule_settings(
+        session: AsyncSession, **values: object
+    ) -> ScheduleSettingsSchema:
+        """Обновляет строку настроек и после коммита заменяет снимок в памяти"""
+        # updated_at проставляется явно: по нему другие экземпляры видят изменения
+        stmt = (
+            update(ScheduleSettings)
+            .values(**values, updated_at=func.now())
+            .returning(ScheduleSettings)
+        )
+        result = await session.execute(stmt)
+        schedule_settings = result.scalar_one()
         await session.commit()
 
+        return schedule_settings_store.update(schedule_settings)
+
     @staticmethod
     def validate_working_time(input_text: str) -> tuple[bool, str | tuple[time, time]]:
         """
@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import time as monotonic_time
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from typing import Any
+
+from sqlalchemy import (
+    DateTime,
+    cast,
+    event,
+    false,
+    inspect,
+    literal,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.day_off import DaysOff
+from src.models.schedule import Schedule, VisitDurationTimeEnum
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+
+logger = logging.getLogger(__name__)
+
+OCCUPANCY_CHANGES = "occupancy_changes"
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+class DayIntervals:
+    """
+    Занятые интервалы [start, end) одного дня в минутах от полуночи,
+    отсортированные по началу. max_ends[i] — самый поздний конец среди
+    первых i + 1 интервалов, поэтому проверка пересечения корректна даже
+    для старых записей, которые пересекаются между собой.
+    """
+
+    __slots__ = ("ends", "max_ends", "starts")
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.max_ends: list[int] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def add(self, start: int, end: int) -> None:
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self._refresh_max_ends(index)
+
+    def remove(self, start: int) -> None:
+        index = bisect_left(self.starts, start)
+        if index < len(self.starts) and self.starts[index] == start:
+            del self.starts[index]
+            del self.ends[index]
+            self._refresh_max_ends(index)
+
+    def is_free(self, start: int, end: int) -> bool:
+        """O(log n): интервалы, начавшиеся до end, должны закончиться к start"""
+        index = bisect_left(self.starts, end) - 1
+        return index < 0 or self.max_ends[index] <= start
+
+    def _refresh_max_ends(self, index: int) -> None:
+        previous = self.max_ends[index - 1] if index else 0
+        del self.max_ends[index:]
+        self.max_ends.extend(accumulate(self.ends[index:], max, initial=previous))
+        del self.max_ends[index]
+
+
+class OccupancyIndex:
+    """
+    Занятость на горизонте записи: отсортированные интервалы визитов по дням.
+
+    Строится одним запросом, затем обновляется на месте после коммитов,
+    которые меняют записи или выходные, и сдвигается вперёд в полночь.
+    Раз в rebuild_interval секунд индекс перестраивается целиком, чтобы
+    подхватить изменения, сделанные другими экземплярами бота.
+
+    version() меняется при любом изменении занятости и служит ключом
+    для кэша готовых клавиатур.
+    """
+
+    def __init__(self, rebuild_interval: float) -> None:
+        self.rebuild_interval = rebuild_interval
+        self._busy: dict[date, DayIntervals] = {}
+        self._days_off: set[date] = set()
+        self._first_day: date | None = None
+        self._last_day: date | None = None
+        self._built_at = 0.0
+        # Изменение, пришедшее во время загрузки, требует повторной перестройки
+        self._generation = 0
+        # Эпоха растёт, когда загруженное из БД содержимое подменяет индекс
+        self._epoch = 0
+        self._day_versions: dict[date, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def sync(
+        self, session: AsyncSession, schedule_settings: ScheduleSettingsSchema
+    ) -> None:
+        """Перестраивает или сдвигает индекс, если он устарел"""
+        first_day = datetime.now().date()
+        last_day = first_day + timedelta(days=schedule_settings.booking_days_ahead)
+        if self._is_current(first_day, last_day):
+            return
+
+        # Загрузку ведёт один запрос, остальные ждут её и перепроверяют индекс
+        async with self._lock:
+            if self._is_current(first_day, last_day):
+                return
+            if (
+                self._first_day is None
+                or self._last_day is None
+                or first_day < self._first_day
+                or monotonic_time.monotonic() - self._built_at > self.rebuild_interval
+            ):
+                await self._rebuild(session, first_day, last_day)
+            else:
+                await self._roll(session, first_day, last_day, self._last_day)
+
+    def invalidate(self) -> None:
+        """Следующий sync перестроит индекс целиком"""
+        self._generation += 1
+        self._built_at = 0.0
+
+    def reset(self) -> None:
+        self.invalidate()
+        self._busy.clear()
+        self._days_off.clear()
+        self._day_versions.clear()
+        self._first_day = self._last_day = None
+
+    def _is_current(self, first_day: date, last_day: date) -> bool:
+        return (
+            first_day == self._first_day
+            and last_day == self._last_day
+            and monotonic_time.monotonic() - self._built_at <= self.rebuild_interval
+        )
+
+    def version(self, visit_date: date | None = None) -> tuple[int, int]:
+        """Версия занятости одного дня или, без даты, всего горизонта"""
+        if visit_date is None:
+            return self._epoch, self._generation
+        return self._epoch, self._day_versions.get(visit_date, 0)
+
+    def is_free(self, visit_date: date, visit_time: time, duration: int) -> bool:
+        if not self._in_horizon(visit_date):
+            return False
+        intervals = self._busy.get(visit_date)
+        start = _minutes(visit_time)
+        return intervals is None or intervals.is_free(start, start + duration)
+
+    def free_times(
+        self, visit_date: date, candidates: Iterable[time], duration: int
+    ) -> set[time]:
+        """Начала из candidates, с которых свободно duration минут подряд"""
+        return {
+            visit_time
+            for visit_time in candidates
+            if self.is_free(visit_date, visit_time, duration)
+        }
+
+    def free_counts(
+        self, working_days: Iterable[int], candidates: Sequence[time], duration: int
+    ) -> dict[date, int]:
+        """
+        Число свободных начал из candidates по каждому доступному дню.
+        Дни без записей не проверяются слот за слотом.
+        """
+        counts: dict[date, int] = {}
+        for day in self.available_dates(working_days):
+            intervals = self._busy.get(day)
+            if not intervals:
+                counts[day] = len(candidates)
+                continue
+            counts[day] = sum(
+                intervals.is_free(start, start + duration)
+                for start in map(_minutes, candidates)
+            )
+        return counts
+
+    def available_dates(self, working_days: Iterable[int]) -> set[date]:
+        if self._first_day is None or self._last_day is None:
+            return set()
+        weekdays = set(working_days)
+        days_count = (self._last_day - self._first_day).days + 1
+        return {
+            day
+            for day in (self._first_day + timedelta(days=i) for i in range(days_count))
+            if day.weekday() in weekdays and day not in self._days_off
+        }
+
+    def book(self, visit_datetime: datetime, duration: int) -> None:
+        self._touch(visit_datetime.date())
+        self._add(visit_datetime, duration)
+
+    def release(self, visit_datetime: datetime) -> None:
+        self._touch(visit_datetime.date())
+        intervals = self._busy.get(visit_datetime.date())
+        if intervals is not None:
+            intervals.remove(_minutes(visit_datetime.time()))
+
+    def set_days_off(self, first_day: date, last_day: date, is_day_off: bool) -> None:
+        day = first_day
+        while day <= last_day:
+            self._touch(day)
+            if is_day_off:
+                self._days_off.add(day)
+            else:
+                self._days_off.discard(day)
+            day += timedelta(days=1)
+
+    def _touch(self, visit_date: date) -> None:
+        self._generation += 1
+        self._day_versions[visit_date] = self._day_versions.get(visit_date, 0) + 1
+
+    def _add(self, visit_datetime: datetime, duration: int) -> None:
+        visit_date = visit_datetime.date()
+        if not self._in_horizon(visit_date):
+            return
+        start = _minutes(visit_datetime.time())
+        self._busy.setdefault(visit_date, DayIntervals()).add(start, start + duration)
+
+    def _in_horizon(self, visit_date: date) -> bool:
+        return (
+            self._first_day is not None
+            and self._last_day is not None
+            and self._first_day <= visit_date <= self._last_day
+        )
+
+    async def _rebuild(
+        self, session: AsyncSession, first_day: date, last_day: date
+    ) -> None:
+        generation = self._generation
+        # Загрузка идёт в новые структуры: пока она ждёт БД, читатели
+        # видят прежний индекс вместо пустого
+        busy, days_off = await self._load(session, first_day, last_day)
+        self._busy, self._days_off, self._day_versions = busy, days_off, {}
+        self._first_day, self._last_day = first_day, last_day
+        # Эпоха меняется только при замене содержимого. Клавиатура, собранная
+        # во время загрузки, остаётся в кэше под прежней версией и не находится
+        self._epoch += 1
+        # Если индекс меняли во время загрузки, следующий вызов перестроит индекс заново
+        self._built_at = (
+            monotonic_time.monotonic() if generation == self._generation else 0.0
+        )
+        logger.info(
+            "Индекс занятости перестроен: %s — %s, занятых дней %d",
+            first_day,
+            last_day,
+            len(self._busy),
+        )
+
+    async def _roll(
+        self,
+        session: AsyncSession,
+        first_day: date,
+        last_day: date,
+        previous_last_day: date,
+    ) -> None:
+        generation = self._generation
+        busy: dict[date, DayIntervals] = {}
+        days_off: set[date] = set()
+        if last_day > previous_last_day:
+            busy, days_off = await self._load(
+                session, previous_last_day + timedelta(days=1), last_day
+            )
+        self._first_day, self._last_day = first_day, last_day
+        self._busy = {d: v for d, v in self._busy.items() if self._in_horizon(d)} | busy
+        self._days_off = {d for d in self._days_off if self._in_horizon(d)} | days_off
+        self._day_versions = {
+            d: v for d, v in self._day_versions.items() if self._in_horizon(d)
+        }
+        self._epoch += 1
+        # Изменения новых дней во время загрузки могли не попасть в индекс
+        if generation != self._generation:
+            self._built_at = 0.0
+        logger.info("Индекс занятости сдвинут: %s — %s", first_day, last_day)
+
+    @staticmethod
+    async def _load(
+        session: AsyncSession, first_day: date, last_day: date
+    ) -> tuple[dict[date, DayIntervals], set[date]]:
+        """Записи и выходные за период одним запросом"""
+        bookings = select(
+            Schedule.visit_datetime,
+            Schedule.visit_duration,
+            false().label("is_day_off"),
+        ).where(
+            Schedule.is_booked,
+            Schedule.visit_datetime >= datetime.combine(first_day, time.min),
+            Schedule.visit_datetime
+            < datetime.combine(last_day + timedelta(days=1), time.min),
+        )
+        days_off_stmt = select(
+            cast(DaysOff.day_off, DateTime), literal(0), true().label("is_day_off")
+        ).where(DaysOff.day_off.between(first_day, last_day))
+
+        busy: dict[date, DayIntervals] = {}
+        days_off: set[date] = set()
+        result = await session.execute(union_all(bookings, days_off_stmt))
+        for moment, duration, is_day_off in result.all():
+            if is_day_off:
+                days_off.add(moment.date())
+            else:
+                start = _minutes(moment.time())
+                busy.setdefault(moment.date(), DayIntervals()).add(
+                    start, start + duration
+                )
+        return busy, days_off
+
+
+occupancy_index = OccupancyIndex(rebuild_interval=settings.OCCUPANCY_REBUILD_SECONDS)
+
+
+def track_occupancy_change(
+    session: AsyncSession | Session, change: tuple[Any, ...]
+) -> None:
+    """Запоминает изменение, индекс обновится после коммита сессии"""
+    session.info.setdefault(OCCUPANCY_CHANGES, []).append(change)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_schedule_changes(session: Session, *_: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, Schedule):
+            continue
+        if obj in session.deleted:
+            track_occupancy_change(session, ("release", obj.visit_datetime))
+        elif obj in session.new or inspect(obj).attrs.is_booked.history.has_changes():
+            change: tuple[Any, ...] = ("release", obj.visit_datetime)
+            if obj.is_booked:
+                duration = obj.visit_duration or VisitDurationTimeEnum.HALF_HOUR.value
+                change = ("book", obj.visit_datetime, duration)
+            track_occupancy_change(session, change)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session: Session) -> None:
+    for action, *args in session.info.pop(OCCUPANCY_CHANGES, ()):
+        getattr(occupancy_index, action)(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(OCCUPANCY_CHANGES, None)
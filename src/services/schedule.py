@@ -1,28 +1,107 @@
 import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
+from enum import Enum
+from functools import lru_cache
 
 from aiogram import Bot
 from aiogram.enums import ParseMode
 from aiogram.types import InlineKeyboardMarkup
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    DateTime,
+    Integer,
+    Select,
+    and_,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.exceptions.booking import BookingError
 from src.exceptions.telegram_object import InvalidBotError
 from src.models.day_off import DaysOff
 from src.models.schedule import Schedule
-from src.models.schedule_settings import ScheduleSettings
+from src.models.user import User
+from src.schemas.schedule_settings import ScheduleSettingsSchema
 from src.services.base import BaseService
+from src.services.occupancy import occupancy_index, track_occupancy_change
 from src.utils.get_admins_ids import get_admin_ids
 
 logger = logging.getLogger(__name__)
 
 
+class SlotStatus(Enum):
+    """Результат проверки слота, значение — текст причины для пользователя"""
+
+    AVAILABLE = "Слот доступен для записи"
+    OUT_OF_RANGE = "Выбранная дата недоступна для записи"
+    NOT_WORKING_DAY = "Запись доступна только в рабочие дни"
+    DAY_OFF = "В этот день мастер не работает"
+    INVALID_TIME = "Выбранное время недоступно для записи"
+    BOOKED = "Это время уже занято"
+
+
+@dataclass(frozen=True, slots=True)
+class SlotTemplate:
+    """Начала слотов рабочего дня: по порядку и множеством для проверки за O(1)"""
+
+    times: tuple[time, ...]
+    members: frozenset[time]
+
+
+@lru_cache(maxsize=16)
+def slot_template(start: time, end: time, duration_minutes: int) -> SlotTemplate:
+    """
+    Сетка слотов не зависит от даты, поэтому строится один раз на набор
+    настроек. Ключ — сами настройки, устаревший шаблон не может вернуться,
+    а сброс после изменения настроек только освобождает память.
+    """
+    times = []
+    step = timedelta(minutes=duration_minutes)
+    start_visit = datetime.combine(date.min, start)
+    last_visit = datetime.combine(date.min, end) - step
+    while start_visit <= last_visit:
+        times.append(start_visit.time())
+        start_visit += step
+
+    logger.debug("Сгенерировано слотов: %d", len(times))
+    return SlotTemplate(times=tuple(times), members=frozenset(times))
+
+
 class ScheduleService(BaseService[Schedule]):
     def __init__(self) -> None:
         super().__init__(Schedule)
 
+    @staticmethod
+    def _active_bookings_count(user_telegram_id: int, limit: int) -> Select[tuple[int]]:
+        """
+        Число будущих записей пользователя, но не больше limit.
+        По индексу ix_schedules_user_active читается не больше limit строк,
+        сколько бы прошлых визитов ни накопилось.
+        """
+        active = (
+            select(literal(1))
+            .where(
+                and_(
+                    Schedule.user_telegram_id == user_telegram_id,
+                    Schedule.is_booked,
+                    Schedule.visit_datetime > datetime.now(),
+                )
+            )
+            .limit(limit)
+            .subquery()
+        )
+        return select(func.count()).select_from(active)
+
     @staticmethod
     async def _check_user_booking_limit(
         session: AsyncSession,
@@ -38,16 +117,8 @@ class ScheduleService(BaseService[Schedule]):
         if max_user_bookings is None:
             return True
 
-        stmt = (
-            select(func.count())
-            .select_from(Schedule)
-            .where(
-                and_(
-                    Schedule.user_telegram_id == user_telegram_id,
-                    Schedule.is_booked,
-                    Schedule.visit_datetime > datetime.now(),
-                )
-            )
+        stmt = ScheduleService._active_bookings_count(
+            user_telegram_id, max_user_bookings
         )
         result = await session.execute(stmt)
         current_count = int(result.scalar_one() or 0)
@@ -56,7 +127,9 @@ class ScheduleService(BaseService[Schedule]):
 
     @staticmethod
     def is_working_day(
-        visit_date: date, schedule_settings: ScheduleSettings, all_days_off: set[date]
+        visit_date: date,
+        schedule_settings: ScheduleSettingsSchema,
+        all_days_off: set[date],
     ) -> bool:
         """Проверяет, является ли дата рабочим днём (пн-пт) и не выходной у мастера"""
         is_available_day = (
@@ -73,122 +146,213 @@ class ScheduleService(BaseService[Schedule]):
     async def get_available_dates(
         self,
         session: AsyncSession,
-        schedule_settings: ScheduleSettings,
+        schedule_settings: ScheduleSettingsSchema,
         check_days_off: bool = True,
     ) -> set[date]:
         """Возвращает список доступных дат для записи
-        (По умолчанию 14 рабочих дней вперёд)"""
-        available_dates: set[date] = set()
-        current_date = datetime.now().date()
-        last_date = current_date + timedelta(days=schedule_settings.booking_days_ahead)
-
-        days_off = set()
+        (По умолчанию 14 рабочих дней вперёд).
+        С учётом выходных ответ берётся из индекса занятости"""
         if check_days_off:
-            stmt = select(DaysOff.day_off).where(
-                DaysOff.day_off.between(current_date, last_date)
+            await occupancy_index.sync(session, schedule_settings)
+            available_dates = occupancy_index.available_dates(
+                schedule_settings.working_days
             )
-
-            result = await session.execute(stmt)
-            days_off = set(result.scalars().all())
-
-        while current_date <= last_date:
-            if self.is_working_day(
-                visit_date=current_date,
-                schedule_settings=schedule_settings,
-                all_days_off=days_off,
-            ):
-                available_dates.add(current_date)
-            current_date += timedelta(days=1)
+        else:
+            available_dates = set()
+            current_date = datetime.now().date()
+            last_date = current_date + timedelta(
+                days=schedule_settings.booking_days_ahead
+            )
+            while current_date <= last_date:
+                if self.is_working_day(
+                    visit_date=current_date,
+                    schedule_settings=schedule_settings,
+                    all_days_off=set(),
+                ):
+                    available_dates.add(current_date)
+                current_date += timedelta(days=1)
 
         logger.info(
             "Найдено %d доступных дат: %s", len(available_dates), available_dates
         )
         return available_dates
 
+    @staticmethod
+    async def get_availability_version(
+        session: AsyncSession,
+        schedule_settings: ScheduleSettingsSchema,
+        visit_date: date | None = None,
+    ) -> tuple[int, int]:
+        """
+        Версия занятости дня или всего горизонта, если дата не указана.
+        Меняется после записи, отмены и изменения выходных
+        """
+        await occupancy_index.sync(session, schedule_settings)
+        return occupancy_index.version(visit_date)
+
+    async def get_day_capacity(
+        self, session: AsyncSession, schedule_settings: ScheduleSettingsSchema
+    ) -> dict[date, int]:
+        """
+        Число свободных слотов по каждой доступной дате горизонта записи.
+        Ответ берётся из индекса занятости, полностью занятые дни дают 0
+        """
+        await occupancy_index.sync(session, schedule_settings)
+        capacity = occupancy_index.free_counts(
+            schedule_settings.working_days,
+            self.get_time_slots(datetime.now().date(), schedule_settings),
+            schedule_settings.slot_duration_minutes,
+        )
+        logger.info(
+            "Свободные слоты по %d датам, полностью заняты: %d",
+            len(capacity),
+            sum(1 for free in capacity.values() if not free),
+        )
+        return capacity
+
+    @staticmethod
+    def get_slot_template(schedule_settings: ScheduleSettingsSchema) -> SlotTemplate:
+        return slot_template(
+            schedule_settings.start_working_time,
+            schedule_settings.end_working_time,
+            schedule_settings.slot_duration_minutes,
+        )
+
     @staticmethod
     def get_time_slots(
-        visit_date: date, schedule_settings: ScheduleSettings
-    ) -> list[time]:
-        """Генерирует список временных слотов для указанной даты"""
-        time_slots = []
-        last_visit = datetime.combine(
-            visit_date, schedule_settings.end_working_time
-        ) - timedelta(minutes=schedule_settings.slot_duration_minutes)
+        visit_date: date,  # noqa: ARG004
+        schedule_settings: ScheduleSettingsSchema,
+    ) -> tuple[time, ...]:
+        """Временные слоты для указанной даты, у всех рабочих дней сетка одна"""
+        return ScheduleService.get_slot_template(schedule_settings).times
+
+    @staticmethod
+    def is_slot_start(
+        visit_time: time, schedule_settings: ScheduleSettingsSchema
+    ) -> bool:
+        """То же, что visit_time in get_time_slots(...), но за O(1)"""
+        template = ScheduleService.get_slot_template(schedule_settings)
+        return visit_time in template.members
 
-        start_visit = datetime.combine(visit_date, schedule_settings.start_working_time)
+    def _check_slot_settings(
+        self,
+        visit_date: date,
+        visit_time: time,
+        schedule_settings: ScheduleSettingsSchema,
+    ) -> SlotStatus | None:
+        """Проверки слота, которым не нужна база"""
+        today = datetime.now().date()
+        last_date = today + timedelta(days=schedule_settings.booking_days_ahead)
+        if not today <= visit_date <= last_date:
+            return SlotStatus.OUT_OF_RANGE
+        if visit_date.weekday() not in schedule_settings.working_days:
+            return SlotStatus.NOT_WORKING_DAY
+        if not self.is_slot_start(visit_time, schedule_settings):
+            return SlotStatus.INVALID_TIME
+        return None
+
+    async def check_slot(
+        self,
+        session: AsyncSession,
+        visit_date: date,
+        visit_time: time,
+        schedule_settings: ScheduleSettingsSchema,
+    ) -> SlotStatus:
+        """
+        Проверяет, можно ли записаться на слот, и возвращает причину отказа.
+        Проверки по настройкам идут в памяти, выходной и занятость слота
+        проверяются одним запросом.
+        """
+        status = self._check_slot_settings(visit_date, visit_time, schedule_settings)
+        if status is None:
+            start = datetime.combine(visit_date, visit_time)
+            end = start + timedelta(minutes=schedule_settings.slot_duration_minutes)
+            stmt = select(
+                exists().where(DaysOff.day_off == visit_date).label("is_day_off"),
+                exists()
+                .where(Schedule.is_booked, self._overlaps(start, end))
+                .label("is_booked"),
+            )
+            result = await session.execute(stmt)
+            is_day_off, is_booked = result.one()
 
-        while start_visit <= last_visit:
-            time_slots.append(start_visit.time())
-            start_visit += timedelta(minutes=schedule_settings.slot_duration_minutes)
+            if is_day_off or is_booked:
+                status = SlotStatus.DAY_OFF if is_day_off else SlotStatus.BOOKED
+                # Изменение могло прийти от другого экземпляра бота
+                if occupancy_index.is_free(
+                    visit_date, visit_time, schedule_settings.slot_duration_minutes
+                ):
+                    occupancy_index.invalidate()
+            else:
+                status = SlotStatus.AVAILABLE
 
-        logger.debug("Сгенерировано слотов: %d", len(time_slots))
-        return time_slots
+        logger.debug("Слот %s %s: %s", visit_date, visit_time, status.name)
+        return status
 
     async def is_slot_available(
         self,
         session: AsyncSession,
         visit_date: date,
         visit_time: time,
-        schedule_settings: ScheduleSettings,
+        schedule_settings: ScheduleSettingsSchema,
     ) -> bool:
-        """Проверяет доступность слота для бронирования"""
-        dt = datetime.combine(visit_date, visit_time)
-
-        # Проверка, что дата находится среди доступных дат
-        # (учитывает выходные и нерабочие дни)
-        available_dates = await self.get_available_dates(
-            session=session, schedule_settings=schedule_settings, check_days_off=True
+        """
+        Проверяет доступность слота для бронирования.
+        Возвращает False, если слот занят, и бросает BookingError,
+        если на эту дату или время записаться нельзя.
+        """
+        status = await self.check_slot(
+            session, visit_date, visit_time, schedule_settings
         )
-        if visit_date not in available_dates:
-            logger.warning("Дата %s недоступна для записи", visit_date)
-            raise BookingError("Выбранная дата недоступна для записи")
-
-        stmt_day = select(DaysOff).where(DaysOff.day_off == visit_date)
-        result = await session.execute(stmt_day)
-        day_off = result.scalar_one_or_none()
+        if status in (SlotStatus.AVAILABLE, SlotStatus.BOOKED):
+            return status is SlotStatus.AVAILABLE
 
-        if day_off:
-            logger.warning("Дата %s является выходным", visit_date)
-            raise BookingError("Выбранная дата является выходным днем")
+        logger.warning("Слот %s %s недоступен: %s", visit_date, visit_time, status.name)
+        raise BookingError(status.value)
 
-        if visit_date.weekday() not in schedule_settings.working_days:
-            logger.warning("Дата %s не входит в рабочие дни", visit_date)
-            raise BookingError("Запись доступна только в рабочие дни")
-
-        if visit_time not in self.get_time_slots(
-            visit_date=visit_date, schedule_settings=schedule_settings
-        ):
-            logger.warning("Недоступное время: %s", visit_time)
-            raise BookingError("Выбранное время недоступно для записи")
-
-        stmt_booking = select(Schedule.is_booked).where(Schedule.visit_datetime == dt)
-        result = await session.execute(stmt_booking)
-        booked = result.scalar_one_or_none()
+    @staticmethod
+    def _overlaps(start: datetime, end: datetime) -> ColumnElement[bool]:
+        """Пересечение визита с [start, end), использует индекс schedules_no_overlap"""
+        return Schedule.visit_period().op("&&", is_comparison=True)(
+            func.tsrange(start, end)
+        )
 
-        is_available = booked is None or not booked
-        logger.debug("Слот %s доступен: %s", dt, is_available)
-        return is_available
+    async def get_free_times(
+        self,
+        session: AsyncSession,
+        visit_date: date,
+        schedule_settings: ScheduleSettingsSchema,
+    ) -> set[time]:
+        """
+        Слоты дня, с которых свободна вся длительность сеанса.
+        Ответ берётся из индекса занятости, O(log n) на слот.
+        """
+        await occupancy_index.sync(session, schedule_settings)
+        return occupancy_index.free_times(
+            visit_date,
+            self.get_time_slots(visit_date, schedule_settings),
+            schedule_settings.slot_duration_minutes,
+        )
 
     @staticmethod
     async def get_booking_slots_for_date(
         session: AsyncSession,
         visit_date: date,
-    ) -> list[datetime]:
+    ) -> list[tuple[datetime, datetime]]:
+        """Занятые интервалы [начало, конец), пересекающие дату"""
         logger.info("Получение занятых слотов на дату: %s", visit_date)
-        start_datetime = datetime.combine(visit_date, time.min)
-        end_datetime = datetime.combine(visit_date, time.max)
+        day_start = datetime.combine(visit_date, time.min)
+        day_end = day_start + timedelta(days=1)
+        visit_end = Schedule.visit_datetime + Schedule.visit_duration * literal_column(
+            "interval '1 minute'"
+        )
         stmt = (
-            select(Schedule.visit_datetime)
-            .where(
-                and_(
-                    Schedule.visit_datetime.between(start_datetime, end_datetime),
-                    Schedule.is_booked,
-                )
-            )
+            select(Schedule.visit_datetime, visit_end)
+            .where(Schedule.is_booked, ScheduleService._overlaps(day_start, day_end))
             .order_by(Schedule.visit_datetime)
         )
         result = await session.execute(stmt)
-        slots = list(result.scalars().all())
+        slots = [(start, end) for start, end in result.all()]
         logger.info("Занятые слоты на дату %s: %s", visit_date, slots)
         return slots
 
@@ -199,42 +363,108 @@ class ScheduleService(BaseService[Schedule]):
         visit_date: date,
         visit_time: time,
         user_telegram_id: int,
-        schedule_settings: ScheduleSettings,
-        max_user_bookings: int = 3,
+        schedule_settings: ScheduleSettingsSchema,
     ) -> Schedule | None:
-        """Создаёт занятый слот в расписании"""
-        visit_datetime = datetime.combine(visit_date, visit_time)
+        """
+        Создаёт занятый слот одним INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+        Гонку за время решает ограничение schedules_no_overlap: пересекающийся
+        интервал не вставится, даже если начало другое. Лимит записей
+        из настроек проверяется в той же транзакции под блокировкой строки
+        пользователя, поэтому параллельные записи одного пользователя идут
+        по очереди. Причина отказа выясняется отдельным запросом только
+        при неудаче.
+        """
+        status = self._check_slot_settings(visit_date, visit_time, schedule_settings)
+        if status is not None:
+            logger.warning("Слот %s %s: %s", visit_date, visit_time, status.name)
+            raise BookingError(status.value)
 
-        if not await self.is_slot_available(
-            session, visit_date, visit_time, schedule_settings
-        ):
-            logger.warning("Слот уже занят: %s %s", visit_date, visit_time)
-            raise BookingError("Это время уже занято")
+        visit_datetime = datetime.combine(visit_date, visit_time)
+        max_user_bookings = schedule_settings.max_user_bookings
+        conditions = [~exists().where(DaysOff.day_off == visit_date)]
+        if max_user_bookings is not None:
+            await session.execute(
+                select(User.telegram_id)
+                .where(User.telegram_id == user_telegram_id)
+                .with_for_update()
+            )
+            conditions.append(
+                self._active_bookings_count(
+                    user_telegram_id, max_user_bookings
+                ).scalar_subquery()
+                < max_user_bookings
+            )
 
-        allowed = await self._check_user_booking_limit(
-            session, user_telegram_id, max_user_bookings
+        stmt = (
+            insert(Schedule)
+            .from_select(
+                ["visit_datetime", "visit_duration", "is_booked", "user_telegram_id"],
+                select(
+                    literal(visit_datetime, DateTime),
+                    literal(schedule_settings.slot_duration_minutes, Integer),
+                    true(),
+                    literal(user_telegram_id, BigInteger),
+                ).where(*conditions),
+            )
+            # Без index_elements конфликтом считается и пересечение интервалов
+            # по ограничению schedules_no_overlap, не только совпадение начала
+            .on_conflict_do_nothing()
+            .returning(Schedule)
         )
-        if not allowed:
-            await bot.send_message(
-                chat_id=user_telegram_id,
-                text=f"⚠️ Достигнут лимит бронирований ({max_user_bookings})."
-                f" Отмените предыдущую запись, чтобы создать новую.",
+        result = await session.scalars(stmt)
+        new_slot = result.one_or_none()
+
+        if new_slot is None:
+            await self._explain_failed_booking(
+                session=session,
+                bot=bot,
+                visit_date=visit_date,
+                visit_time=visit_time,
+                user_telegram_id=user_telegram_id,
+                schedule_settings=schedule_settings,
+                max_user_bookings=max_user_bookings,
             )
             return None
 
-        new_slot = Schedule(
-            visit_datetime=visit_datetime,
-            visit_duration=schedule_settings.slot_duration_minutes,
-            is_booked=True,
-            user_telegram_id=user_telegram_id,
+        track_occupancy_change(
+            session,
+            ("book", visit_datetime, schedule_settings.slot_duration_minutes),
         )
-
-        await self.add(session=session, obj=new_slot)
         logger.info(
             "Создан новый слот: %s для пользователя %d", new_slot, user_telegram_id
         )
         return new_slot
 
+    async def _explain_failed_booking(
+        self,
+        session: AsyncSession,
+        bot: Bot,
+        visit_date: date,
+        visit_time: time,
+        user_telegram_id: int,
+        schedule_settings: ScheduleSettingsSchema,
+        max_user_bookings: int | None,
+    ) -> None:
+        if not await self._check_user_booking_limit(
+            session, user_telegram_id, max_user_bookings
+        ):
+            await bot.send_message(
+                chat_id=user_telegram_id,
+                text=f"⚠️ Достигнут лимит бронирований ({max_user_bookings})."
+                f" Отмените предыдущую запись, чтобы создать новую.",
+            )
+            return
+
+        status = await self.check_slot(
+            session, visit_date, visit_time, schedule_settings
+        )
+        # Слот мог освободиться между INSERT и проверкой, для пользователя
+        # это всё равно гонка за занятый слот
+        if status is SlotStatus.AVAILABLE:
+            status = SlotStatus.BOOKED
+        logger.warning("Слот не создан: %s %s, %s", visit_date, visit_time, status.name)
+        raise BookingError(status.value)
+
     @staticmethod
     async def show_user_schedules(
         session: AsyncSession, user_telegram_id: int
@@ -279,9 +509,13 @@ class ScheduleService(BaseService[Schedule]):
         )
 
         result = await session.execute(stmt)
+        deleted = result.rowcount
+        # Пустой DELETE не освобождает слот: время может принадлежать чужой записи
+        if deleted:
+            track_occupancy_change(session, ("release", datetime_to_cancel))
         await session.commit()
 
-        if not result.rowcount:
+        if not deleted:
             logger.warning(
                 "Запись не найдена: user_id=%d, datetime=%s",
                 user_telegram_id,
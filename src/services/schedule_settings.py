@@ -0,0 +1,72 @@
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models.schedule_settings import ScheduleSettings
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduleSettingsStore:
+    """
+    Хранит в памяти снимок настроек расписания.
+
+    Снимок загружается один раз и заменяется целиком при изменении настроек.
+    Не чаще раза в revalidate_interval секунд сверяется updated_at строки,
+    чтобы подхватить изменения, сделанные другим экземпляром бота.
+    """
+
+    def __init__(self, revalidate_interval: float) -> None:
+        self.revalidate_interval = revalidate_interval
+        self._snapshot: ScheduleSettingsSchema | None = None
+        self._checked_at = 0.0
+
+    async def get(self, session: AsyncSession) -> ScheduleSettingsSchema:
+        if self._snapshot is None:
+            return await self.load(session)
+
+        if time.monotonic() - self._checked_at >= self.revalidate_interval:
+            await self._revalidate(session, self._snapshot)
+
+        return self._snapshot
+
+    async def load(self, session: AsyncSession) -> ScheduleSettingsSchema:
+        result = await session.execute(select(ScheduleSettings).limit(1))
+        schedule_settings = result.scalar_one_or_none()
+
+        if not schedule_settings:
+            logger.error("Настройки расписания не найдены в базе")
+            raise RuntimeError("Настройки расписания не найдены")
+
+        return self.update(schedule_settings)
+
+    def update(self, schedule_settings: ScheduleSettings) -> ScheduleSettingsSchema:
+        """Заменяет снимок свежей строкой настроек из базы"""
+        snapshot = ScheduleSettingsSchema.model_validate(schedule_settings)
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        logger.debug("Снимок настроек расписания обновлён: %s", snapshot)
+        return snapshot
+
+    async def _revalidate(
+        self, session: AsyncSession, snapshot: ScheduleSettingsSchema
+    ) -> None:
+        # Отметка ставится заранее, чтобы параллельные апдейты не сверялись разом
+        self._checked_at = time.monotonic()
+        stmt = select(ScheduleSettings.updated_at).where(
+            ScheduleSettings.id == snapshot.id
+        )
+        result = await session.execute(stmt)
+
+        if result.scalar_one_or_none() != snapshot.updated_at:
+            logger.info("Настройки расписания изменились, снимок перечитывается")
+            await self.load(session)
+
+
+schedule_settings_store = ScheduleSettingsStore(
+    revalidate_interval=settings.SCHEDULE_SETTINGS_REVALIDATE_SECONDS
+)
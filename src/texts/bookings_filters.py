@@ -0,0 +1,12 @@
+PERIOD_TITLES = {
+    "all": "все будущие",
+    "today": "сегодня",
+    "week": "на неделю",
+}
+
+STATUS_TITLES = {
+    "any": "любой статус",
+    "pending": "ожидают",
+    "approved": "подтверждены",
+    "rejected": "отклонены",
+}
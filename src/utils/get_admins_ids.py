@@ -1,17 +1,91 @@
-from sqlalchemy import select
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from src.config import settings
 from src.models import User
 
+logger = logging.getLogger(__name__)
+
+ADMIN_IDS_CHANGED = "admin_ids_changed"
+
+
+class AdminIdsCache:
+    """
+    Кэш множества админов: settings.ADMIN_IDS вместе с админами из базы.
+
+    Живёт ttl секунд и сбрасывается сразу после коммита,
+    в котором у пользователя поменялся is_admin.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._admin_ids: frozenset[int] | None = None
+        self._expires_at = 0.0
+        # Загрузка, начатая до вызова invalidate, не должна записать старый результат
+        self._generation = 0
+
+    async def get(self, session: AsyncSession) -> frozenset[int]:
+        if self._admin_ids is not None and time.monotonic() < self._expires_at:
+            return self._admin_ids
+
+        generation = self._generation
+        admin_ids = await self._load(session)
+
+        if generation == self._generation:
+            self._admin_ids = admin_ids
+            self._expires_at = time.monotonic() + self.ttl
+        return admin_ids
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._admin_ids = None
+        logger.debug("Кэш id администраторов сброшен")
+
+    @staticmethod
+    async def _load(session: AsyncSession) -> frozenset[int]:
+        stmt = select(User.telegram_id).where(User.is_admin.is_(True))
+        result = await session.execute(stmt)
+        admin_id_from_db = result.scalars().all()
+
+        admin_ids = set()
+        admin_ids.update(settings.ADMIN_IDS)
+        admin_ids.update(admin_id_from_db)
+
+        return frozenset(admin_id for admin_id in admin_ids if admin_id)
+
+
+admin_ids_cache = AdminIdsCache(ttl=settings.ADMIN_IDS_CACHE_TTL)
+
+
+async def get_admin_ids(session: AsyncSession) -> frozenset[int]:
+    return await admin_ids_cache.get(session)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_admin_changes(session: Session, *_: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, User):
+            continue
+        if obj in session.dirty:
+            changed = inspect(obj).attrs.is_admin.history.has_changes()
+        else:
+            changed = bool(obj.is_admin)
+        if changed:
+            session.info[ADMIN_IDS_CHANGED] = True
+            return
+
 
-async def get_admin_ids(session: AsyncSession) -> set[int]:
-    stmt = select(User.telegram_id).where(User.is_admin.is_(True))
-    result = await session.execute(stmt)
-    admin_id_from_db = result.scalars().all()
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(ADMIN_IDS_CHANGED, False):
+        admin_ids_cache.invalidate()
 
-    admin_ids = set()
-    admin_ids.update(settings.ADMIN_IDS)
-    admin_ids.update(admin_id_from_db)
 
-    return {admin_id for admin_id in admin_ids if admin_id}
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(ADMIN_IDS_CHANGED, None)
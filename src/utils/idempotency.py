@@ -0,0 +1,49 @@
+from redis.asyncio.client import Redis
+
+PENDING = "__pending__"
+
+# Если хотя бы один ключ уже есть, возвращает значение ключа, иначе занимает
+# все ключи маркером PENDING. Проверка и захват идут одним EVALSHA
+CLAIM_LUA = """
+for i = 1, #KEYS do
+    local value = redis.call('GET', KEYS[i])
+    if value then
+        return value
+    end
+end
+for i = 1, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[1], 'PX', ARGV[2])
+end
+return false
+"""
+
+
+class IdempotencyStore:
+    def __init__(self, redis: Redis, ttl: float, prefix: str = "idempotency") -> None:
+        self.redis = redis
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+        self._claim = redis.register_script(CLAIM_LUA)
+
+    def keys(self, callback_id: str, user_id: int, action: str) -> list[str]:
+        return [
+            f"{self.prefix}:callback:{callback_id}",
+            f"{self.prefix}:action:{user_id}:{action}",
+        ]
+
+    async def claim(self, keys: list[str]) -> str | None:
+        """
+        Возвращает None, если запрос первый и ключи заняты за ним.
+        Для повтора возвращает PENDING или сохранённый результат первого запроса.
+        """
+        value = await self._claim(keys=keys, args=[PENDING, self.ttl_ms])
+        return value if isinstance(value, str) else None
+
+    async def finish(self, keys: list[str], result: str) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, result, px=self.ttl_ms)
+            await pipe.execute()
+
+    async def release(self, keys: list[str]) -> None:
+        await self.redis.delete(*keys)
@@ -1,19 +1,47 @@
 from aiogram import Dispatcher
 from aiogram.utils.chat_action import ChatActionMiddleware
+from redis.asyncio.client import Redis
 
-from src.middlewares.admin_service import AdminServiceMiddleware
-from src.middlewares.db import DatabaseMiddleware
+from src.config import settings
+from src.middlewares.dependencies import DependencyMiddleware
 from src.middlewares.error_handler import ErrorHandlerMiddleware
-from src.middlewares.schedule_service import ScheduleServiceMiddleware
-from src.middlewares.schedule_settings import ScheduleSettingsMiddleware
-from src.middlewares.user_service import UserServiceMiddleware
+from src.middlewares.idempotency import IdempotencyMiddleware
+from src.middlewares.metrics import MetricsMiddleware
+from src.middlewares.sql_budget import SqlBudgetMiddleware
+from src.middlewares.throttling import ThrottlingMiddleware
+from src.utils.idempotency import IdempotencyStore
+from src.utils.token_bucket import TokenBucketLimiter
 
 
-def register_middlewares(dp: Dispatcher) -> None:
-    dp.update.middleware(DatabaseMiddleware())
+def register_middlewares(dp: Dispatcher, redis: Redis | None = None) -> None:
+    """Роутеры должны быть подключены к dp до вызова, чтобы собрать их зависимости"""
+    dependencies = DependencyMiddleware()
+    dependencies.compile(dp)
+
     dp.update.middleware(ErrorHandlerMiddleware())
-    dp.update.middleware(UserServiceMiddleware())
-    dp.update.middleware(ScheduleServiceMiddleware())
-    dp.update.middleware(ScheduleSettingsMiddleware())
-    dp.update.middleware(AdminServiceMiddleware())
+    if redis is not None and settings.THROTTLING_ENABLED:
+        # Внешний middleware: отклонённые нажатия не доходят до фильтров и БД
+        dp.callback_query.outer_middleware(
+            ThrottlingMiddleware(TokenBucketLimiter(redis))
+        )
+    if settings.METRICS_ENABLED:
+        metrics = MetricsMiddleware()
+        dp.message.middleware(metrics)
+        dp.callback_query.middleware(metrics)
+    if redis is not None:
+        # До зависимостей: повторное нажатие не открывает сессию БД
+        dp.callback_query.middleware(
+            IdempotencyMiddleware(
+                IdempotencyStore(redis, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
+            )
+        )
+    dp.message.middleware(dependencies)
+    dp.callback_query.middleware(dependencies)
+    if settings.SQL_BUDGET_MODE != "off":
+        # Регистрируется последним, чтобы считать только запросы самого хендлера
+        sql_budget = SqlBudgetMiddleware(
+            mode=settings.SQL_BUDGET_MODE, sample_rate=settings.SQL_BUDGET_SAMPLE_RATE
+        )
+        dp.message.middleware(sql_budget)
+        dp.callback_query.middleware(sql_budget)
     dp.message.middleware(ChatActionMiddleware())
@@ -0,0 +1,96 @@
+import logging
+from collections.abc import Iterable
+from datetime import date, datetime, time
+
+from redis.asyncio.client import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] — ключ слота, KEYS[2] — ключ пользователя, хранящий текущий слот.
+# Чужой слот не трогаем, свой предыдущий освобождаем: пользователь
+# удерживает не больше одного слота
+HOLD_LUA = """
+local holder = redis.call('GET', KEYS[1])
+if holder and holder ~= ARGV[1] then
+    return 0
+end
+local previous = redis.call('GET', KEYS[2])
+if previous and previous ~= KEYS[1] and redis.call('GET', previous) == ARGV[1] then
+    redis.call('DEL', previous)
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+redis.call('SET', KEYS[2], KEYS[1], 'PX', ARGV[2])
+return 1
+"""
+
+# KEYS[1] — ключ пользователя. Слот удаляется, только если всё ещё за ним
+RELEASE_LUA = """
+local slot = redis.call('GET', KEYS[1])
+if slot and redis.call('GET', slot) == ARGV[1] then
+    redis.call('DEL', slot)
+end
+redis.call('DEL', KEYS[1])
+"""
+
+
+class SlotHoldStore:
+    """
+    Короткое удержание слота, пока пользователь подтверждает запись.
+
+    Слоты сетки начинаются с одинаковым шагом и одной длительностью,
+    поэтому удержание ставится на начало слота. Удержание не заменяет
+    проверку в БД при записи, а только скрывает слот у других клиентов,
+    поэтому при недоступности Redis запись продолжается без удержаний.
+    """
+
+    def __init__(self, redis: Redis, ttl: float, prefix: str = "slot_hold") -> None:
+        self.redis = redis
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+        self._hold = redis.register_script(HOLD_LUA)
+        self._release = redis.register_script(RELEASE_LUA)
+
+    def _slot_key(self, visit_datetime: datetime) -> str:
+        return f"{self.prefix}:slot:{visit_datetime:%Y-%m-%d %H:%M}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    async def hold(self, user_id: int, visit_datetime: datetime) -> bool:
+        """False, если слот уже удерживает другой пользователь"""
+        try:
+            held = await self._hold(
+                keys=[self._slot_key(visit_datetime), self._user_key(user_id)],
+                args=[user_id, self.ttl_ms],
+            )
+        except RedisError:
+            logger.warning("Удержание слота недоступно, запись без удержания")
+            return True
+        return bool(held)
+
+    async def release(self, user_id: int) -> None:
+        try:
+            await self._release(keys=[self._user_key(user_id)], args=[user_id])
+        except RedisError:
+            logger.warning("Не удалось снять удержание слота пользователя %d", user_id)
+
+    async def held_by_others(
+        self, user_id: int, visit_date: date, candidates: Iterable[time]
+    ) -> set[time]:
+        """Слоты дня, удерживаемые другими пользователями, одним MGET"""
+        times = list(candidates)
+        if not times:
+            return set()
+        try:
+            holders = await self.redis.mget(
+                [self._slot_key(datetime.combine(visit_date, t)) for t in times]
+            )
+        except RedisError:
+            logger.warning("Удержания слотов недоступны, показаны все свободные")
+            return set()
+        return {
+            t
+            for t, holder in zip(times, holders, strict=True)
+            if holder is not None and holder != str(user_id)
+        }
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+
+from redis.asyncio.client import Redis
+
+# Ведро пользователя и общее ведро проверяются и списываются атомарно
+# за один EVALSHA, время берётся из Redis, чтобы экземпляры бота не зависели
+# от расхождения своих часов
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local tokens = {}
+local retry_after = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2]) / 1000
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        retry_after = math.max(retry_after, math.ceil((1 - available) / rate))
+    end
+end
+
+if retry_after == 0 then
+    for i = 1, #KEYS do
+        tokens[i] = tokens[i] - 1
+    end
+end
+
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2]) / 1000
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i]), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate) + 1000)
+end
+
+return retry_after
+"""  # noqa: S105
+
+
+@dataclass(frozen=True, slots=True)
+class BucketLimit:
+    """Ведро на capacity токенов, пополняется на rate токенов в секунду"""
+
+    capacity: int
+    rate: float
+
+
+class TokenBucketLimiter:
+    def __init__(self, redis: Redis, prefix: str = "throttle") -> None:
+        self.prefix = prefix
+        self._script = redis.register_script(TOKEN_BUCKET_LUA)
+
+    async def acquire(
+        self,
+        category: str,
+        user_id: int,
+        user_limit: BucketLimit,
+        global_limit: BucketLimit,
+    ) -> float:
+        """
+        Забирает по токену из ведра пользователя и общего ведра категории.
+        Возвращает 0, если запрос разрешён, иначе сколько секунд ждать.
+        """
+        keys = [
+            f"{self.prefix}:{category}:user:{user_id}",
+            f"{self.prefix}:{category}:global",
+        ]
+        args = [
+            user_limit.capacity,
+            user_limit.rate,
+            global_limit.capacity,
+            global_limit.rate,
+        ]
+        retry_after_ms = await self._script(keys=keys, args=args)
+        return int(retry_after_ms) / 1000
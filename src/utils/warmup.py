@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import Bot
+from redis.asyncio.client import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.services.schedule import ScheduleService
+from src.services.schedule_settings import schedule_settings_store
+from src.static_commands import commands
+from src.utils.get_admins_ids import get_admin_ids
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = tuple[str, Callable[[], Awaitable[Any]]]
+
+
+async def warm_db_pool(engine: AsyncEngine) -> None:
+    """Открывает все pool_size соединений одновременно, они остаются в пуле"""
+    pool_size = engine.pool.size()  # type: ignore[attr-defined]
+    # Соединение возвращается в пул только когда открыты все остальные,
+    # иначе пул переиспользовал бы одно и то же соединение
+    barrier = asyncio.Barrier(pool_size)
+
+    async def open_connection() -> None:
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                await barrier.wait()
+        except BaseException:
+            await barrier.abort()
+            raise
+
+    await asyncio.gather(*(open_connection() for _ in range(pool_size)))
+
+
+async def warm_schedule(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """Загружает снимок настроек расписания и прогревает запрос доступных дат"""
+    async with session_factory() as session:
+        schedule_settings = await schedule_settings_store.load(session)
+        await ScheduleService().get_available_dates(
+            session=session, schedule_settings=schedule_settings
+        )
+
+
+async def warm_admin_ids(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    async with session_factory() as session:
+        await get_admin_ids(session)
+
+
+def build_warmup_steps(
+    bot: Bot,
+    redis: Redis,
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker[AsyncSession],
+    with_database: bool = True,
+) -> list[WarmupStep]:
+    """Приёмнику очереди база не нужна, поэтому её шаги можно отключить"""
+    steps: list[WarmupStep] = [
+        ("redis_ping", redis.ping),
+        ("bot_commands", lambda: bot.set_my_commands(commands=commands)),
+    ]
+    if with_database:
+        steps += [
+            ("db_pool", lambda: warm_db_pool(engine)),
+            ("schedule", lambda: warm_schedule(session_factory)),
+            ("admin_ids", lambda: warm_admin_ids(session_factory)),
+        ]
+    return steps
+
+
+async def _timed(step: Callable[[], Awaitable[Any]]) -> tuple[float, Exception | None]:
+    started = time.perf_counter()
+    try:
+        await step()
+    except Exception as e:
+        return time.perf_counter() - started, e
+    return time.perf_counter() - started, None
+
+
+async def run_warmup(steps: list[WarmupStep]) -> None:
+    """
+    Выполняет шаги прогрева параллельно и логирует профиль старта.
+    Если какой-то шаг упал, после логирования пробрасывает его ошибку.
+    """
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_timed(step) for _, step in steps))
+    total = time.perf_counter() - started
+
+    for (name, _), (duration, error) in zip(steps, results, strict=True):
+        logger.info(
+            "Прогрев %-18s %8.1f мс%s",
+            name,
+            duration * 1000,
+            f" - ошибка: {error!r}" if error else "",
+        )
+    logger.info("Прогрев завершён за %.1f мс", total * 1000)
+
+    for _, error in results:
+        if error:
+            raise error
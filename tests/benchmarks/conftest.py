@@ -0,0 +1,73 @@
+# ruff: noqa: ARG002, ASYNC109, S106
+import asyncio
+import statistics
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe, GetUpdates, TelegramMethod
+from aiogram.types import Update, User
+
+BENCH_USER_ID = 1
+
+
+def make_raw_update(update_id: int, user_id: int = BENCH_USER_ID) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+            "text": "ping",
+        },
+    }
+
+
+def report(title: str, latencies: list[float]) -> None:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    print(
+        f"\n{title}: n={len(latencies_ms)}"
+        f" median={statistics.median(latencies_ms):.3f}ms"
+        f" p95={p95:.3f}ms max={latencies_ms[-1]:.3f}ms"
+    )
+
+
+class QueueSession(BaseSession):
+    """Сессия бота, отдающая getUpdates из локальной очереди вместо Telegram"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.updates: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None
+    ) -> Any:
+        if isinstance(method, GetMe):
+            return User(id=42, is_bot=True, first_name="BenchBot")
+        if isinstance(method, GetUpdates):
+            batch = [await self.updates.get()]
+            while not self.updates.empty():
+                batch.append(self.updates.get_nowait())
+            return [Update.model_validate(raw, context={"bot": bot}) for raw in batch]
+        return True
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator:
+        raise NotImplementedError
+        yield b""
+
+    async def close(self) -> None:
+        return None
+
+
+@pytest.fixture
+def queue_session() -> QueueSession:
+    return QueueSession()
+
+
+@pytest.fixture
+def bench_bot(queue_session: QueueSession) -> Bot:
+    return Bot(token="42:BENCH", session=queue_session)
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.ingestion.webhook import create_webhook_app
+from tests.benchmarks.conftest import QueueSession, make_raw_update, report
+
+UPDATES_COUNT = 300
+SECRET = "bench-secret"  # noqa: S105
+PATH = "/webhook"
+
+
+def _create_dispatcher(sent_at: dict[int, float], latencies: list[float]) -> tuple:
+    router = Router()
+    handled = asyncio.Event()
+
+    @router.message()
+    async def on_message(message: Message) -> None:
+        latencies.append(time.perf_counter() - sent_at[message.message_id])
+        handled.set()
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp, handled
+
+
+@pytest.mark.slow
+async def test_polling_latency(bench_bot: Bot, queue_session: QueueSession):
+    sent_at: dict[int, float] = {}
+    latencies: list[float] = []
+    dp, handled = _create_dispatcher(sent_at, latencies)
+
+    polling = asyncio.create_task(
+        dp.start_polling(
+            bench_bot,
+            handle_signals=False,
+            close_bot_session=False,
+            tasks_concurrency_limit=100,
+        )
+    )
+    for update_id in range(1, UPDATES_COUNT + 1):
+        handled.clear()
+        sent_at[update_id] = time.perf_counter()
+        queue_session.updates.put_nowait(make_raw_update(update_id))
+        await asyncio.wait_for(handled.wait(), timeout=5)
+
+    await dp.stop_polling()
+    await polling
+
+    report("polling", latencies)
+    assert len(latencies) == UPDATES_COUNT
+
+
+@pytest.mark.slow
+async def test_webhook_latency(bench_bot: Bot):
+    sent_at: dict[int, float] = {}
+    latencies: list[float] = []
+    dp, handled = _create_dispatcher(sent_at, latencies)
+
+    app = create_webhook_app(
+        bot=bench_bot,
+        dp=dp,
+        secret_token=SECRET,
+        max_pending_updates=100,
+        path=PATH,
+    )
+    async with TestClient(TestServer(app)) as client:
+        unauthorized = await client.post(PATH, json=make_raw_update(0))
+        assert unauthorized.status == 401
+
+        for update_id in range(1, UPDATES_COUNT + 1):
+            handled.clear()
+            sent_at[update_id] = time.perf_counter()
+            response = await client.post(
+                PATH,
+                json=make_raw_update(update_id),
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+            assert response.status == 200
+            await asyncio.wait_for(handled.wait(), timeout=5)
+
+    report("webhook", latencies)
+    assert len(latencies) == UPDATES_COUNT
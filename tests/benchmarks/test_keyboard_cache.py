@@ -0,0 +1,79 @@
+import asyncio
+import time as perf
+from datetime import date, datetime, time, timedelta
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.keyboards.cache import keyboard_cache
+from src.keyboards.calendar import (
+    create_calendar_for_available_dates,
+    create_choose_time_keyboard,
+)
+from src.services.schedule import slot_template
+from tests.benchmarks.conftest import report
+
+RENDERS = 5_000
+TIME_SLOTS = slot_template(time(9, 0), time(21, 0), 15).times
+
+
+class _IndexedScheduleService:
+    """Ответы индекса занятости без БД, чтобы мерить только сборку клавиатуры"""
+
+    def __init__(self) -> None:
+        self.builds = 0
+
+    async def get_availability_version(self, **_: Any) -> tuple[int, int]:
+        return 1, 0
+
+    async def get_free_times(self, **_: Any) -> set[time]:
+        self.builds += 1
+        return set(TIME_SLOTS[::2])
+
+
+async def _render(schedule_service: Any, cached: bool) -> list[float]:
+    session, schedule_settings = AsyncMock(), AsyncMock()
+    keyboard_cache.clear()
+    latencies = []
+    for _ in range(RENDERS):
+        if not cached:
+            keyboard_cache.clear()
+        started = perf.perf_counter()
+        await create_choose_time_keyboard(
+            time_slots=TIME_SLOTS,
+            session=session,
+            schedule_service=schedule_service,
+            visit_date=date(2025, 3, 3),
+            schedule_settings=schedule_settings,
+        )
+        latencies.append(perf.perf_counter() - started)
+    return latencies
+
+
+@pytest.mark.slow
+def test_time_keyboard_cache():
+    uncached_service = _IndexedScheduleService()
+    cached_service = _IndexedScheduleService()
+    built = asyncio.run(_render(uncached_service, cached=False))
+    cached = asyncio.run(_render(cached_service, cached=True))
+    report("Клавиатура времени, сборка", built)
+    report("Клавиатура времени, из кэша", cached)
+
+    # Время зависит от машины, поэтому проверяется число сборок клавиатуры
+    assert uncached_service.builds == RENDERS
+    assert cached_service.builds == 1
+
+
+@pytest.mark.slow
+def test_calendar_build_cost():
+    today = datetime(2025, 3, 3).date()
+    capacity = {today + timedelta(days=i): i % 5 for i in range(30)}
+
+    latencies = []
+    for _ in range(RENDERS):
+        started = perf.perf_counter()
+        create_calendar_for_available_dates(set(capacity), capacity)
+        latencies.append(perf.perf_counter() - started)
+    # Столько стоит каждый промах кэша календаря
+    report("Календарь на 30 дней, сборка", latencies)
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+from aiogram import Bot, Router
+from aiogram.types import Message
+
+from src.ingestion.lanes import LanesDispatcher, UpdateLanes
+from tests.benchmarks.conftest import make_raw_update
+
+USERS_COUNT = 64
+UPDATES_PER_USER = 5
+HANDLER_IO_SECONDS = 0.005
+
+
+async def _measure_throughput(bot: Bot, limit: int) -> float:
+    lanes = UpdateLanes(limit=limit)
+    order: dict[int, list[int]] = {}
+    router = Router()
+
+    @router.message()
+    async def on_message(message: Message) -> None:
+        assert message.from_user is not None
+        await asyncio.sleep(HANDLER_IO_SECONDS)
+        order.setdefault(message.from_user.id, []).append(message.message_id)
+
+    dp = LanesDispatcher(lanes=lanes)
+    dp.include_router(router)
+
+    raw_updates = [
+        make_raw_update(update_id=user_id * 1000 + step, user_id=user_id)
+        for step in range(UPDATES_PER_USER)
+        for user_id in range(1, USERS_COUNT + 1)
+    ]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(dp.feed_raw_update(bot, raw) for raw in raw_updates))
+    elapsed = time.perf_counter() - started
+
+    for user_id, message_ids in order.items():
+        assert message_ids == sorted(message_ids), f"нарушен порядок для {user_id}"
+    assert lanes.stats.queue_depth == 0
+
+    throughput = len(raw_updates) / elapsed
+    print(f"\nlanes limit={limit}: {throughput:.0f} updates/s")
+    return throughput
+
+
+@pytest.mark.slow
+async def test_throughput_scales_with_limit(bench_bot: Bot):
+    throughput = {
+        limit: await _measure_throughput(bench_bot, limit) for limit in (1, 4, 16, 64)
+    }
+
+    # Пока лимит меньше числа пользователей, ожидание ввода-вывода перекрывается.
+    # Дальше рост упирается в CPU и зависит от машины, поэтому после лимита 4
+    # проверяем только, что пропускная способность не падает
+    assert throughput[4] > throughput[1] * 2
+    assert throughput[16] > throughput[4]
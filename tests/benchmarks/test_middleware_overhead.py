@@ -0,0 +1,160 @@
+# ruff: noqa: ARG001
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.middlewares.manager import MiddlewareManager
+from aiogram.types import Message, TelegramObject, Update
+
+from src.middlewares.db import LazySession
+from src.middlewares.dependencies import DependencyMiddleware
+from src.middlewares.error_handler import ErrorHandlerMiddleware
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+from src.services.admin import AdminService
+from src.services.schedule import ScheduleService
+from src.services.user import UserService
+from tests.benchmarks.conftest import make_raw_update, report
+
+UPDATES_COUNT = 20_000
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+class _LegacySessionMiddleware(BaseMiddleware):
+    def __init__(self, factory: Any) -> None:
+        self.factory = factory
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: dict[str, Any]
+    ) -> Any:
+        session = LazySession(self.factory)
+        try:
+            data["session"] = session
+            result = await handler(event, data)
+            await session.commit_if_used()
+        finally:
+            await session.close()
+        return result
+
+
+class _LegacyInjectMiddleware(BaseMiddleware):
+    def __init__(self, name: str, value: Any) -> None:
+        self.name = name
+        self.value = value
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: dict[str, Any]
+    ) -> Any:
+        data[self.name] = self.value
+        return await handler(event, data)
+
+
+class _LegacySettingsMiddleware(BaseMiddleware):
+    def __init__(self, store: Any) -> None:
+        self.store = store
+
+    async def __call__(
+        self, handler: Handler, event: TelegramObject, data: dict[str, Any]
+    ) -> Any:
+        data["schedule_settings"] = await self.store.get(data["session"])
+        return await handler(event, data)
+
+
+def _legacy_chain(factory: Any, store: Any) -> list[BaseMiddleware]:
+    """Прежний набор: по middleware на каждую зависимость"""
+    return [
+        _LegacySessionMiddleware(factory),
+        ErrorHandlerMiddleware(),
+        _LegacyInjectMiddleware("user_service", UserService()),
+        _LegacyInjectMiddleware("schedule_service", ScheduleService()),
+        _LegacyInjectMiddleware("admin_service", AdminService()),
+        _LegacySettingsMiddleware(store),
+    ]
+
+
+def _fused_chain(factory: Any, store: Any) -> list[BaseMiddleware]:
+    return [ErrorHandlerMiddleware(), DependencyMiddleware(factory, store)]
+
+
+async def db_free(message: Message) -> None:
+    return None
+
+
+async def with_settings(
+    message: Message, schedule_settings: ScheduleSettingsSchema
+) -> None:
+    return None
+
+
+def _pipeline(
+    chain: Callable[[Any, Any], list[BaseMiddleware]],
+    callback: Callable,
+    wrap: Callable[[BaseMiddleware], Any] = lambda middleware: middleware,
+) -> tuple[Any, HandlerObject, MagicMock]:
+    store = MagicMock()
+    store.get = AsyncMock(return_value=MagicMock())
+    handler = HandlerObject(callback=callback)
+    pipeline = MiddlewareManager.wrap_middlewares(
+        [wrap(middleware) for middleware in chain(MagicMock(), store)], handler.call
+    )
+    return pipeline, handler, store
+
+
+async def _measure(
+    chain: Callable[[Any, Any], list[BaseMiddleware]], callback: Callable
+) -> list[float]:
+    """Время прохождения апдейта через middleware до хендлера и обратно"""
+    pipeline, handler, _ = _pipeline(chain, callback)
+    message = Update.model_validate(make_raw_update(1)).message
+
+    latencies = []
+    for _ in range(UPDATES_COUNT):
+        started = time.perf_counter()
+        await pipeline(message, {"handler": handler})
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def _count_calls(
+    chain: Callable[[Any, Any], list[BaseMiddleware]], callback: Callable
+) -> tuple[int, int]:
+    """Сколько middleware прошёл один апдейт и сколько раз загружались настройки"""
+    calls = 0
+
+    def counted(middleware: BaseMiddleware) -> Any:
+        async def call(
+            handler: Handler, event: TelegramObject, data: dict[str, Any]
+        ) -> Any:
+            nonlocal calls
+            calls += 1
+            return await middleware(handler, event, data)
+
+        return call
+
+    pipeline, handler, store = _pipeline(chain, callback, counted)
+    message = Update.model_validate(make_raw_update(1)).message
+    await pipeline(message, {"handler": handler})
+    return calls, store.get.await_count
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "callback", [db_free, with_settings], ids=["db_free", "with_settings"]
+)
+async def test_fused_pipeline_overhead(callback: Callable):
+    legacy = await _measure(_legacy_chain, callback)
+    fused = await _measure(_fused_chain, callback)
+
+    report(f"legacy middlewares [{callback.__name__}]", legacy)
+    report(f"fused middleware [{callback.__name__}]", fused)
+
+    # Время зависит от машины, поэтому проверяется сама работа на апдейт:
+    # число слоёв и загрузка настроек только для хендлеров, которым они нужны
+    legacy_calls, legacy_loads = await _count_calls(_legacy_chain, callback)
+    fused_calls, fused_loads = await _count_calls(_fused_chain, callback)
+    assert (legacy_calls, legacy_loads) == (6, 1)
+    assert (fused_calls, fused_loads) == (2, int(callback is with_settings))
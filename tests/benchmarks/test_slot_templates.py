@@ -0,0 +1,62 @@
+import time as perf
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from src.services.schedule import slot_template
+from tests.benchmarks.conftest import report
+
+CALLS = 20_000
+START, END, DURATION = time(0, 0), time(23, 45), 15
+
+
+def _build_slots(visit_date: date) -> list[time]:
+    """Прежняя генерация: список заново через арифметику datetime"""
+    time_slots = []
+    last_visit = datetime.combine(visit_date, END) - timedelta(minutes=DURATION)
+    start_visit = datetime.combine(visit_date, START)
+    while start_visit <= last_visit:
+        time_slots.append(start_visit.time())
+        start_visit += timedelta(minutes=DURATION)
+    return time_slots
+
+
+def _measure(call, *args) -> list[float]:
+    latencies = []
+    for _ in range(CALLS):
+        started = perf.perf_counter()
+        call(*args)
+        latencies.append(perf.perf_counter() - started)
+    return latencies
+
+
+@pytest.mark.slow
+def test_slot_template_generation():
+    slot_template.cache_clear()
+    visit_date = date(2025, 3, 3)
+
+    rebuilt = _measure(_build_slots, visit_date)
+    cached = _measure(lambda: slot_template(START, END, DURATION).times)
+    report("Слоты по 15 минут, генерация списка", rebuilt)
+    report("Слоты по 15 минут, шаблон из кэша", cached)
+
+    # Время зависит от машины, поэтому проверяется, что шаблон строился один раз
+    assert list(slot_template(START, END, DURATION).times) == _build_slots(visit_date)
+    assert slot_template.cache_info().misses == 1
+    assert slot_template.cache_info().hits == CALLS
+
+
+@pytest.mark.slow
+def test_slot_membership():
+    slots = _build_slots(date(2025, 3, 3))
+    members = slot_template(START, END, DURATION).members
+    last_slot = slots[-1]
+
+    linear = _measure(lambda: last_slot in slots)
+    hashed = _measure(lambda: last_slot in members)
+    report("Проверка слота: in по списку", linear)
+    report("Проверка слота: in по множеству", hashed)
+
+    # Проверка идёт по хешу без перебора: множество того же состава
+    assert isinstance(members, frozenset)
+    assert members == frozenset(slots)
@@ -0,0 +1,65 @@
+import time as perf
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from src.keyboards.admin import (
+    create_admin_keyboard,
+    create_duration_time_variants,
+    create_status_update_keyboard,
+)
+from src.keyboards.book import create_book_main_menu_kb
+from src.keyboards.cache import FrozenInlineKeyboardMarkup
+from src.keyboards.start import ask_about_name_kb
+from tests.benchmarks.conftest import report
+
+CALLS = 2_000
+
+
+def _measure(call: Callable[[], Any]) -> list[float]:
+    latencies = []
+    for _ in range(CALLS):
+        started = perf.perf_counter()
+        call()
+        latencies.append(perf.perf_counter() - started)
+    return latencies
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "keyboard",
+    [
+        create_admin_keyboard,
+        create_book_main_menu_kb,
+        create_duration_time_variants,
+        ask_about_name_kb,
+    ],
+    ids=lambda keyboard: keyboard.__name__,
+)
+def test_static_keyboard_construction(keyboard):
+    # __wrapped__ — исходная функция, собирающая клавиатуру заново
+    built = _measure(keyboard.__wrapped__)
+    shared = _measure(keyboard)
+    report(f"{keyboard.__name__}, сборка", built)
+    report(f"{keyboard.__name__}, готовая", shared)
+
+    # Время зависит от машины, поэтому проверяется, что отдаётся один
+    # и тот же неизменяемый объект, собранный из тех же кнопок
+    assert keyboard() is keyboard()
+    assert isinstance(keyboard(), FrozenInlineKeyboardMarkup)
+    assert keyboard().model_dump() == keyboard.__wrapped__().model_dump()
+
+
+@pytest.mark.slow
+def test_status_update_keyboard_lru():
+    create_status_update_keyboard.cache_clear()
+    build = create_status_update_keyboard.__wrapped__
+
+    built = _measure(lambda: build(schedule_id=1, telegram_id=100))
+    cached = _measure(lambda: create_status_update_keyboard(1, 100))
+    report("create_status_update_keyboard, сборка", built)
+    report("create_status_update_keyboard, LRU", cached)
+
+    assert create_status_update_keyboard.cache_info().misses == 1
+    assert create_status_update_keyboard.cache_info().hits == CALLS - 1
@@ -13,6 +13,7 @@ from database.database import engine, session_factory
 from src.models.base import Base
 from src.models.schedule_settings import ScheduleSettings
 from src.models.user import User
+from src.services.occupancy import occupancy_index
 from src.services.schedule import ScheduleService
 from src.services.user import UserService
 
@@ -47,6 +48,8 @@ async def clean_all_tables(session: AsyncSession):
         print(table_name)
         await session.execute(text(f"TRUNCATE TABLE {table_name} CASCADE"))
     await session.commit()
+    # TRUNCATE идёт мимо ORM, поэтому индекс занятости сбрасывается вручную
+    occupancy_index.reset()
 
 
 @pytest.fixture
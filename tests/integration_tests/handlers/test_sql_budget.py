@@ -0,0 +1,107 @@
+from datetime import date, time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram import Bot
+from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import engine
+from src.metrics.sql_budget import (
+    SqlTrace,
+    handler_budgets,
+    install_sql_tracer,
+    track_sql,
+)
+from src.models.schedule_settings import ScheduleSettings
+from src.models.user import User
+from src.routers import router
+from src.routers.handlers.book import (
+    choose_time,
+    finish_booking,
+    show_days,
+    show_time,
+)
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+from src.services.schedule import ScheduleService
+from src.utils.get_admins_ids import admin_ids_cache
+
+BUDGETS = handler_budgets(router)
+
+
+@pytest.fixture(autouse=True)
+def sql_tracer():
+    install_sql_tracer(engine)
+    admin_ids_cache.invalidate()
+
+
+@pytest.fixture
+def snapshot(schedule_settings: ScheduleSettings) -> ScheduleSettingsSchema:
+    return ScheduleSettingsSchema.model_validate(schedule_settings)
+
+
+def _callback(data: str, user: User) -> MagicMock:
+    callback = MagicMock()
+    callback.data = data
+    callback.from_user.id = user.telegram_id
+    callback.answer = AsyncMock()
+    callback.message = MagicMock(spec=Message)
+    callback.message.edit_text = AsyncMock()
+    callback.bot = AsyncMock(spec=Bot)
+    return callback
+
+
+def _assert_within_budget(handler, trace: SqlTrace) -> None:
+    budget = BUDGETS[handler]
+    assert budget is not None, f"{handler.__name__} не объявил sql_budget"
+    assert trace.violations(budget) == []
+
+
+@pytest.mark.asyncio
+async def test_booking_funnel_within_sql_budget(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    snapshot: ScheduleSettingsSchema,
+    create_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+):
+    user = create_users[0]
+    visit_date = available_dates[-1]
+    state = AsyncMock()
+    state.get_data.return_value = {
+        "visit_date_str": visit_date.strftime("%Y_%m_%d"),
+        "visit_time_str": time_slots[0].strftime("%H:%M"),
+        "telegram_id": user.telegram_id,
+    }
+
+    with track_sql() as trace:
+        await show_days(
+            _callback("book", user), state, session, schedule_service, snapshot
+        )
+    _assert_within_budget(show_days, trace)
+
+    with track_sql() as trace:
+        await show_time(
+            _callback(f"choose_date_{visit_date:%Y_%m_%d}", user),
+            state,
+            session,
+            schedule_service,
+            snapshot,
+        )
+    _assert_within_budget(show_time, trace)
+
+    with track_sql() as trace:
+        await choose_time(_callback(f"timeline_{time_slots[0]:%H:%M}", user), state)
+    _assert_within_budget(choose_time, trace)
+
+    with track_sql() as trace:
+        await finish_booking(
+            _callback("confirm_booking", user),
+            state,
+            schedule_service,
+            session,
+            snapshot,
+        )
+    _assert_within_budget(finish_booking, trace)
+    assert trace.count > 0
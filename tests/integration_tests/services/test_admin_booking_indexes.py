@@ -0,0 +1,111 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import Select, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.schedule import Schedule
+from src.services.admin import AdminService, BookingsFilter
+
+BOOKINGS_COUNT = 20_000
+SLOTS_PER_DAY = 10
+APPROVALS = (None, True, False)
+
+
+async def _plan(session: AsyncSession, stmt: Select) -> str:
+    compiled = stmt.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(text(f"EXPLAIN {compiled}"))
+    return "\n".join(result.scalars().all())
+
+
+@pytest.fixture
+async def many_bookings(session: AsyncSession) -> None:
+    """Записи на несколько лет вокруг сегодняшнего дня, половина слотов свободна"""
+    first_day = datetime.now().date() - timedelta(days=BOOKINGS_COUNT // 20)
+    await session.execute(
+        insert(Schedule),
+        [
+            {
+                "visit_datetime": datetime.combine(
+                    first_day + timedelta(days=i // SLOTS_PER_DAY),
+                    time(9 + i % SLOTS_PER_DAY),
+                ),
+                "visit_duration": 60,
+                "is_booked": i % 2 == 0,
+                "is_approved": APPROVALS[i // 2 % 3],
+            }
+            for i in range(BOOKINGS_COUNT)
+        ],
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE schedules"))
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("many_bookings")
+@pytest.mark.parametrize(
+    "bookings_filter, index_name",
+    [
+        (BookingsFilter(), "ix_schedules_booked_visit"),
+        (BookingsFilter(period="today"), "ix_schedules_booked_visit"),
+        (
+            BookingsFilter(period="week", status="approved"),
+            "ix_schedules_approval_visit",
+        ),
+        (
+            BookingsFilter(period="all", status="rejected"),
+            "ix_schedules_approval_visit",
+        ),
+    ],
+)
+async def test_bookings_page_uses_admin_indexes(
+    session: AsyncSession, bookings_filter, index_name
+):
+    plan = await _plan(session, AdminService.bookings_page_stmt(bookings_filter))
+
+    assert index_name in plan, plan
+    assert "Seq Scan" not in plan, plan
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("many_bookings")
+async def test_pending_bookings_read_by_index(session: AsyncSession):
+    plan = await _plan(
+        session,
+        AdminService.bookings_page_stmt(BookingsFilter(period="all", status="pending")),
+    )
+
+    # IS NULL не делает is_approved константой для сортировки, поэтому
+    # планировщик может взять любой из двух частичных индексов
+    assert any(
+        name in plan
+        for name in ("ix_schedules_booked_visit", "ix_schedules_approval_visit")
+    ), plan
+    assert "Seq Scan" not in plan, plan
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("many_bookings")
+async def test_next_page_seeks_by_index(session: AsyncSession):
+    cursor = (datetime.now() + timedelta(days=30), 1)
+
+    plan = await _plan(
+        session, AdminService.bookings_page_stmt(BookingsFilter(), after=cursor)
+    )
+
+    assert "ix_schedules_booked_visit" in plan, plan
+    assert "Seq Scan" not in plan, plan
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("many_bookings")
+async def test_day_bookings_use_index(session: AsyncSession):
+    plan = await _plan(session, AdminService.day_bookings_stmt(datetime.now().date()))
+
+    assert "Seq Scan on schedules" not in plan, plan
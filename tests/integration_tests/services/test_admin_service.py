@@ -10,7 +10,7 @@ from src.models.day_off import DaysOff
 from src.models.schedule import Schedule
 from src.models.schedule_settings import ScheduleSettings
 from src.models.user import User
-from src.services.admin import AdminService
+from src.services.admin import AdminService, BookingsFilter
 
 
 @pytest.mark.asyncio
@@ -46,7 +46,7 @@ async def test_get_booking_returns_booking_with_user(session: AsyncSession):
 
 @patch("src.services.admin.datetime")
 @pytest.mark.asyncio
-async def test_get_all_bookings_filters_and_orders(
+async def test_get_bookings_page_filters_and_orders(
     mock_datetime, session: AsyncSession
 ):
     mock_datetime.now.return_value = datetime(2025, 3, 3, 8, 0, 0)
@@ -93,9 +93,118 @@ async def test_get_all_bookings_filters_and_orders(
     session.add_all([past, future_free, future1, future2])
     await session.commit()
 
-    bookings = await AdminService.get_all_bookings(session=session)
+    page = await AdminService.get_bookings_page(session=session)
 
-    assert [b.id for b in bookings] == [future2.id, future1.id]
+    assert [row.id for row in page.rows] == [future2.id, future1.id]
+    assert not page.has_prev
+    assert not page.has_next
+
+
+@patch("src.services.admin.datetime")
+@pytest.mark.asyncio
+async def test_get_bookings_page_walks_by_keyset(mock_datetime, session: AsyncSession):
+    base = datetime(2025, 3, 3, 8, 0, 0)
+    mock_datetime.now.return_value = base
+    bookings = [
+        Schedule(visit_datetime=base + timedelta(hours=i), is_booked=True)
+        for i in range(1, 6)
+    ]
+    session.add_all(bookings)
+    await session.commit()
+    expected = [b.id for b in bookings]
+
+    first = await AdminService.get_bookings_page(session=session, page_size=2)
+    second = await AdminService.get_bookings_page(
+        session=session, after=first.last_cursor, page_size=2
+    )
+    last = await AdminService.get_bookings_page(
+        session=session, after=second.last_cursor, page_size=2
+    )
+    back = await AdminService.get_bookings_page(
+        session=session, before=last.first_cursor, page_size=2
+    )
+
+    assert [row.id for row in first.rows] == expected[:2]
+    assert (first.has_prev, first.has_next) == (False, True)
+    assert [row.id for row in second.rows] == expected[2:4]
+    assert (second.has_prev, second.has_next) == (True, True)
+    assert [row.id for row in last.rows] == expected[4:]
+    assert (last.has_prev, last.has_next) == (True, False)
+    assert [row.id for row in back.rows] == expected[2:4]
+    assert (back.has_prev, back.has_next) == (True, True)
+
+
+@patch("src.services.admin.datetime")
+@pytest.mark.asyncio
+async def test_get_bookings_page_applies_filter(mock_datetime, session: AsyncSession):
+    base = datetime(2025, 3, 3, 8, 0, 0)
+    mock_datetime.now.return_value = base
+    mock_datetime.combine = datetime.combine
+    today_pending = Schedule(visit_datetime=base + timedelta(hours=2), is_booked=True)
+    today_approved = Schedule(
+        visit_datetime=base + timedelta(hours=3), is_booked=True, is_approved=True
+    )
+    week_approved = Schedule(
+        visit_datetime=base + timedelta(days=3), is_booked=True, is_approved=True
+    )
+    later_approved = Schedule(
+        visit_datetime=base + timedelta(days=10), is_booked=True, is_approved=True
+    )
+    session.add_all([today_pending, today_approved, week_approved, later_approved])
+    await session.commit()
+
+    today = await AdminService.get_bookings_page(
+        session=session, bookings_filter=BookingsFilter(period="today")
+    )
+    week_approved_page = await AdminService.get_bookings_page(
+        session=session,
+        bookings_filter=BookingsFilter(period="week", status="approved"),
+    )
+    pending = await AdminService.get_bookings_page(
+        session=session, bookings_filter=BookingsFilter(status="pending")
+    )
+
+    assert [row.id for row in today.rows] == [today_pending.id, today_approved.id]
+    assert [row.id for row in week_approved_page.rows] == [
+        today_approved.id,
+        week_approved.id,
+    ]
+    assert [row.id for row in pending.rows] == [today_pending.id]
+
+
+@pytest.mark.asyncio
+async def test_get_day_bookings_with_clients(session: AsyncSession):
+    user = User(
+        telegram_id=222,
+        username="two",
+        first_name="Two",
+        phone="+79990000000",
+        is_admin=False,
+    )
+    session.add(user)
+    await session.flush()
+    day = date(2025, 3, 3)
+    evening = Schedule(
+        visit_datetime=datetime(2025, 3, 3, 18, 0),
+        is_booked=True,
+        user_telegram_id=user.telegram_id,
+    )
+    morning = Schedule(
+        visit_datetime=datetime(2025, 3, 3, 9, 0),
+        is_booked=True,
+        user_telegram_id=user.telegram_id,
+    )
+    next_day = Schedule(visit_datetime=datetime(2025, 3, 4, 9, 0), is_booked=True)
+    free = Schedule(visit_datetime=datetime(2025, 3, 3, 12, 0), is_booked=False)
+    session.add_all([evening, morning, next_day, free])
+    await session.commit()
+
+    rows = await AdminService.get_day_bookings(session=session, day=day)
+
+    assert [row.id for row in rows] == [morning.id, evening.id]
+    assert rows[0].first_name == "Two"
+    assert rows[0].phone == "+79990000000"
+    assert rows[0].username == "two"
 
 
 @pytest.mark.parametrize(
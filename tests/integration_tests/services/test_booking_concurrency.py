@@ -0,0 +1,120 @@
+import asyncio
+import time as perf
+from collections import Counter
+from datetime import date, time
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram import Bot
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import session_factory
+from src.exceptions.booking import BookingError
+from src.models.schedule import Schedule
+from src.models.schedule_settings import ScheduleSettings
+from src.models.user import User
+from src.services.schedule import ScheduleService
+
+CONCURRENT_BOOKINGS = 50
+
+
+async def _book(
+    visit_date: date,
+    visit_time: time,
+    user_telegram_id: int,
+    schedule_settings: ScheduleSettings,
+) -> str:
+    """Одна попытка записи в своей сессии, как в отдельном апдейте"""
+    async with session_factory() as session:
+        try:
+            slot = await ScheduleService().create_busy_slot(
+                session=session,
+                bot=AsyncMock(spec=Bot),
+                visit_date=visit_date,
+                visit_time=visit_time,
+                user_telegram_id=user_telegram_id,
+                schedule_settings=schedule_settings,
+            )
+            await session.commit()
+        except BookingError:
+            await session.rollback()
+            return "booking_error"
+        return "booked" if slot is not None else "limit"
+
+
+def _report(title: str, outcomes: list[str], elapsed: float) -> None:
+    print(
+        f"\n{title}: {dict(Counter(outcomes))}"
+        f" за {elapsed * 1000:.1f}мс, {len(outcomes) / elapsed:.0f} попыток/с"
+    )
+
+
+@pytest.fixture
+async def many_users(session: AsyncSession) -> list[User]:
+    users = [
+        User(telegram_id=500_000 + i, first_name=f"Stress{i}")
+        for i in range(CONCURRENT_BOOKINGS)
+    ]
+    session.add_all(users)
+    await session.commit()
+    return users
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_concurrent_bookings_of_one_slot(
+    session: AsyncSession,
+    many_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings: ScheduleSettings,
+):
+    started = perf.perf_counter()
+    outcomes = await asyncio.gather(
+        *(
+            _book(
+                available_dates[0], time_slots[0], user.telegram_id, schedule_settings
+            )
+            for user in many_users
+        )
+    )
+    _report("Один слот", outcomes, perf.perf_counter() - started)
+
+    assert Counter(outcomes) == {
+        "booked": 1,
+        "booking_error": CONCURRENT_BOOKINGS - 1,
+    }
+    booked = await session.scalar(select(func.count()).select_from(Schedule))
+    assert booked == 1
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_concurrent_bookings_respect_user_limit(
+    session: AsyncSession,
+    many_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings: ScheduleSettings,
+):
+    user = many_users[0]
+    slots = [(day, slot) for day in available_dates for slot in time_slots]
+    assert schedule_settings.max_user_bookings == 3
+
+    started = perf.perf_counter()
+    outcomes = await asyncio.gather(
+        *(
+            _book(day, slot, user.telegram_id, schedule_settings)
+            for day, slot in slots[:CONCURRENT_BOOKINGS]
+        )
+    )
+    _report("Лимит пользователя", outcomes, perf.perf_counter() - started)
+
+    assert Counter(outcomes) == {"booked": 3, "limit": CONCURRENT_BOOKINGS - 3}
+    booked = await session.scalar(
+        select(func.count())
+        .select_from(Schedule)
+        .where(Schedule.user_telegram_id == user.telegram_id)
+    )
+    assert booked == 3
@@ -0,0 +1,98 @@
+import time as perf
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.day_off import DaysOff
+from src.models.schedule import Schedule
+from src.models.schedule_settings import ScheduleSettings
+from src.services.occupancy import occupancy_index
+from src.services.schedule import ScheduleService
+from tests.benchmarks.conftest import report
+
+BOOKINGS_COUNT = 12_000
+RENDERS = 50
+
+
+async def _query_path(
+    session: AsyncSession, schedule_settings: ScheduleSettings
+) -> dict[date, set[time]]:
+    """Путь через базу: запрос выходных и запрос занятых интервалов на каждый день"""
+    today = datetime.now().date()
+    last_day = today + timedelta(days=schedule_settings.booking_days_ahead)
+    result = await session.execute(
+        select(DaysOff.day_off).where(DaysOff.day_off.between(today, last_day))
+    )
+    days_off = set(result.scalars().all())
+    duration = timedelta(minutes=schedule_settings.slot_duration_minutes)
+    free = {}
+    day = today
+    while day <= last_day:
+        if day.weekday() in schedule_settings.working_days and day not in days_off:
+            busy = await ScheduleService.get_booking_slots_for_date(session, day)
+            free[day] = {
+                slot
+                for slot in ScheduleService.get_time_slots(day, schedule_settings)
+                if all(
+                    end <= datetime.combine(day, slot)
+                    or start >= datetime.combine(day, slot) + duration
+                    for start, end in busy
+                )
+            }
+        day += timedelta(days=1)
+    return free
+
+
+async def _index_path(
+    session: AsyncSession, schedule_settings: ScheduleSettings
+) -> dict[date, set[time]]:
+    service = ScheduleService()
+    dates = await service.get_available_dates(session, schedule_settings)
+    return {
+        day: await service.get_free_times(session, day, schedule_settings)
+        for day in dates
+    }
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_index_beats_query_path_at_10k_bookings(
+    session: AsyncSession, schedule_settings: ScheduleSettings
+):
+    first_day = datetime.now().date() - timedelta(days=BOOKINGS_COUNT // 9 - 30)
+    await session.execute(
+        insert(Schedule),
+        [
+            {
+                "visit_datetime": datetime.combine(
+                    first_day + timedelta(days=i // 9), time(9 + i % 9)
+                ),
+                "visit_duration": 30 if i % 2 else 60,
+                "is_booked": True,
+            }
+            for i in range(BOOKINGS_COUNT)
+        ],
+    )
+    await session.execute(
+        insert(DaysOff), [{"day_off": datetime.now().date() + timedelta(days=3)}]
+    )
+    await session.commit()
+    occupancy_index.reset()
+
+    query_latencies, index_latencies = [], []
+    for _ in range(RENDERS):
+        started = perf.perf_counter()
+        expected = await _query_path(session, schedule_settings)
+        query_latencies.append(perf.perf_counter() - started)
+
+        started = perf.perf_counter()
+        actual = await _index_path(session, schedule_settings)
+        index_latencies.append(perf.perf_counter() - started)
+
+        assert actual == expected
+
+    report("query path", query_latencies)
+    report("occupancy index", index_latencies)
+    assert sorted(index_latencies)[RENDERS // 2] < sorted(query_latencies)[RENDERS // 2]
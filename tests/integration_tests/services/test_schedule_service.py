@@ -3,13 +3,17 @@ from datetime import date, datetime, time, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.exceptions.booking import BookingError
+from src.models.day_off import DaysOff
 from src.models.schedule import Schedule
 from src.models.user import User
+from src.schemas.schedule_settings import ScheduleSettingsSchema
 from src.services.admin import AdminService
-from src.services.schedule import ScheduleService
+from src.services.occupancy import OCCUPANCY_CHANGES
+from src.services.schedule import ScheduleService, SlotStatus
 
 
 @patch("src.services.schedule.datetime")
@@ -228,94 +232,227 @@ async def test_set_booking_approval_without_user_telegram_id(
 
 
 @pytest.mark.asyncio
-async def test_create_busy_slot_success(mock_bot, schedule_settings, future_datetime):
-    session = AsyncMock(spec=AsyncSession)
-    user_telegram_id = 123
-    visit_date = future_datetime.date()
-    visit_time = future_datetime.time()
-
-    service = ScheduleService()
-
-    with (
-        patch.object(service, "is_slot_available", AsyncMock(return_value=True)),
-        patch.object(
-            service, "_check_user_booking_limit", AsyncMock(return_value=True)
-        ),
-        patch.object(service, "add", AsyncMock()),
-    ):
-        result = await service.create_busy_slot(
+async def test_create_busy_slot_success(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    create_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings,
+    mock_bot,
+):
+    user = create_users[0]
+
+    result = await schedule_service.create_busy_slot(
+        session=session,
+        bot=mock_bot,
+        visit_date=available_dates[0],
+        visit_time=time_slots[-1],
+        user_telegram_id=user.telegram_id,
+        schedule_settings=schedule_settings,
+    )
+    await session.commit()
+
+    assert result is not None
+    assert result.id is not None
+    assert result.user_telegram_id == user.telegram_id
+    assert result.is_booked is True
+    assert result.visit_duration == schedule_settings.slot_duration_minutes
+
+
+@pytest.mark.asyncio
+async def test_create_busy_slot_when_slot_not_available(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    create_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings,
+    mock_bot,
+):
+    first_user, second_user = create_users[:2]
+    await schedule_service.create_busy_slot(
+        session=session,
+        bot=mock_bot,
+        visit_date=available_dates[0],
+        visit_time=time_slots[-1],
+        user_telegram_id=first_user.telegram_id,
+        schedule_settings=schedule_settings,
+    )
+    await session.commit()
+
+    # Конфликт решает ON CONFLICT, IntegrityError до обработчика не доходит
+    with pytest.raises(BookingError, match="Это время уже занято"):
+        await schedule_service.create_busy_slot(
             session=session,
             bot=mock_bot,
-            visit_date=visit_date,
-            visit_time=visit_time,
-            user_telegram_id=user_telegram_id,
+            visit_date=available_dates[0],
+            visit_time=time_slots[-1],
+            user_telegram_id=second_user.telegram_id,
             schedule_settings=schedule_settings,
         )
 
-        assert result is not None
-        assert result.user_telegram_id == user_telegram_id
-        assert result.is_booked is True
-        service.add.assert_awaited_once()
-
 
 @pytest.mark.asyncio
-async def test_create_busy_slot_when_slot_not_available(
-    mock_bot, schedule_settings, future_datetime
+async def test_create_busy_slot_rejects_overlapping_interval(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    create_users: list[User],
+    available_dates: list[date],
+    schedule_settings,
+    mock_bot,
 ):
-    session = AsyncMock(spec=AsyncSession)
-    user_telegram_id = 123
-    visit_date = future_datetime.date()
-    visit_time = future_datetime.time()
+    # Длинный сеанс, записанный до смены длительности на 30 минут
+    session.add(
+        Schedule(
+            visit_datetime=datetime.combine(available_dates[0], time(10, 0)),
+            visit_duration=120,
+            is_booked=True,
+            user_telegram_id=create_users[0].telegram_id,
+        )
+    )
+    await session.commit()
 
-    service = ScheduleService()
+    status = await schedule_service.check_slot(
+        session, available_dates[0], time(11, 0), schedule_settings
+    )
+    assert status is SlotStatus.BOOKED
 
-    with (
-        patch.object(service, "is_slot_available", AsyncMock(return_value=False)),
-        pytest.raises(BookingError, match="Это время уже занято"),
-    ):
-        await service.create_busy_slot(
+    with pytest.raises(BookingError, match=SlotStatus.BOOKED.value):
+        await schedule_service.create_busy_slot(
             session=session,
             bot=mock_bot,
-            visit_date=visit_date,
-            visit_time=visit_time,
-            user_telegram_id=user_telegram_id,
+            visit_date=available_dates[0],
+            visit_time=time(11, 0),
+            user_telegram_id=create_users[1].telegram_id,
             schedule_settings=schedule_settings,
         )
 
+    free_times = await schedule_service.get_free_times(
+        session, available_dates[0], schedule_settings
+    )
+    assert {time(10, 0), time(10, 30), time(11, 0), time(11, 30)}.isdisjoint(free_times)
+    assert {time(9, 30), time(12, 0)} <= free_times
+
 
 @pytest.mark.asyncio
-async def test_create_busy_slot_when_user_limit_reached(
-    mock_bot, schedule_settings, future_datetime
+async def test_get_day_capacity_marks_full_day(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings,
 ):
-    session = AsyncMock(spec=AsyncSession)
-    user_telegram_id = 123
-    visit_date = future_datetime.date()
-    visit_time = future_datetime.time()
-
-    service = ScheduleService()
-
-    with (
-        patch.object(service, "is_slot_available", AsyncMock(return_value=True)),
-        patch.object(
-            service, "_check_user_booking_limit", AsyncMock(return_value=False)
-        ),
-    ):
-        result = await service.create_busy_slot(
+    full_day, busy_day = available_dates[0], available_dates[1]
+    working_minutes = len(time_slots) * schedule_settings.slot_duration_minutes
+    session.add_all(
+        [
+            Schedule(
+                visit_datetime=datetime.combine(full_day, time_slots[0]),
+                visit_duration=working_minutes,
+                is_booked=True,
+            ),
+            Schedule(
+                visit_datetime=datetime.combine(busy_day, time_slots[0]),
+                visit_duration=schedule_settings.slot_duration_minutes,
+                is_booked=True,
+            ),
+        ]
+    )
+    await session.commit()
+
+    capacity = await schedule_service.get_day_capacity(session, schedule_settings)
+
+    assert capacity[full_day] == 0
+    assert capacity[busy_day] == len(time_slots) - 1
+    assert set(capacity) == set(available_dates)
+
+
+@pytest.mark.asyncio
+async def test_overlapping_bookings_rejected_by_constraint(
+    session: AsyncSession, available_dates: list[date]
+):
+    visit_date = available_dates[0]
+    session.add(
+        Schedule(
+            visit_datetime=datetime.combine(visit_date, time(10, 0)),
+            visit_duration=120,
+            is_booked=True,
+        )
+    )
+    await session.commit()
+
+    session.add(
+        Schedule(
+            visit_datetime=datetime.combine(visit_date, time(11, 30)),
+            visit_duration=30,
+            is_booked=True,
+        )
+    )
+    with pytest.raises(IntegrityError):
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_create_busy_slot_on_day_off(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    create_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings,
+    mock_bot,
+):
+    session.add(DaysOff(day_off=available_dates[0]))
+    await session.commit()
+
+    with pytest.raises(BookingError, match=SlotStatus.DAY_OFF.value):
+        await schedule_service.create_busy_slot(
             session=session,
             bot=mock_bot,
-            visit_date=visit_date,
-            visit_time=visit_time,
-            user_telegram_id=user_telegram_id,
+            visit_date=available_dates[0],
+            visit_time=time_slots[-1],
+            user_telegram_id=create_users[0].telegram_id,
             schedule_settings=schedule_settings,
-            max_user_bookings=3,
         )
 
-        assert result is None
-        mock_bot.send_message.assert_awaited_once_with(
-            chat_id=user_telegram_id,
-            text="⚠️ Достигнут лимит бронирований (3)."
-            " Отмените предыдущую запись, чтобы создать новую.",
+
+@pytest.mark.asyncio
+async def test_create_busy_slot_when_user_limit_reached(
+    session: AsyncSession,
+    schedule_service: ScheduleService,
+    create_users: list[User],
+    available_dates: list[date],
+    time_slots: list[time],
+    schedule_settings,
+    mock_bot,
+):
+    user = create_users[0]
+    snapshot = ScheduleSettingsSchema.model_validate(schedule_settings).model_copy(
+        update={"max_user_bookings": 1}
+    )
+
+    results = []
+    for visit_time in time_slots[-2:]:
+        results.append(
+            await schedule_service.create_busy_slot(
+                session=session,
+                bot=mock_bot,
+                visit_date=available_dates[-1],
+                visit_time=visit_time,
+                user_telegram_id=user.telegram_id,
+                schedule_settings=snapshot,
+            )
         )
+        await session.commit()
+
+    assert results[0] is not None
+    assert results[1] is None
+    mock_bot.send_message.assert_awaited_once_with(
+        chat_id=user.telegram_id,
+        text="⚠️ Достигнут лимит бронирований (1)."
+        " Отмените предыдущую запись, чтобы создать новую.",
+    )
 
 
 @pytest.mark.asyncio
@@ -361,6 +498,7 @@ async def test_cancel_booking_success(future_datetime):
     session = AsyncMock(spec=AsyncSession)
     user_telegram_id = 123
 
+    session.info = {}
     mock_result = MagicMock()
     mock_result.rowcount = 1
     session.execute.return_value = mock_result
@@ -373,6 +511,7 @@ async def test_cancel_booking_success(future_datetime):
 
     session.execute.assert_awaited_once()
     session.commit.assert_awaited_once()
+    assert session.info[OCCUPANCY_CHANGES] == [("release", future_datetime)]
 
 
 @pytest.mark.asyncio
@@ -380,6 +519,7 @@ async def test_cancel_booking_not_found(future_datetime):
     session = AsyncMock(spec=AsyncSession)
     user_telegram_id = 123
 
+    session.info = {}
     mock_result = MagicMock()
     mock_result.rowcount = 0
     session.execute.return_value = mock_result
@@ -393,3 +533,5 @@ async def test_cancel_booking_not_found(future_datetime):
 
     session.execute.assert_awaited_once()
     session.commit.assert_awaited_once()
+    # Слот мог принадлежать чужой записи, поэтому индекс занятости не трогается
+    assert OCCUPANCY_CHANGES not in session.info
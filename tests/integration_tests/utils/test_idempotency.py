@@ -0,0 +1,65 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from redis.asyncio.client import Redis
+
+from src.config import settings
+from src.utils.idempotency import PENDING, IdempotencyStore
+
+PREFIX = "test-idempotency"
+
+
+@pytest.fixture
+async def redis() -> AsyncGenerator[Redis, None]:
+    client = Redis(
+        host=settings.REDIS_HOST,
+        password=settings.REDIS_PASSWORD,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DATABASE,
+        decode_responses=True,
+    )
+    yield client
+    keys = await client.keys(f"{PREFIX}:*")
+    if keys:
+        await client.delete(*keys)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_only_one_concurrent_claim_wins(redis: Redis):
+    store = IdempotencyStore(redis, ttl=5, prefix=PREFIX)
+
+    results = await asyncio.gather(
+        *(
+            store.claim(store.keys(str(callback_id), 1, "confirm_yes"))
+            for callback_id in range(10)
+        )
+    )
+
+    assert results.count(None) == 1
+    assert results.count(PENDING) == 9
+
+
+@pytest.mark.asyncio
+async def test_duplicate_gets_finished_result_until_ttl(redis: Redis):
+    store = IdempotencyStore(redis, ttl=0.2, prefix=PREFIX)
+    keys = store.keys("1", 1, "timeline_10:30")
+
+    assert await store.claim(keys) is None
+    await store.finish(keys, "✅ Вы записаны")
+    assert await store.claim(store.keys("2", 1, "timeline_10:30")) == "✅ Вы записаны"
+
+    await asyncio.sleep(0.3)
+    assert await store.claim(store.keys("3", 1, "timeline_10:30")) is None
+
+
+@pytest.mark.asyncio
+async def test_release_allows_retry(redis: Redis):
+    store = IdempotencyStore(redis, ttl=5, prefix=PREFIX)
+    keys = store.keys("1", 1, "confirm_yes")
+
+    await store.claim(keys)
+    await store.release(keys)
+
+    assert await store.claim(keys) is None
@@ -0,0 +1,78 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import date, datetime, time
+
+import pytest
+from redis.asyncio.client import Redis
+
+from src.config import settings
+from src.utils.slot_holds import SlotHoldStore
+
+PREFIX = "test-slot-hold"
+VISIT_DATE = date(2025, 3, 3)
+
+
+@pytest.fixture
+async def redis() -> AsyncGenerator[Redis, None]:
+    client = Redis(
+        host=settings.REDIS_HOST,
+        password=settings.REDIS_PASSWORD,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DATABASE,
+        decode_responses=True,
+    )
+    yield client
+    keys = await client.keys(f"{PREFIX}:*")
+    if keys:
+        await client.delete(*keys)
+    await client.aclose()
+
+
+@pytest.fixture
+def store(redis: Redis) -> SlotHoldStore:
+    return SlotHoldStore(redis, ttl=5, prefix=PREFIX)
+
+
+def _at(hour: int) -> datetime:
+    return datetime.combine(VISIT_DATE, time(hour, 0))
+
+
+@pytest.mark.asyncio
+async def test_held_slot_hidden_from_others_only(store: SlotHoldStore):
+    assert await store.hold(1, _at(10))
+    assert not await store.hold(2, _at(10))
+    # Повторное удержание своего слота продлевает удержание
+    assert await store.hold(1, _at(10))
+
+    candidates = [time(9, 0), time(10, 0), time(11, 0)]
+    assert await store.held_by_others(2, VISIT_DATE, candidates) == {time(10, 0)}
+    assert await store.held_by_others(1, VISIT_DATE, candidates) == set()
+
+
+@pytest.mark.asyncio
+async def test_new_hold_releases_previous_one(store: SlotHoldStore):
+    assert await store.hold(1, _at(10))
+    assert await store.hold(1, _at(11))
+
+    assert await store.hold(2, _at(10))
+    assert not await store.hold(2, _at(11))
+
+
+@pytest.mark.asyncio
+async def test_release_frees_slot(store: SlotHoldStore):
+    await store.hold(1, _at(10))
+    await store.release(1)
+
+    assert await store.hold(2, _at(10))
+    # Снятие удержания, которого уже нет, не трогает чужой слот
+    await store.release(1)
+    assert not await store.hold(1, _at(10))
+
+
+@pytest.mark.asyncio
+async def test_hold_expires_after_ttl(redis: Redis):
+    store = SlotHoldStore(redis, ttl=0.05, prefix=PREFIX)
+    await store.hold(1, _at(10))
+
+    await asyncio.sleep(0.1)
+    assert await store.hold(2, _at(10))
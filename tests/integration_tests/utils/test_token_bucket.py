@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from redis.asyncio.client import Redis
+
+from src.config import settings
+from src.utils.token_bucket import BucketLimit, TokenBucketLimiter
+
+PREFIX = "test-throttle"
+
+
+@pytest.fixture
+async def redis() -> AsyncGenerator[Redis, None]:
+    client = Redis(
+        host=settings.REDIS_HOST,
+        password=settings.REDIS_PASSWORD,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DATABASE,
+        decode_responses=True,
+    )
+    yield client
+    keys = await client.keys(f"{PREFIX}:*")
+    if keys:
+        await client.delete(*keys)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_user_bucket_exhausts_and_refills(redis: Redis):
+    limiter = TokenBucketLimiter(redis, prefix=PREFIX)
+    user_limit = BucketLimit(capacity=2, rate=10)
+    global_limit = BucketLimit(capacity=100, rate=100)
+
+    results = [
+        await limiter.acquire("book", 1, user_limit, global_limit) for _ in range(3)
+    ]
+
+    assert results[:2] == [0, 0]
+    assert 0 < results[2] <= 0.1
+
+    await asyncio.sleep(results[2] + 0.05)
+    assert await limiter.acquire("book", 1, user_limit, global_limit) == 0
+
+
+@pytest.mark.asyncio
+async def test_global_bucket_is_shared_between_users(redis: Redis):
+    limiter = TokenBucketLimiter(redis, prefix=PREFIX)
+    user_limit = BucketLimit(capacity=5, rate=1)
+    global_limit = BucketLimit(capacity=3, rate=0.1)
+
+    results = await asyncio.gather(
+        *(
+            limiter.acquire("timeline", user_id, user_limit, global_limit)
+            for user_id in range(5)
+        )
+    )
+
+    assert sum(1 for retry_after in results if retry_after == 0) == 3
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Router
+from aiogram.types import Message
+
+from src.ingestion.lanes import LanesDispatcher, UpdateLanes
+
+
+async def test_same_key_runs_one_at_a_time_in_order():
+    lanes = UpdateLanes(limit=10)
+    events: list[tuple[str, int]] = []
+
+    async def job(number: int) -> int:
+        events.append(("start", number))
+        await asyncio.sleep(0.001)
+        events.append(("end", number))
+        return number
+
+    results = await asyncio.gather(
+        *(lanes.run(1, lambda n=n: job(n)) for n in range(5))
+    )
+
+    assert results == [0, 1, 2, 3, 4]
+    assert events == [(kind, n) for n in range(5) for kind in ("start", "end")]
+
+
+async def test_different_keys_run_in_parallel_up_to_limit():
+    lanes = UpdateLanes(limit=3)
+    running = 0
+    max_running = 0
+
+    async def job() -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.005)
+        running -= 1
+
+    await asyncio.gather(*(lanes.run(key, job) for key in range(10)))
+
+    assert max_running == 3
+
+
+async def test_stats_report_queue_depth_and_lanes():
+    lanes = UpdateLanes(limit=1)
+    release = asyncio.Event()
+
+    async def job() -> None:
+        await release.wait()
+
+    tasks = [asyncio.create_task(lanes.run(key, job)) for key in (1, 1, 2)]
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    stats = lanes.stats
+    assert stats.running == 1
+    assert stats.queue_depth == 2
+    assert stats.active_lanes == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert lanes.stats.active_lanes == 0
+    assert lanes.stats.queue_depth == 0
+
+
+async def test_exception_is_returned_to_caller_and_lane_continues():
+    lanes = UpdateLanes(limit=2)
+
+    async def failing() -> None:
+        raise ValueError("boom")
+
+    async def ok() -> str:
+        return "ok"
+
+    results = await asyncio.gather(
+        lanes.run(1, failing), lanes.run(1, ok), return_exceptions=True
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "ok"
+
+
+def test_limit_must_be_positive():
+    with pytest.raises(ValueError):
+        UpdateLanes(limit=0)
+
+
+async def test_dispatcher_serializes_updates_of_one_user(bench_bot: Bot):
+    handled: list[str] = []
+    router = Router()
+
+    @router.message()
+    async def on_message(message: Message) -> None:
+        await asyncio.sleep(0.001 if message.text == "first" else 0)
+        handled.append(message.text or "")
+
+    dp = LanesDispatcher(lanes=UpdateLanes(limit=10))
+    dp.include_router(router)
+
+    await asyncio.gather(
+        dp.feed_raw_update(bench_bot, _raw_message(1, "first")),
+        dp.feed_raw_update(bench_bot, _raw_message(2, "second")),
+    )
+
+    assert handled == ["first", "second"]
+
+
+def _raw_message(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+@pytest.fixture
+def bench_bot() -> Bot:
+    return Bot(token="42:TEST")  # noqa: S106
@@ -0,0 +1,127 @@
+# ruff: noqa: ARG001, ARG005
+import asyncio
+import signal
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+
+from src.ingestion.lanes import LanesDispatcher, UpdateLanes
+from src.ingestion.resumable import ResumablePoller
+
+
+class FakeJournal:
+    def __init__(self, pending: list[dict] | None = None, offset: int | None = None):
+        self.pending_updates = pending or []
+        self.offset = offset
+        self.events: list[tuple[str, int]] = []
+
+    async def get_offset(self) -> int | None:
+        return self.offset
+
+    async def record(self, updates: list[Update]) -> None:
+        self.events.extend(("record", update.update_id) for update in updates)
+        self.offset = updates[-1].update_id + 1
+
+    async def complete(self, update_id: int) -> None:
+        self.events.append(("complete", update_id))
+
+    async def pending(self) -> list[dict]:
+        return self.pending_updates
+
+
+def _make_poller(bot, dp, journal: FakeJournal) -> ResumablePoller:
+    poller = ResumablePoller(
+        bot=bot,
+        dp=dp,
+        redis=MagicMock(),
+        replay_rate=1000,
+        max_pending_updates=10,
+        drain_timeout=1,
+    )
+    poller.journal = journal  # type: ignore[assignment]
+    return poller
+
+
+def _make_dp(fed: list[int]) -> MagicMock:
+    dp = MagicMock()
+    dp.resolve_used_update_types.return_value = ["message"]
+    dp.feed_update = AsyncMock(
+        side_effect=lambda bot, update, **kwargs: fed.append(update.update_id)
+    )
+    return dp
+
+
+async def test_journal_is_replayed_in_order_and_completed():
+    fed: list[int] = []
+    journal = FakeJournal(pending=[{"update_id": 3}, {"update_id": 4}])
+    poller = _make_poller(MagicMock(), _make_dp(fed), journal)
+
+    await poller._replay_journal()
+    await poller._drain()
+
+    assert fed == [3, 4]
+    assert sorted(journal.events) == [("complete", 3), ("complete", 4)]
+
+
+async def test_updates_are_recorded_before_processing_and_offset_resumes():
+    fed: list[int] = []
+    journal = FakeJournal(offset=10)
+    bot = MagicMock()
+    bot.session.timeout = 60
+    poller = _make_poller(bot, _make_dp(fed), journal)
+
+    async def get_updates(offset, **kwargs):
+        if offset == 10:
+            return [Update(update_id=10), Update(update_id=11)]
+        poller.stop()
+        await asyncio.sleep(1)
+        return []
+
+    bot.get_updates = AsyncMock(side_effect=get_updates)
+
+    await poller._poll()
+    await poller._drain()
+
+    assert fed == [10, 11]
+    assert journal.events[:2] == [("record", 10), ("record", 11)]
+    assert journal.offset == 12
+    assert bot.get_updates.await_args_list[0].kwargs["offset"] == 10
+
+
+async def test_shutdown_waits_for_in_flight_updates_before_closing_storage():
+    events: list[str] = []
+    storage = MemoryStorage()
+    storage.close = AsyncMock(side_effect=lambda: events.append("storage closed"))
+    dp = LanesDispatcher(storage=storage, lanes=UpdateLanes(limit=5), drain_timeout=1)
+
+    async def slow_update() -> None:
+        await asyncio.sleep(0.01)
+        events.append("handled")
+
+    in_flight = asyncio.create_task(dp.lanes.run(1, slow_update))
+    await asyncio.sleep(0)
+    await dp.emit_shutdown()
+    await in_flight
+
+    assert events == ["handled", "storage closed"]
+
+
+async def test_startup_and_shutdown_get_workflow_data():
+    bot = MagicMock()
+    bot.delete_webhook = AsyncMock()
+    dp = _make_dp([])
+    dp.workflow_data = {"slot_holds": "holds"}
+    dp.emit_startup = AsyncMock()
+    dp.emit_shutdown = AsyncMock()
+    poller = _make_poller(bot, dp, FakeJournal())
+    poller._poll = AsyncMock()  # type: ignore[method-assign]
+
+    try:
+        await poller.run()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().remove_signal_handler(sig)
+
+    for emit in (dp.emit_startup, dp.emit_shutdown):
+        emit.assert_awaited_once_with(bot=bot, dispatcher=dp, slot_holds="holds")
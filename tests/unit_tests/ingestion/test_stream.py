@@ -0,0 +1,80 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.ingestion.stream import (
+    CONSUMER_GROUP,
+    UpdateStreamProducer,
+    UpdateStreamWorker,
+    extract_user_id,
+    shard_for_update,
+    shards_for_worker,
+    stream_name,
+)
+
+
+def _raw_update(update_id: int, user_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "chat_instance": "1",
+            "data": "book",
+        },
+    }
+
+
+def test_extract_user_id_from_nested_object():
+    assert extract_user_id(_raw_update(1, 777)) == 777
+    assert extract_user_id({"update_id": 1}) is None
+
+
+def test_same_user_always_goes_to_same_shard():
+    shards = {shard_for_update(_raw_update(i, 12345), 16) for i in range(50)}
+    assert len(shards) == 1
+
+
+@pytest.mark.parametrize("worker_count", [1, 3, 4])
+def test_shards_are_split_between_workers_without_overlap(worker_count):
+    assigned = [
+        shard
+        for worker_index in range(worker_count)
+        for shard in shards_for_worker(worker_index, worker_count, 16)
+    ]
+    assert sorted(assigned) == list(range(16))
+
+
+async def test_producer_publishes_into_user_shard():
+    redis = AsyncMock()
+    producer = UpdateStreamProducer(redis=redis, shards=4, maxlen=100)
+
+    await producer.publish(_raw_update(1, 6))
+
+    stream, fields = redis.xadd.await_args.args
+    assert stream == stream_name(6 % 4)
+    assert json.loads(fields["update"])["update_id"] == 1
+
+
+async def test_worker_feeds_updates_in_order_and_acks_them():
+    redis = AsyncMock()
+    dp = MagicMock()
+    fed: list[int] = []
+    dp.feed_raw_update = AsyncMock(
+        side_effect=lambda **kwargs: fed.append(kwargs["update"]["update_id"])
+    )
+    worker = UpdateStreamWorker(
+        redis=redis, dp=dp, bot=MagicMock(), shards=[0], consumer_name="worker-0"
+    )
+
+    for entry_id, update_id in (("1-0", 1), ("2-0", 2)):
+        await worker._process_entry(
+            stream_name(0), entry_id, {"update": json.dumps(_raw_update(update_id, 1))}
+        )
+
+    assert fed == [1, 2]
+    assert [call.args for call in redis.xack.await_args_list] == [
+        (stream_name(0), CONSUMER_GROUP, "1-0"),
+        (stream_name(0), CONSUMER_GROUP, "2-0"),
+    ]
@@ -1,7 +1,24 @@
+from datetime import date, datetime, time
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from pydantic import ValidationError
 
+from src.keyboards.admin import (
+    bookings_page_callback,
+    create_bookings_page_keyboard,
+    create_day_bookings_keyboard,
+    create_status_update_keyboard,
+    parse_bookings_page_callback,
+)
 from src.keyboards.book import create_book_main_menu_kb
+from src.keyboards.cache import STATIC_KEYBOARDS, KeyboardCache, keyboard_cache
+from src.keyboards.calendar import (
+    create_calendar_for_available_dates,
+    create_choose_time_keyboard,
+)
+from src.services.admin import BookingPage, BookingsFilter
 
 
 @pytest.mark.asyncio
@@ -21,3 +38,208 @@ async def test_book_keyboard() -> None:
         button = keyboard.inline_keyboard[i][0]
         assert isinstance(button, InlineKeyboardButton)
         assert button.text == expected_text
+
+
+def _day_buttons(keyboard: InlineKeyboardMarkup) -> dict[str, str]:
+    return {
+        button.callback_data: button.text
+        for row in keyboard.inline_keyboard
+        for button in row
+        if button.callback_data and button.callback_data.startswith("choose_date_")
+    }
+
+
+def test_calendar_without_capacity_shows_plain_days() -> None:
+    keyboard = create_calendar_for_available_dates({date(2025, 3, 3)})
+
+    assert _day_buttons(keyboard) == {"choose_date_2025_3_3": "3"}
+
+
+def test_calendar_disables_full_days_and_shows_free_slots() -> None:
+    capacity = {date(2025, 3, 3): 0, date(2025, 3, 4): 5, date(2025, 4, 1): 1}
+
+    keyboard = create_calendar_for_available_dates(set(capacity), capacity=capacity)
+
+    assert _day_buttons(keyboard) == {
+        "choose_date_2025_3_4": "4·5",
+        "choose_date_2025_4_1": "1·1",
+    }
+    # 3 марта 2025 — понедельник второй недели месяца
+    full_day = keyboard.inline_keyboard[3][0]
+    assert full_day.text == "🔴"
+    assert full_day.callback_data == "ignore"
+
+
+@pytest.mark.asyncio
+async def test_time_keyboard_hides_slots_held_by_others() -> None:
+    keyboard_cache.clear()
+    schedule_service = AsyncMock()
+    schedule_service.get_availability_version.return_value = (1, 0)
+    schedule_service.get_free_times.return_value = {time(9, 0), time(9, 30)}
+
+    keyboard = await create_choose_time_keyboard(
+        time_slots=[time(9, 0), time(9, 30), time(10, 0)],
+        session=AsyncMock(),
+        schedule_service=schedule_service,
+        visit_date=date(2025, 3, 3),
+        schedule_settings=AsyncMock(),
+        held_times={time(9, 30)},
+    )
+
+    callbacks = [row[0].callback_data for row in keyboard.inline_keyboard]
+    assert callbacks == [
+        "timeline_09:00",
+        "unavailable_time",
+        "unavailable_time",
+        "cancel",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_time_keyboard_rebuilt_only_after_version_change() -> None:
+    keyboard_cache.clear()
+    schedule_service = AsyncMock()
+    schedule_service.get_availability_version.return_value = (1, 0)
+    schedule_service.get_free_times.side_effect = lambda **_: {time(9, 0)}
+
+    async def render() -> InlineKeyboardMarkup:
+        return await create_choose_time_keyboard(
+            time_slots=(time(9, 0), time(9, 30)),
+            session=AsyncMock(),
+            schedule_service=schedule_service,
+            visit_date=date(2025, 3, 3),
+            schedule_settings=AsyncMock(),
+        )
+
+    first = await render()
+    assert await render() is first
+    schedule_service.get_free_times.assert_awaited_once()
+
+    schedule_service.get_availability_version.return_value = (1, 1)
+    assert await render() is not first
+    assert schedule_service.get_free_times.await_count == 2
+
+
+def test_keyboard_cache_evicts_least_recently_used() -> None:
+    cache = KeyboardCache(maxsize=2)
+    markups = [InlineKeyboardMarkup(inline_keyboard=[]) for _ in range(3)]
+
+    cache.put("a", markups[0])
+    cache.put("b", markups[1])
+    assert cache.get("a") is markups[0]
+    cache.put("c", markups[2])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is markups[0]
+    assert len(cache) == 2
+
+
+def test_static_keyboards_built_once_and_frozen() -> None:
+    keyboard = create_book_main_menu_kb()
+
+    assert create_book_main_menu_kb() is keyboard
+    assert STATIC_KEYBOARDS["create_book_main_menu_kb"] is keyboard
+    with pytest.raises(ValidationError):
+        keyboard.inline_keyboard = []
+
+
+def test_cached_keyboard_rows_and_buttons_cannot_be_mutated() -> None:
+    keyboard = create_status_update_keyboard(schedule_id=3, telegram_id=100)
+    row = keyboard.inline_keyboard[0]
+
+    with pytest.raises(AttributeError):
+        row.append(InlineKeyboardButton(text="x", callback_data="x"))  # type: ignore[attr-defined]
+    with pytest.raises(ValidationError):
+        row[0].text = "x"
+
+    again = create_status_update_keyboard(schedule_id=3, telegram_id=100)
+    assert [button.text for button in again.inline_keyboard[0]] == [
+        "✅ Подтвердить",
+        "❌ Отклонить",
+        "⏳ Ожидание",
+    ]
+
+
+def test_frozen_keyboard_sent_as_plain_keyboard() -> None:
+    build = create_book_main_menu_kb.__wrapped__  # type: ignore[attr-defined]
+
+    assert create_book_main_menu_kb().model_dump() == build().model_dump()
+
+
+def test_status_update_keyboard_reused_per_booking() -> None:
+    keyboard = create_status_update_keyboard(schedule_id=1, telegram_id=100)
+
+    assert create_status_update_keyboard(schedule_id=1, telegram_id=100) is keyboard
+    assert create_status_update_keyboard(schedule_id=2, telegram_id=100) is not (
+        keyboard
+    )
+    assert keyboard.inline_keyboard[0][0].callback_data == "accept_1"
+
+
+def _booking_row(schedule_id: int, hour: int) -> MagicMock:
+    row = MagicMock()
+    row.id = schedule_id
+    row.visit_datetime = datetime(2025, 3, 3, hour, 0)
+    row.is_approved = None
+    return row
+
+
+def test_bookings_page_keyboard_navigation() -> None:
+    rows = [_booking_row(7, 10), _booking_row(8, 11)]
+
+    keyboard = create_bookings_page_keyboard(
+        BookingPage(rows=rows, has_prev=True, has_next=True)
+    )
+
+    assert [button.callback_data for button in keyboard.inline_keyboard[2]] == [
+        "bookings_prev_all_any_20250303100000_7",
+        "bookings_next_all_any_20250303110000_8",
+    ]
+    assert keyboard.inline_keyboard[-2][0].callback_data == "bookings_filters"
+    assert keyboard.inline_keyboard[-1][0].callback_data == "cancel"
+
+    single = create_bookings_page_keyboard(
+        BookingPage(rows=rows, has_prev=False, has_next=False)
+    )
+    assert len(single.inline_keyboard) == 4
+
+
+def test_bookings_page_keyboard_keeps_filter() -> None:
+    rows = [_booking_row(7, 10)]
+
+    keyboard = create_bookings_page_keyboard(
+        BookingPage(rows=rows, has_prev=False, has_next=True),
+        BookingsFilter(period="week", status="pending"),
+    )
+
+    assert (
+        keyboard.inline_keyboard[1][0].callback_data
+        == "bookings_next_week_pending_20250303100000_7"
+    )
+
+
+def test_bookings_page_callback_round_trip() -> None:
+    cursor = (datetime(2025, 3, 3, 10, 30), 12345)
+    bookings_filter = BookingsFilter(period="today", status="approved")
+
+    data = bookings_page_callback("next", bookings_filter, cursor)
+
+    assert len(data.encode()) <= 64
+    assert parse_bookings_page_callback(data) == ("next", bookings_filter, cursor)
+
+
+def test_day_bookings_keyboard_links_neighbour_days() -> None:
+    row = _booking_row(7, 10)
+    row.first_name = "Анна"
+
+    keyboard = create_day_bookings_keyboard([row], date(2025, 3, 1))
+
+    assert keyboard.inline_keyboard[0][0].callback_data == "schedule_7"
+    assert "Анна" in keyboard.inline_keyboard[0][0].text
+    assert [button.callback_data for button in keyboard.inline_keyboard[1]] == [
+        "bookings_day_20250228",
+        "bookings_day_20250302",
+    ]
+
+    empty = create_day_bookings_keyboard([], date(2025, 3, 1))
+    assert len(empty.inline_keyboard) == 3
@@ -0,0 +1,149 @@
+# ruff: noqa: ARG001
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.methods import SendMessage
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.config import settings
+from src.ingestion.lanes import UpdateLanes
+from src.metrics import (
+    InstrumentedRedis,
+    MetricsRegistry,
+    TelegramCallsMiddleware,
+    UpdateStats,
+    create_metrics_app,
+    current_update_stats,
+    instrument_lanes,
+)
+from src.metrics.instrumentation import _count_statement
+from src.middlewares.metrics import MetricsMiddleware
+
+
+async def show_days() -> None: ...
+
+
+def test_render_histogram_is_cumulative():
+    registry = MetricsRegistry()
+    registry.observe("show_days", 0.003, UpdateStats(sql_statements=2))
+    registry.observe("show_days", 0.2, UpdateStats(sql_statements=3), failed=True)
+
+    text = registry.render()
+
+    assert (
+        'bot_handler_duration_seconds_bucket{handler="show_days",le="0.005"} 1' in text
+    )
+    assert (
+        'bot_handler_duration_seconds_bucket{handler="show_days",le="0.25"} 2' in text
+    )
+    assert (
+        'bot_handler_duration_seconds_bucket{handler="show_days",le="+Inf"} 2' in text
+    )
+    assert 'bot_handler_duration_seconds_count{handler="show_days"} 2' in text
+    assert 'bot_handler_sql_statements_total{handler="show_days"} 5' in text
+    assert 'bot_handler_errors_total{handler="show_days"} 1' in text
+
+
+async def test_middleware_collects_resources_of_handler():
+    registry = MetricsRegistry()
+    middleware = MetricsMiddleware(registry)
+    make_request = AsyncMock()
+
+    async def handler(event, data) -> None:
+        _count_statement()
+        _count_statement()
+        await TelegramCallsMiddleware()(
+            make_request, MagicMock(), SendMessage(chat_id=1, text="ok")
+        )
+
+    await middleware(
+        handler, MagicMock(), {"handler": HandlerObject(callback=show_days)}
+    )
+
+    metrics = registry.handlers["show_days"]
+    assert metrics.count == 1
+    assert metrics.sql_statements == 2
+    assert metrics.telegram_calls == 1
+    assert metrics.errors == 0
+    assert current_update_stats.get() is None
+
+
+async def test_middleware_counts_errors():
+    registry = MetricsRegistry()
+    handler = AsyncMock(side_effect=ValueError("ошибка"))
+
+    with pytest.raises(ValueError):
+        await MetricsMiddleware(registry)(
+            handler, MagicMock(), {"handler": HandlerObject(callback=show_days)}
+        )
+
+    assert registry.handlers["show_days"].errors == 1
+
+
+async def test_instrumented_redis_counts_commands(monkeypatch):
+    monkeypatch.setattr(
+        "redis.asyncio.client.Redis.execute_command", AsyncMock(return_value=True)
+    )
+    redis = InstrumentedRedis()
+    stats = UpdateStats()
+    token = current_update_stats.set(stats)
+    try:
+        await redis.get("key")
+        await redis.set("key", "value")
+    finally:
+        current_update_stats.reset(token)
+
+    assert stats.redis_calls == 2
+
+
+async def test_metrics_endpoint_serves_prometheus_text():
+    registry = MetricsRegistry()
+    registry.observe("finish_booking", 0.05, UpdateStats(redis_calls=1))
+
+    async with TestClient(TestServer(create_metrics_app(registry))) as client:
+        response = await client.get("/metrics")
+        body = await response.text()
+
+    assert response.status == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'bot_handler_redis_calls_total{handler="finish_booking"} 1' in body
+
+
+async def test_metrics_endpoint_serves_lanes_gauges():
+    registry = MetricsRegistry()
+    lanes = UpdateLanes(limit=4)
+    instrument_lanes(registry, lanes)
+    release = asyncio.Event()
+    jobs = [
+        asyncio.create_task(lanes.run(user_id, release.wait)) for user_id in (1, 1, 2)
+    ]
+    await asyncio.sleep(0)
+
+    async with TestClient(TestServer(create_metrics_app(registry))) as client:
+        body = await (await client.get("/metrics")).text()
+    release.set()
+    await asyncio.gather(*jobs)
+
+    assert "# TYPE bot_lanes_queue_depth gauge" in body
+    assert "bot_lanes_limit 4" in body
+    assert "bot_lanes_running 2" in body
+    assert "bot_lanes_queue_depth 1" in body
+    assert "bot_lanes_active_lanes 2" in body
+
+
+@pytest.mark.parametrize(
+    "role, worker_index, port",
+    [("off", 0, 9100), ("receiver", 0, 9100), ("worker", 0, 9101), ("worker", 3, 9104)],
+)
+def test_metrics_port_differs_per_worker(role, worker_index, port):
+    worker_settings = settings.model_copy(
+        update={
+            "METRICS_PORT": 9100,
+            "UPDATE_QUEUE_ROLE": role,
+            "WORKER_INDEX": worker_index,
+        }
+    )
+
+    assert worker_settings.metrics_port == port
@@ -0,0 +1,133 @@
+# ruff: noqa: ARG001
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+
+from src.exceptions.sql_budget import SqlBudgetExceededError
+from src.metrics.sql_budget import (
+    SqlTrace,
+    _after_execute,
+    _before_execute,
+    handler_budgets,
+    track_sql,
+)
+from src.middlewares.error_handler import ErrorHandlerMiddleware
+from src.middlewares.sql_budget import SqlBudgetMiddleware
+from src.routers import router
+from src.services.admin import AdminService
+
+SELECT_DAY_OFF = "SELECT days_off.day_off FROM days_off WHERE days_off.day_off = $1"
+
+
+async def show_days() -> None: ...
+
+
+def _execute(conn: SimpleNamespace, statement: str) -> None:
+    _before_execute(conn, None, statement)
+    _after_execute(conn, None, statement)
+
+
+def _handler_object(budget: int | None) -> HandlerObject:
+    flags = {} if budget is None else {"sql_budget": budget}
+    return HandlerObject(callback=show_days, flags=flags)
+
+
+def test_trace_records_statements_only_inside_update():
+    conn = SimpleNamespace(info={})
+    _execute(conn, "SELECT 1")
+
+    with track_sql() as trace:
+        _execute(conn, "SELECT 1")
+        _execute(conn, "SELECT 2")
+
+    assert [statement for statement, _ in trace.statements] == ["SELECT 1", "SELECT 2"]
+
+
+def test_trace_detects_budget_and_repeated_statements():
+    trace = SqlTrace(
+        statements=[(SELECT_DAY_OFF, 0.001), (SELECT_DAY_OFF, 0.001), ("SELECT 1", 0.0)]
+    )
+
+    problems = trace.violations(budget=2)
+
+    assert trace.repeated() == {SELECT_DAY_OFF: 2}
+    assert len(problems) == 2
+    assert "3 запросов при бюджете 2" in problems[0]
+    assert SqlTrace(statements=[("SELECT 1", 0.0)]).violations(budget=1) == []
+
+
+async def test_middleware_raises_over_budget():
+    conn = SimpleNamespace(info={})
+
+    async def handler(event, data) -> None:
+        _execute(conn, "SELECT 1")
+        _execute(conn, "SELECT 2")
+
+    with pytest.raises(SqlBudgetExceededError, match="show_days"):
+        await SqlBudgetMiddleware(mode="raise")(
+            handler, MagicMock(), {"handler": _handler_object(budget=1)}
+        )
+
+
+async def test_middleware_logs_n_plus_one_in_log_mode(caplog):
+    conn = SimpleNamespace(info={})
+
+    async def handler(event, data) -> str:
+        for _ in range(3):
+            _execute(conn, SELECT_DAY_OFF)
+        return "ok"
+
+    result = await SqlBudgetMiddleware(mode="log")(
+        handler, MagicMock(), {"handler": _handler_object(budget=5)}
+    )
+
+    assert result == "ok"
+    assert "запрос повторён 3 раз" in caplog.text
+
+
+async def test_middleware_skips_unsampled_updates():
+    conn = SimpleNamespace(info={})
+
+    async def handler(event, data) -> None:
+        _execute(conn, "SELECT 1")
+
+    await SqlBudgetMiddleware(mode="raise", sample_rate=0)(
+        handler, MagicMock(), {"handler": _handler_object(budget=None)}
+    )
+
+
+async def test_error_handler_does_not_swallow_budget_errors():
+    handler = AsyncMock(side_effect=SqlBudgetExceededError("show_days"))
+
+    with pytest.raises(SqlBudgetExceededError):
+        await ErrorHandlerMiddleware()(handler, MagicMock(), {})
+
+
+def test_every_database_handler_declares_sql_budget():
+    budgets = handler_budgets(router)
+    missing = [
+        handler.callback.__name__
+        for child in router.chain_tail
+        for observer in child.observers.values()
+        for handler in observer.handlers
+        if "session" in handler.params and budgets[handler.callback] is None
+    ]
+
+    assert missing == []
+
+
+async def test_set_workdays_inserts_all_days_in_one_statement():
+    session = AsyncMock()
+    session.info = {}
+
+    await AdminService.set_workdays(
+        first_day=date(2025, 3, 3),
+        last_day=date(2025, 3, 9),
+        is_work=False,
+        session=session,
+    )
+
+    session.execute.assert_awaited_once()
@@ -0,0 +1,154 @@
+# ruff: noqa: ARG002, ASYNC109, S106
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.middlewares.db import LazySession
+from src.middlewares.dependencies import DependencyMiddleware
+from src.routers import router
+from src.utils.get_admins_ids import admin_ids_cache
+from src.utils.register_middlewares import register_middlewares
+
+USER = {"id": 100, "is_bot": False, "first_name": "Катя"}
+CHAT = {"id": 100, "type": "private"}
+
+
+class NullSession(BaseSession):
+    """Сессия бота, которая отвечает успехом на любой запрос к Telegram"""
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None
+    ) -> Any:
+        return True
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator:
+        raise NotImplementedError
+        yield b""
+
+    async def close(self) -> None:
+        return None
+
+
+class PoolCheckouts:
+    """Считает попытки взять соединение из пустого пула"""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    async def connect(self) -> Any:
+        self.count += 1
+        raise ConnectionRefusedError("база в тестах недоступна")
+
+
+@pytest.fixture(scope="module")
+def checkouts() -> PoolCheckouts:
+    return PoolCheckouts()
+
+
+@pytest.fixture(scope="module")
+def dp(checkouts: PoolCheckouts) -> Dispatcher:
+    engine = create_async_engine(
+        "postgresql+asyncpg://", async_creator=checkouts.connect
+    )
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession)
+
+    dispatcher = Dispatcher(storage=MemoryStorage())
+    dispatcher.include_router(router)
+    with patch(
+        "src.utils.register_middlewares.DependencyMiddleware",
+        lambda: DependencyMiddleware(factory),
+    ):
+        register_middlewares(dispatcher)
+    return dispatcher
+
+
+@pytest.fixture
+def bot() -> Bot:
+    return Bot(token="42:TEST", session=NullSession())
+
+
+def _message(text: str) -> dict[str, Any]:
+    return {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": int(datetime.now(UTC).timestamp()),
+            "chat": CHAT,
+            "from": USER,
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }
+
+
+def _callback(data: str) -> dict[str, Any]:
+    return {
+        "update_id": 1,
+        "callback_query": {
+            "id": "1",
+            "from": USER,
+            "chat_instance": "1",
+            "data": data,
+            "message": {
+                "message_id": 1,
+                "date": int(datetime.now(UTC).timestamp()),
+                "chat": CHAT,
+                "text": "Меню",
+            },
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "raw_update",
+    [
+        _message("/cancel"),
+        _message("/info"),
+        _callback("profile_keep_name"),
+        _callback("unavailable_time"),
+    ],
+    ids=["cancel", "info", "profile_keep_name", "unavailable_time"],
+)
+async def test_db_free_handlers_do_not_checkout_connection(
+    dp: Dispatcher, bot: Bot, checkouts: PoolCheckouts, raw_update: dict[str, Any]
+):
+    before = checkouts.count
+
+    await dp.feed_update(bot, Update.model_validate(raw_update))
+
+    assert checkouts.count == before
+
+
+async def test_db_handler_checks_out_connection(
+    dp: Dispatcher, bot: Bot, checkouts: PoolCheckouts
+):
+    admin_ids_cache.invalidate()
+    before = checkouts.count
+
+    await dp.feed_update(bot, Update.model_validate(_message("/admin")))
+
+    assert checkouts.count > before
+
+
+async def test_lazy_session_not_created_without_access():
+    created = []
+
+    def factory() -> AsyncSession:
+        created.append(True)
+        raise AssertionError("сессия не должна создаваться")
+
+    session = LazySession(factory)  # type: ignore[arg-type]
+    await session.commit_if_used()
+    await session.close()
+
+    assert not session.is_used
+    assert not created
@@ -0,0 +1,124 @@
+# ruff: noqa: ARG001
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.middlewares.dependencies import DependencyMiddleware
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+from src.services.admin import AdminService
+from src.services.schedule import ScheduleService
+
+
+async def db_free(callback: CallbackQuery, state: FSMContext) -> None: ...
+
+
+async def needs_settings(
+    callback: CallbackQuery,
+    schedule_service: ScheduleService,
+    schedule_settings: ScheduleSettingsSchema,
+) -> None: ...
+
+
+async def needs_admin_session(
+    message: Message, session: AsyncSession, admin_service: AdminService
+) -> None: ...
+
+
+async def takes_everything(message: Message, **kwargs) -> None: ...
+
+
+@pytest.fixture
+def store() -> MagicMock:
+    store = MagicMock()
+    store.get = AsyncMock(return_value="snapshot")
+    return store
+
+
+@pytest.fixture
+def factory() -> MagicMock:
+    session = MagicMock()
+    session.in_transaction.return_value = False
+    session.close = AsyncMock()
+    return MagicMock(return_value=session)
+
+
+@pytest.fixture
+def middleware(factory: MagicMock, store: MagicMock) -> DependencyMiddleware:
+    return DependencyMiddleware(factory, store)
+
+
+async def _run(middleware: DependencyMiddleware, callback) -> dict:
+    handler = AsyncMock()
+    data = {"handler": HandlerObject(callback=callback)}
+
+    await middleware(handler, MagicMock(), data)
+
+    handler.assert_awaited_once()
+    data.pop("handler")
+    return data
+
+
+async def test_db_free_handler_gets_nothing(middleware, factory, store):
+    assert await _run(middleware, db_free) == {}
+    factory.assert_not_called()
+    store.get.assert_not_awaited()
+
+
+async def test_settings_handler_gets_settings_and_its_service(middleware, store):
+    data = await _run(middleware, needs_settings)
+
+    assert set(data) == {"schedule_service", "schedule_settings", "session"}
+    assert data["schedule_settings"] == "snapshot"
+    assert isinstance(data["schedule_service"], ScheduleService)
+
+
+async def test_session_handler_does_not_load_settings(middleware, store):
+    data = await _run(middleware, needs_admin_session)
+
+    assert set(data) == {"admin_service", "session"}
+    store.get.assert_not_awaited()
+
+
+async def test_varkw_handler_gets_all_dependencies(middleware):
+    data = await _run(middleware, takes_everything)
+
+    assert set(data) == {
+        "user_service",
+        "schedule_service",
+        "admin_service",
+        "session",
+        "schedule_settings",
+    }
+
+
+def test_compile_builds_plans_for_nested_routers(middleware):
+    parent, child = Router(), Router()
+    parent.include_router(child)
+    parent.callback_query.register(db_free)
+    child.message.register(needs_admin_session)
+    child.callback_query.register(needs_settings)
+
+    assert middleware.compile(parent) == 3
+
+
+async def test_session_rolled_back_when_handler_fails(middleware, factory):
+    session = factory.return_value
+    session.in_transaction.return_value = True
+    session.rollback = AsyncMock()
+
+    async def handler(event, data: dict) -> None:
+        data["session"].add(object())
+        raise ValueError("ошибка")
+
+    data = {"handler": HandlerObject(callback=needs_admin_session)}
+
+    with pytest.raises(ValueError):
+        await middleware(handler, MagicMock(), data)
+
+    session.rollback.assert_awaited_once()
+    session.close.assert_awaited_once()
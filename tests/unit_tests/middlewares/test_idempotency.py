@@ -0,0 +1,136 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import CallbackQuery, User
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.middlewares.idempotency import IdempotencyMiddleware
+from src.utils.idempotency import PENDING, IdempotencyStore
+
+
+def _callback(data: str, callback_id: str = "1") -> CallbackQuery:
+    callback = CallbackQuery(
+        id=callback_id,
+        from_user=User(id=100, is_bot=False, first_name="Катя"),
+        chat_instance="1",
+        data=data,
+    )
+    object.__setattr__(callback, "answer", AsyncMock())
+    return callback
+
+
+def _data(flags: dict, state_data: dict | None = None) -> dict:
+    state = MagicMock()
+    state.get_data = AsyncMock(return_value=state_data or {})
+    return {
+        "handler": HandlerObject(callback=lambda: None, flags=flags),
+        "state": state,
+    }
+
+
+def _store(claimed: str | None = None) -> IdempotencyStore:
+    store = IdempotencyStore(MagicMock(), ttl=30)
+    store.claim = AsyncMock(return_value=claimed)
+    store.finish = AsyncMock()
+    store.release = AsyncMock()
+    return store
+
+
+async def test_first_callback_runs_handler_and_stores_result():
+    store = _store()
+    handler = AsyncMock(return_value="✅ Вы записаны")
+    data = _data({"idempotent": ("visit_date_str",)}, {"visit_date_str": "2025_03_03"})
+
+    result = await IdempotencyMiddleware(store)(
+        handler, _callback("timeline_10:30"), data
+    )
+
+    assert result == "✅ Вы записаны"
+    keys = [
+        "idempotency:callback:1",
+        "idempotency:action:100:timeline_10:30:2025_03_03",
+    ]
+    store.claim.assert_awaited_once_with(keys)
+    store.finish.assert_awaited_once_with(keys, "✅ Вы записаны")
+
+
+@pytest.mark.parametrize(
+    "previous, answer",
+    [(PENDING, "⏳ Запрос уже обрабатывается"), ("✅ Вы записаны", "✅ Вы записаны")],
+    ids=["in_progress", "finished"],
+)
+async def test_duplicate_callback_gets_cached_result(previous, answer):
+    store = _store(claimed=previous)
+    handler = AsyncMock()
+    callback = _callback("confirm_yes", callback_id="2")
+
+    await IdempotencyMiddleware(store)(handler, callback, _data({"idempotent": ()}))
+
+    handler.assert_not_awaited()
+    callback.answer.assert_awaited_once_with(answer)
+    store.finish.assert_not_awaited()
+
+
+async def test_failed_handler_releases_keys():
+    store = _store()
+    handler = AsyncMock(side_effect=ValueError)
+
+    with pytest.raises(ValueError):
+        await IdempotencyMiddleware(store)(
+            handler, _callback("confirm_yes"), _data({"idempotent": ()})
+        )
+
+    store.release.assert_awaited_once()
+    store.finish.assert_not_awaited()
+
+
+async def test_unsuccessful_result_is_not_cached():
+    store = _store()
+    handler = AsyncMock(return_value=None)
+
+    await IdempotencyMiddleware(store)(
+        handler, _callback("confirm_booking"), _data({"idempotent": ()})
+    )
+
+    # Повтор после освобождения слота снова дойдёт до хендлера
+    store.release.assert_awaited_once()
+    store.finish.assert_not_awaited()
+
+
+async def test_new_attempt_gets_new_action_key():
+    store = _store()
+    handler = AsyncMock(return_value="✅ Вы записаны")
+    flags = {"idempotent": ("visit_time_str", "booking_attempt")}
+
+    for attempt in ("first", "second"):
+        await IdempotencyMiddleware(store)(
+            handler,
+            _callback("confirm_booking", callback_id=attempt),
+            _data(flags, {"visit_time_str": "10:30", "booking_attempt": attempt}),
+        )
+
+    first, second = (call.args[0][1] for call in store.claim.await_args_list)
+    assert first != second
+
+
+async def test_handler_without_flag_is_not_tracked():
+    store = _store()
+    handler = AsyncMock()
+
+    await IdempotencyMiddleware(store)(handler, _callback("book"), _data({}))
+
+    handler.assert_awaited_once()
+    store.claim.assert_not_awaited()
+
+
+async def test_redis_failure_lets_callback_through():
+    store = _store()
+    store.claim.side_effect = RedisConnectionError()
+    handler = AsyncMock()
+
+    await IdempotencyMiddleware(store)(
+        handler, _callback("confirm_yes"), _data({"idempotent": ()})
+    )
+
+    handler.assert_awaited_once()
@@ -0,0 +1,103 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.types import CallbackQuery, User
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.middlewares.throttling import (
+    THROTTLE_LIMITS,
+    ThrottlingMiddleware,
+    callback_category,
+)
+from src.utils.token_bucket import TokenBucketLimiter
+
+
+def _callback(data: str) -> CallbackQuery:
+    callback = CallbackQuery(
+        id="1",
+        from_user=User(id=100, is_bot=False, first_name="Катя"),
+        chat_instance="1",
+        data=data,
+    )
+    object.__setattr__(callback, "answer", AsyncMock())
+    return callback
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("book", "book"),
+        ("choose_date_2025_03_03", "choose_date"),
+        ("timeline_10:30", "timeline"),
+        ("confirm_booking", "timeline"),
+        ("accept_15", "admin"),
+        ("set_weekday_2", "admin"),
+        ("duration_session_60", "admin"),
+        ("cancel_booking", "default"),
+        (None, "default"),
+    ],
+)
+def test_callback_category(data, expected):
+    assert callback_category(data) == expected
+
+
+async def test_allowed_callback_reaches_handler():
+    limiter = MagicMock()
+    limiter.acquire = AsyncMock(return_value=0)
+    handler = AsyncMock(return_value="ok")
+    callback = _callback("timeline_10:30")
+
+    result = await ThrottlingMiddleware(limiter)(handler, callback, {})
+
+    assert result == "ok"
+    limiter.acquire.assert_awaited_once_with(
+        category="timeline",
+        user_id=100,
+        user_limit=THROTTLE_LIMITS["timeline"][0],
+        global_limit=THROTTLE_LIMITS["timeline"][1],
+    )
+
+
+async def test_throttled_callback_answered_without_handler():
+    limiter = MagicMock()
+    limiter.acquire = AsyncMock(return_value=1.2)
+    handler = AsyncMock()
+    callback = _callback("choose_date_2025_03_03")
+
+    await ThrottlingMiddleware(limiter)(handler, callback, {})
+
+    handler.assert_not_awaited()
+    callback.answer.assert_awaited_once()
+    assert "2 с" in callback.answer.await_args.args[0]
+
+
+async def test_redis_failure_lets_callback_through():
+    limiter = MagicMock()
+    limiter.acquire = AsyncMock(side_effect=RedisConnectionError())
+    handler = AsyncMock()
+
+    await ThrottlingMiddleware(limiter)(handler, _callback("book"), {})
+
+    handler.assert_awaited_once()
+
+
+async def test_limiter_checks_user_and_global_bucket_in_one_call():
+    script = AsyncMock(return_value=1500)
+    redis = MagicMock()
+    redis.register_script.return_value = script
+    user_limit, global_limit = THROTTLE_LIMITS["book"]
+
+    retry_after = await TokenBucketLimiter(redis).acquire(
+        category="book", user_id=100, user_limit=user_limit, global_limit=global_limit
+    )
+
+    assert retry_after == 1.5
+    script.assert_awaited_once_with(
+        keys=["throttle:book:user:100", "throttle:book:global"],
+        args=[
+            user_limit.capacity,
+            user_limit.rate,
+            global_limit.capacity,
+            global_limit.rate,
+        ],
+    )
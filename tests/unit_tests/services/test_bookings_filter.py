@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql
+
+from src.services.admin import AdminService, BookingsFilter
+
+NOW = datetime(2025, 3, 3, 12, 30)
+
+
+def _sql(bookings_filter: BookingsFilter) -> str:
+    return str(
+        and_(*bookings_filter.conditions(NOW)).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "period, status", [("month", "any"), ("all", "done"), ("", "")]
+)
+def test_bookings_filter_rejects_unknown_values(period, status):
+    with pytest.raises(ValueError):
+        BookingsFilter(period=period, status=status)
+
+
+def test_bookings_filter_all_starts_from_now():
+    sql = _sql(BookingsFilter())
+
+    assert "schedules.is_booked" in sql
+    assert "schedules.visit_datetime >= '2025-03-03 12:30:00'" in sql
+    assert "is_approved" not in sql
+
+
+def test_bookings_filter_week_covers_whole_days():
+    sql = _sql(BookingsFilter(period="week", status="approved"))
+
+    assert "schedules.visit_datetime >= '2025-03-03 00:00:00'" in sql
+    assert "schedules.visit_datetime < '2025-03-10 00:00:00'" in sql
+    assert "schedules.is_approved = true" in sql
+
+
+@pytest.mark.parametrize(
+    "status, condition",
+    [
+        ("pending", "schedules.is_approved IS NULL"),
+        ("rejected", "schedules.is_approved = false"),
+    ],
+)
+def test_bookings_filter_status_conditions(status, condition):
+    sql = _sql(BookingsFilter(period="today", status=status))
+
+    assert "schedules.visit_datetime < '2025-03-04 00:00:00'" in sql
+    assert condition in sql
+
+
+def test_bookings_page_stmt_reads_one_extra_row():
+    stmt = AdminService.bookings_page_stmt(BookingsFilter(), page_size=5)
+
+    sql = str(
+        stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    assert "LIMIT 6" in sql
+    assert "ORDER BY schedules.visit_datetime, schedules.id" in sql
@@ -0,0 +1,287 @@
+import asyncio
+import random
+from datetime import datetime, time, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.schemas.schedule_settings import ScheduleSettingsSchema
+from src.services.occupancy import (
+    DayIntervals,
+    OccupancyIndex,
+    track_occupancy_change,
+)
+
+TODAY = datetime.now().date()
+
+
+def _settings(**overrides) -> ScheduleSettingsSchema:
+    values = {
+        "id": 1,
+        "working_days": (0, 1, 2, 3, 4, 5, 6),
+        "start_working_time": time(9, 0),
+        "end_working_time": time(18, 0),
+        "booking_days_ahead": 14,
+        "slot_duration_minutes": 30,
+        "updated_at": None,
+    }
+    values.update(overrides)
+    return ScheduleSettingsSchema(**values)
+
+
+def _session(rows: list[tuple[datetime, int, bool]]) -> AsyncMock:
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = rows
+    session.execute.return_value = result
+    return session
+
+
+def _at(days: int, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(TODAY + timedelta(days=days), time(hour, minute))
+
+
+@pytest.fixture
+def index() -> OccupancyIndex:
+    return OccupancyIndex(rebuild_interval=60)
+
+
+def test_day_intervals_match_brute_force():
+    rng = random.Random(17)  # noqa: S311
+    intervals = DayIntervals()
+    booked: list[tuple[int, int]] = []
+    # Пересечения допускаются: так выглядят записи до ограничения в базе
+    for _ in range(500):
+        if booked and rng.random() < 0.3:
+            start = rng.choice(booked)[0]
+            intervals.remove(start)
+            # Из одинаковых начал remove убирает добавленное раньше
+            booked.remove(next(b for b in booked if b[0] == start))
+        else:
+            start = rng.randrange(0, 1440, 15)
+            end = start + rng.choice([15, 30, 60, 120, 240])
+            intervals.add(start, end)
+            booked.append((start, end))
+
+        query_start = rng.randrange(0, 1440, 15)
+        query_end = query_start + rng.choice([30, 60, 120])
+        expected = all(
+            end <= query_start or start >= query_end for start, end in booked
+        )
+        assert intervals.is_free(query_start, query_end) == expected
+
+
+async def test_built_with_one_query(index):
+    day_off = datetime.combine(TODAY + timedelta(days=2), time.min)
+    session = _session(
+        [(_at(1, 9), 30, False), (_at(1, 10, 30), 120, False), (day_off, 0, True)]
+    )
+
+    await index.sync(session, _settings())
+    await index.sync(session, _settings())
+
+    session.execute.assert_awaited_once()
+    candidates = [time(h, m) for h in range(9, 18) for m in (0, 30)]
+    free = index.free_times(TODAY + timedelta(days=1), candidates, 30)
+    assert time(9, 0) not in free
+    assert time(9, 30) in free
+    assert {time(10, 30), time(11, 30), time(12, 0)}.isdisjoint(free)
+    assert time(12, 30) in free
+    assert TODAY + timedelta(days=2) not in index.available_dates(range(7))
+    assert len(index.available_dates(range(7))) == 14
+
+
+async def test_longer_duration_detects_overlap_with_later_booking(index):
+    await index.sync(_session([(_at(1, 11), 30, False)]), _settings())
+    visit_date = TODAY + timedelta(days=1)
+
+    assert index.is_free(visit_date, time(10, 0), 60)
+    assert not index.is_free(visit_date, time(10, 0), 120)
+    assert index.is_free(visit_date, time(11, 30), 120)
+
+
+async def test_free_counts_per_day(index):
+    await index.sync(
+        _session([(_at(1, 9), 540, False), (_at(2, 10), 60, False)]), _settings()
+    )
+    candidates = [time(h, m) for h in range(9, 18) for m in (0, 30)]
+
+    counts = index.free_counts(range(7), candidates, 30)
+
+    assert counts.keys() == index.available_dates(range(7))
+    assert counts[TODAY + timedelta(days=1)] == 0
+    assert counts[TODAY + timedelta(days=2)] == len(candidates) - 2
+    assert counts[TODAY + timedelta(days=3)] == len(candidates)
+    # Для часового сеанса занятость в 10:00 закрывает и начало в 9:30
+    assert index.free_counts(range(7), candidates, 60)[TODAY + timedelta(days=2)] == (
+        len(candidates) - 3
+    )
+
+
+async def test_version_changes_only_for_touched_day(index):
+    session = _session([])
+    await index.sync(session, _settings())
+    first_day, second_day = TODAY + timedelta(days=1), TODAY + timedelta(days=2)
+    before = index.version(), index.version(first_day), index.version(second_day)
+
+    index.book(_at(1, 10), 30)
+
+    assert index.version() != before[0]
+    assert index.version(first_day) != before[1]
+    assert index.version(second_day) == before[2]
+
+    index.set_days_off(second_day, second_day, True)
+    assert index.version(second_day) != before[2]
+
+    index.invalidate()
+    await index.sync(session, _settings())
+    # Перестройка из БД меняет версию всех дней
+    assert index.version(TODAY + timedelta(days=5)) != before[2]
+
+
+async def test_out_of_horizon_is_not_free(index):
+    await index.sync(_session([]), _settings())
+
+    assert not index.is_free(TODAY + timedelta(days=15), time(9, 0), 30)
+    assert not index.is_free(TODAY - timedelta(days=1), time(9, 0), 30)
+
+
+async def test_updated_in_place_without_queries(index):
+    session = _session([])
+    await index.sync(session, _settings())
+    visit_date = TODAY + timedelta(days=3)
+
+    index.book(_at(3, 12), 120)
+    assert not index.is_free(visit_date, time(13, 30), 30)
+    index.release(_at(3, 12))
+    assert index.is_free(visit_date, time(13, 30), 30)
+    index.set_days_off(TODAY + timedelta(days=4), TODAY + timedelta(days=5), True)
+    assert TODAY + timedelta(days=5) not in index.available_dates(range(7))
+
+    await index.sync(session, _settings())
+    session.execute.assert_awaited_once()
+
+
+async def test_rolled_forward_loading_only_new_days(index):
+    session = _session([(_at(0, 9), 30, False)])
+    await index.sync(session, _settings())
+    # Индекс, построенный вчера
+    index._first_day -= timedelta(days=1)
+    index._last_day -= timedelta(days=1)
+    index._busy = {d - timedelta(days=1): v for d, v in index._busy.items()}
+    session.execute.return_value.all.return_value = [(_at(14, 9), 30, False)]
+
+    await index.sync(session, _settings())
+
+    assert session.execute.await_count == 2
+    assert TODAY - timedelta(days=1) not in index._busy
+    assert not index.is_free(TODAY + timedelta(days=14), time(9, 0), 30)
+
+
+async def test_invalidate_forces_rebuild(index):
+    session = _session([])
+    await index.sync(session, _settings())
+
+    index.invalidate()
+    await index.sync(session, _settings())
+
+    assert session.execute.await_count == 2
+
+
+async def test_change_during_load_forces_next_rebuild(index):
+    session = _session([])
+
+    async def execute(_):
+        index.book(_at(1, 9), 30)
+        return MagicMock(all=MagicMock(return_value=[]))
+
+    session.execute.side_effect = execute
+    await index.sync(session, _settings())
+    await index.sync(session, _settings())
+
+    assert session.execute.await_count == 2
+
+
+async def test_concurrent_syncs_share_one_load(index):
+    session = _session([])
+    loading = asyncio.Event()
+
+    async def execute(_):
+        await loading.wait()
+        return MagicMock(all=MagicMock(return_value=[(_at(1, 10), 30, False)]))
+
+    session.execute.side_effect = execute
+    syncs = asyncio.gather(*(index.sync(session, _settings()) for _ in range(3)))
+    await asyncio.sleep(0)
+    loading.set()
+    await syncs
+
+    assert session.execute.await_count == 1
+    assert index._busy[TODAY + timedelta(days=1)].starts == [600]
+    index.release(_at(1, 10))
+    assert index.is_free(TODAY + timedelta(days=1), time(10, 0), 30)
+
+
+async def test_readers_see_previous_index_during_rebuild(index):
+    visit_date = TODAY + timedelta(days=1)
+    day_off = TODAY + timedelta(days=2)
+    session = _session([(_at(1, 10), 30, False), (_at(2, 0), 0, True)])
+    await index.sync(session, _settings())
+    seen_during_load = []
+
+    async def execute(_):
+        seen_during_load.append(
+            (
+                index.is_free(visit_date, time(10, 0), 30),
+                day_off in index.available_dates(range(7)),
+            )
+        )
+        return MagicMock(all=MagicMock(return_value=[]))
+
+    session.execute.side_effect = execute
+    index.invalidate()
+    await index.sync(session, _settings())
+
+    assert seen_during_load == [(False, False)]
+    assert index.is_free(visit_date, time(10, 0), 30)
+
+
+async def test_version_changes_only_after_load_swapped_in(index):
+    visit_date = TODAY + timedelta(days=1)
+    session = _session([(_at(1, 10), 30, False)])
+    await index.sync(session, _settings())
+    before = index.version(), index.version(visit_date)
+    seen_during_load = []
+
+    async def execute(_):
+        seen_during_load.append((index.version(), index.version(visit_date)))
+        return MagicMock(all=MagicMock(return_value=[]))
+
+    session.execute.side_effect = execute
+    index.invalidate()
+    await index.sync(session, _settings())
+
+    # Клавиатура, собранная во время загрузки, кэшируется под старой версией
+    assert seen_during_load[0][1] == before[1]
+    assert index.version(visit_date) != before[1]
+    assert index.version() != seen_during_load[0][0]
+
+
+def test_tracked_changes_applied_only_after_commit(monkeypatch):
+    index = OccupancyIndex(rebuild_interval=60)
+    index.book = MagicMock()
+    monkeypatch.setattr("src.services.occupancy.occupancy_index", index)
+
+    session = Session()
+    session.begin()
+    track_occupancy_change(session, ("book", _at(1, 9), 30))
+    session.rollback()
+    session.begin()
+    session.commit()
+    index.book.assert_not_called()
+
+    session.begin()
+    track_occupancy_change(session, ("book", _at(1, 9), 30))
+    session.commit()
+    index.book.assert_called_once_with(_at(1, 9), 30)
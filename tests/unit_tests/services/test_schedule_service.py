@@ -3,7 +3,10 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from src.exceptions.booking import BookingError
 from src.models.schedule_settings import ScheduleSettings
+from src.services.admin import AdminService
+from src.services.schedule import SlotStatus, slot_template
 
 # --- Existing tests for other methods remain unchanged ---
 
@@ -101,3 +104,152 @@ def test_get_time_slots(visit_date, slot_minutes, slots, schedule_service):
         next_date = datetime.combine(visit_date, time_slots[i + 1])
         now_date = datetime.combine(visit_date, time_slots[i])
         assert (next_date - now_date).total_seconds() == slot_minutes * 60
+
+
+@pytest.mark.parametrize("slot_minutes", [30, 45, 60])
+def test_is_slot_start_matches_time_slots(slot_minutes, schedule_service):
+    settings = ScheduleSettings(
+        start_working_time=time(9, 0),
+        end_working_time=time(18, 0),
+        slot_duration_minutes=slot_minutes,
+    )
+    slots = set(schedule_service.get_time_slots(date(2025, 3, 3), settings))
+
+    for minutes in range(0, 24 * 60, 15):
+        visit_time = time(minutes // 60, minutes % 60)
+        assert schedule_service.is_slot_start(visit_time, settings) == (
+            visit_time in slots
+        )
+
+
+def _check_session(is_day_off: bool = False, is_booked: bool = False) -> AsyncMock:
+    session = AsyncMock()
+    session.execute.return_value.one = lambda: (is_day_off, is_booked)
+    return session
+
+
+@pytest.mark.parametrize(
+    "days, visit_time, db_row, expected",
+    [
+        (1, time(10, 0), (False, False), SlotStatus.AVAILABLE),
+        (1, time(10, 0), (False, True), SlotStatus.BOOKED),
+        (1, time(10, 0), (True, False), SlotStatus.DAY_OFF),
+        (1, time(10, 15), (False, False), SlotStatus.INVALID_TIME),
+        (1, time(18, 0), (False, False), SlotStatus.INVALID_TIME),
+        (-1, time(10, 0), (False, False), SlotStatus.OUT_OF_RANGE),
+        (15, time(10, 0), (False, False), SlotStatus.OUT_OF_RANGE),
+    ],
+    ids=[
+        "available",
+        "booked",
+        "day_off",
+        "off_grid",
+        "after_hours",
+        "past",
+        "beyond_horizon",
+    ],
+)
+async def test_check_slot_reason(days, visit_time, db_row, expected, schedule_service):
+    settings = ScheduleSettings(
+        working_days=list(range(7)),
+        start_working_time=time(9, 0),
+        end_working_time=time(18, 0),
+        booking_days_ahead=14,
+        slot_duration_minutes=30,
+    )
+    session = _check_session(*db_row)
+    visit_date = datetime.now().date() + timedelta(days=days)
+
+    status = await schedule_service.check_slot(
+        session, visit_date, visit_time, settings
+    )
+
+    assert status is expected
+    # Проверки по настройкам не ходят в базу, остальное — один запрос
+    expected_queries = 1 if expected.name in {"AVAILABLE", "BOOKED", "DAY_OFF"} else 0
+    assert session.execute.await_count == expected_queries
+
+
+async def test_check_slot_rejects_non_working_weekday(schedule_service):
+    settings = ScheduleSettings(working_days=[], booking_days_ahead=14)
+    session = _check_session()
+
+    status = await schedule_service.check_slot(
+        session, datetime.now().date(), time(10, 0), settings
+    )
+
+    assert status is SlotStatus.NOT_WORKING_DAY
+    session.execute.assert_not_awaited()
+
+
+async def test_is_slot_available_raises_with_reason(schedule_service):
+    settings = ScheduleSettings(
+        working_days=list(range(7)),
+        start_working_time=time(9, 0),
+        end_working_time=time(18, 0),
+        booking_days_ahead=14,
+        slot_duration_minutes=30,
+    )
+
+    with pytest.raises(BookingError, match=SlotStatus.DAY_OFF.value):
+        await schedule_service.is_slot_available(
+            _check_session(is_day_off=True),
+            datetime.now().date() + timedelta(days=1),
+            time(10, 0),
+            settings,
+        )
+
+
+def test_active_bookings_count_reads_at_most_limit_rows(schedule_service):
+    stmt = schedule_service._active_bookings_count(user_telegram_id=1, limit=3)
+
+    sql = str(stmt.compile(compile_kwargs={"literal_binds": True}))
+
+    assert "LIMIT 3" in sql
+    assert "schedules.is_booked" in sql
+
+
+async def test_booking_limit_disabled_without_query(schedule_service):
+    session = AsyncMock()
+
+    assert await schedule_service._check_user_booking_limit(session, 1, None)
+    session.execute.assert_not_awaited()
+
+
+def test_slot_template_built_once_per_settings(schedule_service):
+    slot_template.cache_clear()
+    settings = ScheduleSettings(
+        start_working_time=time(9, 0),
+        end_working_time=time(18, 0),
+        slot_duration_minutes=30,
+    )
+
+    first = schedule_service.get_time_slots(date(2025, 3, 3), settings)
+    second = schedule_service.get_time_slots(date(2025, 3, 4), settings)
+
+    assert first is second
+    assert isinstance(first, tuple)
+    assert slot_template.cache_info().misses == 1
+    assert schedule_service.get_slot_template(settings).members == set(first)
+
+
+@pytest.mark.parametrize(
+    "method, kwargs",
+    [
+        ("set_session_duration", {"duration_minutes": 60}),
+        (
+            "set_working_time",
+            {"start_working_time": time(10, 0), "end_working_time": time(20, 0)},
+        ),
+    ],
+)
+async def test_changing_working_hours_clears_slot_templates(method, kwargs):
+    slot_template(time(9, 0), time(18, 0), 30)
+
+    with patch.object(
+        AdminService, "_update_schedule_settings", AsyncMock()
+    ) as update_settings:
+        await getattr(AdminService, method)(session=AsyncMock(), **kwargs)
+
+    update_settings.assert_awaited_once()
+    assert slot_template.cache_info().currsize == 0
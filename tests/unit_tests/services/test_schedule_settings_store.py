@@ -0,0 +1,90 @@
+from datetime import datetime, time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import ValidationError
+
+from src.models.schedule_settings import ScheduleSettings
+from src.services.schedule_settings import ScheduleSettingsStore
+
+UPDATED_AT = datetime(2025, 3, 3, 12, 0)
+
+
+def _row(**overrides) -> ScheduleSettings:
+    values = {
+        "id": 1,
+        "working_days": [0, 1, 2, 3, 4],
+        "start_working_time": time(9, 0),
+        "end_working_time": time(18, 0),
+        "booking_days_ahead": 14,
+        "slot_duration_minutes": 30,
+        "updated_at": UPDATED_AT,
+    }
+    values.update(overrides)
+    return ScheduleSettings(**values)
+
+
+def _session(*results) -> AsyncMock:
+    session = AsyncMock()
+    executed = []
+    for value in results:
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = value
+        executed.append(result)
+    session.execute.side_effect = executed
+    return session
+
+
+@pytest.mark.asyncio
+async def test_get_loads_snapshot_once():
+    store = ScheduleSettingsStore(revalidate_interval=60)
+    session = _session(_row())
+
+    first = await store.get(session)
+    second = await store.get(session)
+
+    assert first is second
+    assert first.working_days == (0, 1, 2, 3, 4)
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_immutable():
+    store = ScheduleSettingsStore(revalidate_interval=60)
+    snapshot = store.update(_row())
+
+    with pytest.raises(ValidationError):
+        snapshot.slot_duration_minutes = 60
+
+
+@pytest.mark.asyncio
+async def test_get_raises_when_settings_missing():
+    store = ScheduleSettingsStore(revalidate_interval=60)
+
+    with pytest.raises(RuntimeError):
+        await store.get(_session(None))
+
+
+@pytest.mark.asyncio
+async def test_revalidate_keeps_snapshot_when_updated_at_same():
+    store = ScheduleSettingsStore(revalidate_interval=0)
+    snapshot = store.update(_row())
+    session = _session(UPDATED_AT)
+
+    assert await store.get(session) is snapshot
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_revalidate_reloads_snapshot_changed_elsewhere():
+    store = ScheduleSettingsStore(revalidate_interval=0)
+    store.update(_row())
+    changed_at = datetime(2025, 3, 3, 12, 5)
+    session = _session(
+        changed_at, _row(slot_duration_minutes=60, updated_at=changed_at)
+    )
+
+    snapshot = await store.get(session)
+
+    assert snapshot.slot_duration_minutes == 60
+    assert snapshot.updated_at == changed_at
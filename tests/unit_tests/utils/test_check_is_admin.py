@@ -1,8 +1,23 @@
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from src.utils.get_admins_ids import get_admin_ids
+from src.models import User
+from src.utils.get_admins_ids import (
+    AdminIdsCache,
+    _invalidate_on_commit,
+    _track_admin_changes,
+    admin_ids_cache,
+    get_admin_ids,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_admin_ids_cache():
+    admin_ids_cache.invalidate()
+    yield
+    admin_ids_cache.invalidate()
 
 
 def _make_result_with_db_ids(ids: list[int | None]):
@@ -63,3 +78,71 @@ async def test_get_admin_ids_filters_falsy_and_deduplicates(mock_settings):
 
     assert admin_ids == {111, 222}
     session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.utils.get_admins_ids.settings")
+async def test_admin_ids_cached_until_invalidated(mock_settings):
+    mock_settings.ADMIN_IDS = [111]
+    cache = AdminIdsCache(ttl=60)
+    session = AsyncMock()
+    session.execute.return_value = _make_result_with_db_ids([222])
+
+    assert await cache.get(session) == {111, 222}
+    assert await cache.get(session) == {111, 222}
+    session.execute.assert_awaited_once()
+
+    cache.invalidate()
+    session.execute.return_value = _make_result_with_db_ids([])
+
+    assert await cache.get(session) == {111}
+    assert session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("src.utils.get_admins_ids.settings")
+async def test_admin_ids_reloaded_after_ttl(mock_settings):
+    mock_settings.ADMIN_IDS = []
+    cache = AdminIdsCache(ttl=0)
+    session = AsyncMock()
+    session.execute.return_value = _make_result_with_db_ids([222])
+
+    await cache.get(session)
+    await cache.get(session)
+
+    assert session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("src.utils.get_admins_ids.settings")
+async def test_admin_ids_load_started_before_invalidate_not_cached(mock_settings):
+    mock_settings.ADMIN_IDS = []
+    cache = AdminIdsCache(ttl=60)
+    session = AsyncMock()
+
+    async def execute_and_invalidate(*_, **__):
+        cache.invalidate()
+        return _make_result_with_db_ids([222])
+
+    session.execute.side_effect = execute_and_invalidate
+    await cache.get(session)
+    session.execute.side_effect = None
+    session.execute.return_value = _make_result_with_db_ids([])
+
+    assert await cache.get(session) == frozenset()
+
+
+@pytest.mark.parametrize(
+    "is_admin, expected",
+    [(True, True), (False, False)],
+)
+def test_commit_with_admin_user_invalidates_cache(is_admin, expected):
+    cache_before = admin_ids_cache._generation
+    user = User(telegram_id=1, first_name="Катя", is_admin=is_admin)
+    session = SimpleNamespace(new=[user], dirty=[], deleted=[], info={})
+
+    _track_admin_changes(session, None, None)
+    _invalidate_on_commit(session)
+
+    assert (admin_ids_cache._generation != cache_before) is expected
+    assert not session.info
@@ -1,11 +1,40 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 from src.utils.register_middlewares import register_middlewares
 
 
-def test_register_middlewares_registers_all():
+@pytest.mark.parametrize(
+    "metrics_enabled, sql_budget_mode, inner_count",
+    [(True, "off", 2), (False, "off", 1), (True, "raise", 3)],
+    ids=["metrics", "plain", "sql_budget"],
+)
+@patch("src.utils.register_middlewares.settings")
+def test_register_middlewares_registers_all(
+    mock_settings, metrics_enabled, sql_budget_mode, inner_count
+):
+    mock_settings.METRICS_ENABLED = metrics_enabled
+    mock_settings.SQL_BUDGET_MODE = sql_budget_mode
+    mock_settings.SQL_BUDGET_SAMPLE_RATE = 1.0
     dp = MagicMock()
+    dp.chain_tail = []
 
     register_middlewares(dp)
-    assert dp.update.middleware.call_count == 6
-    dp.message.middleware.assert_called_once()
+    dp.update.middleware.assert_called_once()
+    assert dp.message.middleware.call_count == inner_count + 1
+    assert dp.callback_query.middleware.call_count == inner_count
+
+
+@patch("src.utils.register_middlewares.settings")
+def test_register_middlewares_adds_throttling_with_redis(mock_settings):
+    mock_settings.THROTTLING_ENABLED = True
+    mock_settings.SQL_BUDGET_MODE = "off"
+    mock_settings.IDEMPOTENCY_TTL_SECONDS = 30.0
+    dp = MagicMock()
+    dp.chain_tail = []
+
+    register_middlewares(dp, redis=MagicMock())
+    dp.callback_query.outer_middleware.assert_called_once()
+    # IdempotencyMiddleware добавляется только для callback
+    assert dp.callback_query.middleware.call_count == dp.message.middleware.call_count
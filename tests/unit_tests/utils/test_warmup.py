@@ -0,0 +1,53 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.utils.warmup import build_warmup_steps, run_warmup
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_runs_steps_concurrently():
+    started = []
+    release = asyncio.Event()
+
+    async def step(name: str) -> None:
+        started.append(name)
+        await release.wait()
+
+    task = asyncio.create_task(
+        run_warmup(
+            [("first", lambda: step("first")), ("second", lambda: step("second"))]
+        )
+    )
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert sorted(started) == ["first", "second"]
+    release.set()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_waits_all_steps_and_raises_first_error():
+    finished = AsyncMock()
+
+    async def failing() -> None:
+        raise ConnectionError("нет связи")
+
+    with pytest.raises(ConnectionError):
+        await run_warmup([("failing", failing), ("ok", finished)])
+
+    finished.assert_awaited_once()
+
+
+def test_build_warmup_steps_without_database():
+    steps = build_warmup_steps(
+        bot=MagicMock(),
+        redis=MagicMock(),
+        engine=MagicMock(),
+        session_factory=MagicMock(),
+        with_database=False,
+    )
+
+    assert [name for name, _ in steps] == ["redis_ping", "bot_commands"]